@@ -0,0 +1,66 @@
+"""
+Audio storage durability benchmark
+
+Writes chunks through LocalBlobStore from concurrent threads, the way
+simultaneous uploads do, once per durability mode (AUDIO_STORAGE_DURABILITY),
+and reports chunks and MiB per second. Run it on the disk that holds
+AUDIO_STORAGE_PATH: fsync cost depends entirely on the device.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.storage_durability_benchmark --path /app/audio_storage/.benchmark
+    python -m benchmarks.storage_durability_benchmark --threads 32 --chunks 2000 --chunk-kib 300
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("fsync", "group", "none")
+
+
+def _write_chunks(store, chunks: int, threads: int, data: bytes) -> float:
+    def write(index: int) -> None:
+        # 20 chunks per recording, like a few minutes of MediaRecorder output
+        with store.open_writer(f"rec-{index // 20}/chunk_{index % 20:04d}.webm.enc") as writer:
+            writer.write(data)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(write, range(chunks)))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="Directory to write into (default: a temporary directory)")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent writers")
+    parser.add_argument("--chunks", type=int, default=1000, help="Chunks written per mode")
+    parser.add_argument("--chunk-kib", type=int, default=160, help="Chunk size in KiB")
+    args = parser.parse_args()
+
+    from storage.blob_store import LocalBlobStore
+    from storage.durability import create_durability_policy
+
+    data = os.urandom(args.chunk_kib * 1024)
+    print(f"threads:  {args.threads}")
+    print(f"chunks:   {args.chunks} x {args.chunk_kib} KiB")
+
+    for mode in MODES:
+        root = tempfile.mkdtemp(prefix=f"{mode}-", dir=args.path)
+        try:
+            store = LocalBlobStore(root, durability=create_durability_policy(mode))
+            elapsed = _write_chunks(store, args.chunks, args.threads, data)
+        finally:
+            shutil.rmtree(root)
+        mib = args.chunks * len(data) / (1024 * 1024)
+        print(f"{mode + ':':9} {args.chunks / elapsed:8.0f} chunks/s  {mib / elapsed:8.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
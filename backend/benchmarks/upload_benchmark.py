@@ -0,0 +1,128 @@
+"""
+Upload throughput benchmark
+
+Simulates concurrent recorders, each uploading a series of chunks to
+POST /recordings/{id}/chunks, and reports requests per second. The app
+runs in-process against a temporary SQLite database and storage
+directory, so no server, MySQL or LLM credentials are needed.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.upload_benchmark --recorders 100 --chunks 5
+    python -m benchmarks.upload_benchmark --io-workers 1 --probe-processes 0   # serialized baseline
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _chunk(index: int, blocks: int) -> bytes:
+    """Build a MediaRecorder-style WebM chunk: header on chunk 0, then one cluster"""
+    def element(element_id: bytes, payload: bytes) -> bytes:
+        return element_id + b"\x01" + len(payload).to_bytes(7, "big") + payload
+
+    unknown_size = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+    frames = b"".join(
+        element(b"\xa3", b"\x81" + (20 * i).to_bytes(2, "big") + b"\x80" + os.urandom(160))
+        for i in range(blocks)
+    )
+    cluster = b"\x1f\x43\xb6\x75" + unknown_size + element(b"\xe7", (index * 20000).to_bytes(4, "big")) + frames
+
+    if index:
+        return cluster
+    return (
+        element(b"\x1a\x45\xdf\xa3", b"\x42\x82\x84webm")
+        + b"\x18\x53\x80\x67" + unknown_size
+        + element(b"\x15\x49\xa9\x66", element(b"\x2a\xd7\xb1", (1000000).to_bytes(3, "big")))
+        + cluster
+    )
+
+
+async def _record(client, recording_id: str, chunks: int, blocks: int, latencies: list) -> None:
+    for index in range(chunks):
+        started = time.perf_counter()
+        response = await client.post(
+            f"/recordings/{recording_id}/chunks",
+            data={"chunk_index": str(index)},
+            files={"audio_chunk": ("chunk.webm", _chunk(index, blocks), "audio/webm")},
+        )
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _run(args) -> None:
+    import httpx
+    from main import app
+    from database import SessionLocal, init_db
+    from middleware.auth import get_current_user
+    from repositories.recording_repository import MySQLRecordingRepository
+    from repositories.user_repository import MySQLUserRepository
+    from jobs.assembly import incremental_assembler
+    from utils.blocking_io import blocking_io
+
+    init_db()
+    db = SessionLocal()
+    user = MySQLUserRepository(db).create_user(google_id="benchmark", email="benchmark@example.com")
+    recording_ids = [
+        MySQLRecordingRepository(db).create_recording(user.id).id
+        for _ in range(args.recorders)
+    ]
+    db.refresh(user)  # Loaded attributes stay usable after the session closes
+    db.close()
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    blocking_io.start()
+
+    latencies: list = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Warm up the worker pools
+        await _record(client, recording_ids[0], 1, args.blocks, [])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _record(client, recording_id, args.chunks, args.blocks, latencies)
+            for recording_id in recording_ids
+        ))
+        elapsed = time.perf_counter() - started
+
+    await asyncio.to_thread(blocking_io.shutdown, True)
+    await asyncio.to_thread(incremental_assembler.shutdown, True)
+
+    latencies.sort()
+    print(f"recorders:        {args.recorders}")
+    print(f"uploads:          {len(latencies)}")
+    print(f"io workers:       {blocking_io.io_workers}")
+    print(f"probe processes:  {blocking_io.cpu_processes}")
+    print(f"requests/second:  {len(latencies) / elapsed:.1f}")
+    print(f"p50 latency (ms): {latencies[len(latencies) // 2] * 1000:.1f}")
+    print(f"p99 latency (ms): {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recorders", type=int, default=100, help="Concurrent recorders")
+    parser.add_argument("--chunks", type=int, default=5, help="Chunks uploaded by each recorder")
+    parser.add_argument("--blocks", type=int, default=1000, help="Audio blocks (20 ms) per chunk")
+    parser.add_argument("--io-workers", type=int, help="Override UPLOAD_IO_WORKERS")
+    parser.add_argument("--probe-processes", type=int, help="Override UPLOAD_PROBE_PROCESSES")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="upload-benchmark-")
+    os.environ["MYSQL_URL"] = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+    os.environ["AUDIO_STORAGE_PATH"] = os.path.join(workdir, "audio")
+    if args.io_workers is not None:
+        os.environ["UPLOAD_IO_WORKERS"] = str(args.io_workers)
+    if args.probe_processes is not None:
+        os.environ["UPLOAD_PROBE_PROCESSES"] = str(args.probe_processes)
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
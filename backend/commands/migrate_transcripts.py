@@ -0,0 +1,45 @@
+"""
+Move legacy transcriptions into the binary ciphertext column
+
+Transcriptions used to be stored base64 encoded in recordings.transcription_text.
+They are now raw ciphertext bytes in recordings.transcription_ciphertext.
+Legacy rows stay readable, but each view pays for the extra decoding until
+it is migrated. The ciphertext is re-encoded only, never decrypted.
+
+Columns the database predates (transcription_ciphertext included) are
+added first.
+
+Usage (from the backend directory):
+
+    python -m commands.migrate_transcripts
+    python -m commands.migrate_transcripts --batch-size 1000
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Recordings migrated per commit")
+    args = parser.parse_args()
+
+    from database import SessionLocal, upgrade_db
+    from repositories.recording_repository import MySQLRecordingRepository
+
+    for change in upgrade_db():
+        print(f"Upgraded {change}")
+
+    db = SessionLocal()
+    try:
+        migrated = MySQLRecordingRepository(db).migrate_legacy_transcriptions(args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Migrated {migrated} transcription(s)")
+
+
+if __name__ == "__main__":
+    main()
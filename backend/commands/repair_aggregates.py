@@ -0,0 +1,42 @@
+"""
+Recompute recordings' chunk aggregates
+
+The chunks_count, total_duration_seconds, total_bytes and last_chunk_index
+columns on recordings are maintained whenever chunks are added. Run this
+after changing recording_chunks by hand, or once after upgrading a
+database that predates the columns: missing columns are added first.
+
+Usage (from the backend directory):
+
+    python -m commands.repair_aggregates
+    python -m commands.repair_aggregates --recording-id <id>
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording-id", help="Only repair this recording")
+    args = parser.parse_args()
+
+    from database import SessionLocal, upgrade_db
+    from repositories.recording_repository import MySQLRecordingRepository
+
+    for change in upgrade_db():
+        print(f"Upgraded {change}")
+
+    db = SessionLocal()
+    try:
+        repaired = MySQLRecordingRepository(db).refresh_aggregates(args.recording_id)
+    finally:
+        db.close()
+
+    print(f"Recomputed aggregates for {repaired} recording(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Move recording directories from the flat storage tree into hash-prefix shards
+
+Older versions stored every recording directly below AUDIO_STORAGE_PATH.
+Those files stay readable where they are, but moving them into the
+sharded tree (AUDIO_STORAGE_SHARD_DEPTH) keeps directories small. Files
+are renamed, never copied, and files already present in the sharded tree
+win. Safe to re-run, and to run while the service is up.
+
+Usage (from the backend directory):
+
+    python -m commands.shard_audio_storage
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    from storage.layout import recording_dir
+    from config import settings
+
+    root = settings.AUDIO_STORAGE_PATH
+    if settings.AUDIO_STORAGE_SHARD_DEPTH == 0:
+        print("AUDIO_STORAGE_SHARD_DEPTH is 0; nothing to do")
+        return
+
+    moved = 0
+    for entry in os.scandir(root):
+        # Shard directories have two-character names; dot directories are working state
+        if not entry.is_dir() or len(entry.name) == 2 or entry.name.startswith("."):
+            continue
+
+        target_dir = recording_dir(root, entry.name)
+        os.makedirs(target_dir, exist_ok=True)
+        for name in os.listdir(entry.path):
+            target = os.path.join(target_dir, name)
+            if not os.path.exists(target):
+                os.replace(os.path.join(entry.path, name), target)
+        if not os.listdir(entry.path):
+            os.rmdir(entry.path)
+        moved += 1
+
+    print(f"Moved {moved} recording director{'y' if moved == 1 else 'ies'} into shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Upgrade an existing database to the current schema
+
+Tables are created on startup, but columns, enum values, unique
+constraints and indexes added to existing tables since the database was
+created are not. This adds them (deleting rows that would violate a new unique constraint,
+such as duplicate chunk indexes of a recording) and recomputes the
+recordings' chunk aggregates. Run it before starting a new version against
+an existing database; it is safe to re-run.
+
+Usage (from the backend directory):
+
+    python -m commands.upgrade_db
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    from database import SessionLocal, upgrade_db
+    from repositories.recording_repository import MySQLRecordingRepository
+
+    changes = upgrade_db()
+    for change in changes:
+        print(f"Upgraded {change}")
+    if not changes:
+        print("Database schema is up to date")
+        return
+
+    db = SessionLocal()
+    try:
+        repaired = MySQLRecordingRepository(db).refresh_aggregates()
+    finally:
+        db.close()
+
+    print(f"Recomputed aggregates for {repaired} recording(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -13,15 +13,108 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "dev-insecure-change-me"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 10080  # 7 days
+    JWT_DECODE_CACHE_MAX_ENTRIES: int = 10000  # verified tokens kept (0 disables)
+
+    # Authenticated users cached by get_current_user (0 TTL disables)
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000
 
     # Database (default to SQLite so the app can boot without MySQL)
     MYSQL_URL: str = "sqlite:///./app.db"
+    # A mysql:// URL uses mysqlclient when installed, else PyMySQL; name a
+    # driver (mysql+pymysql://...) to pin it.
+    # Async engine URL; derived from MYSQL_URL when unset (asyncmy when
+    # installed, else aiomysql; aiosqlite for SQLite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pools, per engine (the sync and the async engine each have
+    # one): connections kept open, extra connections opened under load, and
+    # how long a checkout waits for a free connection before failing
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 3600  # MySQL closes idle connections after wait_timeout
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # how long a SQLite writer waits for the write lock
 
     # LLM Provider (optional for boot)
     LLM_API_KEY: Optional[str] = ""
+    LLM_API_URL: str = "https://api.requestyai.com/v1/transcribe"  # Placeholder URL
+    LLM_MODEL_VERSION: str = "default"  # Part of transcription cache keys; bump when the model changes
+
+    # Pooled HTTP client shared by all LLM calls (HTTP/2 if h2 is installed)
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP_TIMEOUT: float = 300.0  # 5 minutes timeout for long audio files
+
+    # Background transcription workers
+    TRANSCRIPTION_WORKERS: int = 2
+
+    # Segmented transcription: long audio is split into overlapping
+    # windows that are transcribed concurrently per recording
+    TRANSCRIPTION_SEGMENT_SECONDS: int = 300
+    TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS: int = 5
+    TRANSCRIPTION_MAX_CONCURRENCY: int = 4
+
+    # Live (per-chunk) transcription for recordings that opt in
+    LIVE_TRANSCRIPTION_WORKERS: int = 2
+
+    # Transcription cache keyed by audio content and provider:
+    # "file" (encrypted on disk), "memory", "database" or "none"
+    TRANSCRIPTION_CACHE_BACKEND: str = "file"
+    TRANSCRIPTION_CACHE_PATH: str = "/app/transcription_cache"
+    TRANSCRIPTION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # file backend
+    TRANSCRIPTION_CACHE_MAX_ENTRIES: int = 4096  # memory and database backends
+
+    # Decrypted transcriptions kept in memory for repeated views (0 TTL disables)
+    TRANSCRIPT_CACHE_TTL_SECONDS: float = 300.0
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # Upload pipeline: threads for blocking file/database I/O, processes
+    # for duration probing (-1 = one per core, 0 = use the I/O threads)
+    UPLOAD_IO_WORKERS: int = 32
+    UPLOAD_PROBE_PROCESSES: int = -1
+    UPLOAD_BATCH_MAX_CHUNKS: int = 100  # chunks accepted by one batch upload
 
     # Storage
     AUDIO_STORAGE_PATH: str = "/app/audio_storage"
+    # Levels of two-character hash-prefix directories above each recording (0 = flat)
+    AUDIO_STORAGE_SHARD_DEPTH: int = 2
+    # When stored audio reaches the disk: "fsync" (before every write is
+    # acknowledged), "group" (fsyncs of concurrent writes are batched) or
+    # "none" (left to the OS; a crash can lose acknowledged chunks)
+    AUDIO_STORAGE_DURABILITY: str = "fsync"
+    AUDIO_STORAGE_GROUP_COMMIT_MS: float = 0.0  # extra wait to grow each group
+    # Format finished recordings are archived in: "webm" (as recorded,
+    # Opus), "ogg" (the same Opus packets remuxed), "flac" or "wav".
+    # Transcription decodes whatever is stored on the fly. Must match the
+    # keys of utils.audio_utils.ARCHIVE_FORMATS; other values fail at load.
+    AUDIO_ARCHIVE_FORMAT: Literal["webm", "ogg", "flac", "wav"] = "webm"
+
+    # Retention sweeper: runs every interval (0 disables) on one background
+    # thread, a batch of recordings at a time, with deletions throttled so
+    # it never competes with uploads. A negative retention keeps forever.
+    RETENTION_SWEEP_INTERVAL_SECONDS: float = 3600.0
+    RETENTION_BATCH_SIZE: int = 100
+    RETENTION_MAX_DELETES_PER_SECOND: float = 50.0  # 0 = unthrottled
+    RETENTION_CHUNK_HOURS: float = 24.0  # chunks of ended recordings, once the full audio exists
+    RETENTION_STALE_SESSION_HOURS: float = 168.0  # active/paused recordings with no activity
+    RETENTION_ORPHAN_HOURS: float = 24.0  # audio with no recording row, leftover working files
+
+    # Audio blob store: "local" (files below AUDIO_STORAGE_PATH) or "s3"
+    # (any S3-compatible service, needs boto3; AUDIO_STORAGE_PATH then only
+    # holds local working copies)
+    BLOB_STORE_BACKEND: str = "local"
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://minio:9000
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # S3 requires at least 5 MiB
+    # Local copies of S3 blobs (for assembly and range requests) kept per
+    # replica; the retention sweeper deletes the least recently used beyond it
+    S3_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
 
     # Encryption (must be a valid Fernet key; provide a safe dev default)
     # NOTE: Replace in production via env var.
@@ -1,16 +1,187 @@
-from sqlalchemy import create_engine
+import importlib.util
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import (
+    Enum,
+    Table,
+    UniqueConstraint,
+    create_engine,
+    delete,
+    event,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from utils.pool_stats import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
 from config import settings
 
-engine = create_engine(
-    settings.MYSQL_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
+# Drivers tried in order, as (module, drivername): C-accelerated drivers
+# first when installed, pure-Python ones as the fallback. Sync URLs are
+# only rewritten when they name no driver, so mysql+pymysql:// pins PyMySQL.
+MYSQL_DRIVERS = (("MySQLdb", "mysql+mysqldb"), ("pymysql", "mysql+pymysql"))
+ASYNC_MYSQL_DRIVERS = (("asyncmy", "mysql+asyncmy"), ("aiomysql", "mysql+aiomysql"))
+
+SYNC_DRIVERS = {
+    "mysql": MYSQL_DRIVERS,
+}
+
+# asyncio drivers for the sync drivers MYSQL_URL may name
+ASYNC_DRIVERS = {
+    "mysql": ASYNC_MYSQL_DRIVERS,
+    "mysql+pymysql": ASYNC_MYSQL_DRIVERS,
+    "mysql+mysqldb": ASYNC_MYSQL_DRIVERS,
+    "sqlite": (("aiosqlite", "sqlite+aiosqlite"),),
+    "sqlite+pysqlite": (("aiosqlite", "sqlite+aiosqlite"),),
+}
+
+# Rows deleted per statement when upgrade_db removes duplicates
+UPGRADE_BATCH_SIZE = 500
+
+
+def _installed_driver(candidates: Sequence[Tuple[str, str]]) -> str:
+    """First candidate driver whose module is installed (the last one when none is)"""
+    for module, drivername in candidates:
+        if importlib.util.find_spec(module) is not None:
+            return drivername
+    return candidates[-1][1]
+
+
+def database_url(url: Union[str, URL]) -> URL:
+    """
+    Pick the fastest installed driver for a sync URL that names only its dialect
+
+    Args:
+        url: SQLAlchemy database URL
+
+    Returns:
+        URL using mysqlclient when installed (else PyMySQL) for ``mysql://``;
+        other URLs are left unchanged
+    """
+    url = make_url(url)
+    if url.drivername in SYNC_DRIVERS:
+        return url.set(drivername=_installed_driver(SYNC_DRIVERS[url.drivername]))
+    return url
+
+
+def async_database_url(url: Union[str, URL]) -> URL:
+    """
+    Map a sync database URL onto the matching asyncio driver
+
+    Args:
+        url: SQLAlchemy database URL
+
+    Returns:
+        URL using asyncmy when installed (else aiomysql) or aiosqlite;
+        other drivers are left unchanged
+    """
+    url = make_url(url)
+    if url.drivername in ASYNC_DRIVERS:
+        return url.set(drivername=_installed_driver(ASYNC_DRIVERS[url.drivername]))
+    return url
+
+
+def _is_memory_database(url: URL) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def engine_options(url: Union[str, URL], is_async: bool = False) -> Dict[str, Any]:
+    """
+    Engine keyword arguments for the dialect of a database URL
+
+    Server databases (MySQL) get a bounded, pre-pinged, recycled pool sized
+    by the DB_POOL_* settings. File SQLite databases get the same pool
+    without pings (WAL and busy timeout are set per connection, see
+    _set_sqlite_pragmas); in-memory SQLite shares one connection, since
+    each connection would otherwise see its own empty database.
+
+    Args:
+        url: SQLAlchemy database URL
+        is_async: Options for create_async_engine rather than create_engine
+
+    Returns:
+        Keyword arguments for the engine factory
+    """
+    url = make_url(url)
+    poolclass = InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool
+    pool_options = {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        # Request handlers run queries on worker threads; SQLite must allow that
+        connect_args = {"check_same_thread": False}
+        if _is_memory_database(url):
+            return {"poolclass": StaticPool, "connect_args": connect_args}
+        return {**pool_options, "connect_args": connect_args}
+
+    return {
+        **pool_options,
+        "pool_pre_ping": True,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Configure every new SQLite connection
+
+    WAL lets readers run alongside the writer, and with WAL
+    synchronous=NORMAL stays crash-safe while syncing only at checkpoints.
+    The busy timeout makes a writer wait for the write lock instead of
+    failing at once with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+
+def _configure_dialect(engine: Engine, url: URL) -> None:
+    # In-memory databases have no journal file to switch to WAL
+    if url.get_backend_name() == "sqlite" and not _is_memory_database(url):
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+
+
+def create_database_engine(url: Union[str, URL]) -> Engine:
+    """Create a sync engine with its dialect's profile"""
+    url = database_url(url)
+    engine = create_engine(url, **engine_options(url))
+    _configure_dialect(engine, url)
+    return engine
+
+
+def create_async_database_engine(url: Union[str, URL]) -> AsyncEngine:
+    """Create an async engine with its dialect's profile"""
+    url = make_url(url)
+    engine = create_async_engine(url, **engine_options(url, is_async=True))
+    _configure_dialect(engine.sync_engine, url)
+    return engine
+
+
+engine = create_database_engine(settings.MYSQL_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Request handlers use the async engine so database round-trips neither
+# block the event loop nor occupy threadpool slots; background jobs,
+# which run in worker threads, keep using the sync engine
+async_engine = create_async_database_engine(
+    settings.ASYNC_DATABASE_URL or async_database_url(settings.MYSQL_URL)
+)
+
+# Objects stay usable after commit: lazy reloads are not possible under asyncio
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -23,6 +194,150 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+
+
+def upgrade_db(bind: Optional[Engine] = None) -> List[str]:
+    """
+    Bring an existing database up to the current models
+
+    create_all only creates missing tables, so what was added to existing
+    tables since the database was created is added here:
+
+    - columns: NOT NULL columns get their Python default as server
+      default, so existing rows get a value; columns without a constant
+      default are added nullable
+    - values added to enums: native MySQL ENUM columns are redefined with
+      the model's values, since MySQL rejects (or, outside strict mode,
+      blanks) values missing from the column definition
+    - unique constraints, as unique indexes: rows that would violate one
+      are deleted first, keeping per group the row with the greatest
+      ``keep_latest`` column named in the constraint's ``info`` (else the
+      greatest primary key)
+    - indexes
+
+    Safe to re-run. Run it (``python -m commands.upgrade_db``) before
+    starting a new version against an existing database.
+
+    Args:
+        bind: Engine to upgrade (defaults to the application engine)
+
+    Returns:
+        ``table.column`` and ``table.constraint`` names of what was added or changed
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            added.extend(_add_missing_columns(connection, inspector, table))
+            added.extend(_widen_enum_columns(connection, inspector, table))
+            added.extend(_add_missing_unique_constraints(connection, inspector, table))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    Base.metadata.create_all(bind=bind)
+    return added
+
+
+def _add_missing_columns(connection, inspector, table: Table) -> List[str]:
+    dialect = connection.dialect
+    preparer = dialect.identifier_preparer
+    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        ddl = (
+            f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+            f"{preparer.format_column(column)} {column.type.compile(dialect=dialect)}"
+        )
+        if column.default is not None and column.default.is_scalar:
+            default = literal(column.default.arg, type_=column.type).compile(
+                dialect=dialect, compile_kwargs={"literal_binds": True}
+            )
+            ddl += f" DEFAULT {default}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+        connection.execute(text(ddl))
+        added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _widen_enum_columns(connection, inspector, table: Table) -> List[str]:
+    dialect = connection.dialect
+    if dialect.name != "mysql":
+        return []
+
+    preparer = dialect.identifier_preparer
+    existing_types = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+    changed = []
+    for column in table.columns:
+        existing_values = getattr(existing_types.get(column.name), "enums", None)
+        if not isinstance(column.type, Enum) or existing_values is None:
+            continue
+        if set(column.type.enums) <= set(existing_values):
+            continue
+        ddl = (
+            f"ALTER TABLE {preparer.format_table(table)} MODIFY COLUMN "
+            f"{preparer.format_column(column)} {column.type.compile(dialect=dialect)}"
+        )
+        if not column.nullable:
+            ddl += " NOT NULL"
+        connection.execute(text(ddl))
+        changed.append(f"{table.name}.{column.name}")
+    return changed
+
+
+def _add_missing_unique_constraints(connection, inspector, table: Table) -> List[str]:
+    preparer = connection.dialect.identifier_preparer
+    existing = {
+        frozenset(constraint["column_names"])
+        for constraint in inspector.get_unique_constraints(table.name)
+    } | {
+        frozenset(index["column_names"])
+        for index in inspector.get_indexes(table.name)
+        if index["unique"]
+    }
+    added = []
+    for constraint in table.constraints:
+        if not isinstance(constraint, UniqueConstraint):
+            continue
+        if frozenset(column.name for column in constraint.columns) in existing:
+            continue
+        _delete_duplicates(connection, table, constraint)
+        # A unique index enforces the constraint on every dialect, SQLite included
+        columns = ", ".join(preparer.format_column(column) for column in constraint.columns)
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX {preparer.quote(constraint.name)} "
+            f"ON {preparer.format_table(table)} ({columns})"
+        ))
+        added.append(f"{table.name}.{constraint.name}")
+    return added
+
+
+def _delete_duplicates(connection, table: Table, constraint: UniqueConstraint) -> int:
+    primary_key = list(table.primary_key.columns)[0]
+    order_by = [primary_key.desc()]
+    if "keep_latest" in constraint.info:
+        order_by.insert(0, table.c[constraint.info["keep_latest"]].desc())
+    ranked = select(
+        primary_key.label("key"),
+        func.row_number().over(partition_by=list(constraint.columns), order_by=order_by).label("rank"),
+    ).subquery()
+    duplicates = connection.execute(select(ranked.c.key).where(ranked.c.rank > 1)).scalars().all()
+    for start in range(0, len(duplicates), UPGRADE_BATCH_SIZE):
+        batch = duplicates[start:start + UPGRADE_BATCH_SIZE]
+        connection.execute(delete(table).where(primary_key.in_(batch)))
+    return len(duplicates)
@@ -0,0 +1,16 @@
+from jobs.assembly import IncrementalAssembler, incremental_assembler
+from jobs.live_transcription import LiveTranscriber, live_transcriber
+from jobs.retention import RetentionSweeper, retention_sweeper
+from jobs.transcription import TranscriptionQueue, run_transcription_job, transcription_queue
+
+__all__ = [
+    "IncrementalAssembler",
+    "incremental_assembler",
+    "LiveTranscriber",
+    "live_transcriber",
+    "RetentionSweeper",
+    "retention_sweeper",
+    "TranscriptionQueue",
+    "run_transcription_job",
+    "transcription_queue",
+]
@@ -0,0 +1,242 @@
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from storage.blob_store import blob_store
+from storage.layout import recording_dir
+from utils.audio_utils import assemble_encrypted_audio, has_ebml_header, iter_chunk_bytes
+from utils.encryption_utils import encryption_service
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Running (encrypted) assembly of the chunks received so far, plus its bookkeeping
+PARTIAL_FILENAME = "assembly.partial.bin"
+STATE_FILENAME = "assembly_state.json"
+
+
+class IncrementalAssembler:
+    """
+    Appends WebM chunk fragments to a running encrypted file as they are uploaded
+
+    Chunks are identified by their blob store keys and read from local
+    copies; the running file itself is local working state below
+    ``AUDIO_STORAGE_PATH``.
+
+    Chunks are appended strictly in ``chunk_index`` order; a chunk that
+    arrives early waits until the gap before it is filled. When a
+    recording finishes only the chunks not yet appended have to be
+    copied, so finish latency no longer depends on recording length.
+    Anything unexpected (a re-uploaded index, a self-contained chunk)
+    discards the running file and ``finalize`` falls back to a full
+    assembly.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Dict[int, str]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker pool (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="assembly",
+                )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def chunk_uploaded(self, recording_id: str, chunk_index: int, chunk_key: str) -> None:
+        """
+        Hand a fully written chunk to the background assembler
+
+        Args:
+            recording_id: ID of the recording
+            chunk_index: Sequential index of the chunk
+            chunk_key: Blob store key of the stored chunk
+        """
+        self.start()
+        with self._lock:
+            self._pending.setdefault(recording_id, {})[chunk_index] = chunk_key
+        self._executor.submit(self._advance_safely, recording_id)
+
+    def finalize(
+        self,
+        recording_id: str,
+        chunks: List[Tuple[int, str]],
+        output_path: str
+    ) -> str:
+        """
+        Append the remaining chunks and move the running file into place
+
+        Args:
+            recording_id: ID of the recording
+            chunks: ``(chunk_index, chunk_key)`` pairs for every stored chunk
+            output_path: Local path where the encrypted assembled audio should be saved
+
+        Returns:
+            Path to the encrypted assembled audio file
+        """
+        chunks = [(index, blob_store.local_path(key)) for index, key in sorted(chunks)]
+        recording_dir = self._recording_dir(recording_id)
+        partial_path = os.path.join(recording_dir, PARTIAL_FILENAME)
+
+        with self._recording_lock(recording_id):
+            state = self._load_state(recording_dir)
+            if state and state.get("disabled"):
+                state = None
+            next_index = state["next_index"] if state else 0
+            appended = [index for index, _ in chunks if index < next_index]
+            remaining = [path for index, path in chunks if index >= next_index]
+            with self._lock:
+                # Re-uploads the workers have not handled yet replace appended audio
+                reuploaded = any(index < next_index for index in self._pending.get(recording_id, {}))
+
+            usable = (
+                state is not None
+                and not reuploaded
+                and appended == list(range(next_index))
+                and not any(has_ebml_header(path) for path in remaining)
+            )
+
+            if usable:
+                with encryption_service.open_encrypted_appender(partial_path) as partial:
+                    for block in iter_chunk_bytes(remaining):
+                        partial.write(block)
+                os.replace(partial_path, output_path)
+            else:
+                assemble_encrypted_audio([path for _, path in chunks], output_path)
+
+            self._discard(recording_id)
+
+        with self._lock:
+            self._pending.pop(recording_id, None)
+            self._locks.pop(recording_id, None)
+
+        return output_path
+
+    def _recording_dir(self, recording_id: str) -> str:
+        return recording_dir(settings.AUDIO_STORAGE_PATH, recording_id)
+
+    def _recording_lock(self, recording_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(recording_id, threading.Lock())
+
+    def _advance_safely(self, recording_id: str) -> None:
+        try:
+            self._advance(recording_id)
+        except Exception:
+            # Pre-assembly is only an optimisation; finalize falls back to a full assembly
+            logger.exception("Incremental assembly failed for recording %s", recording_id)
+            with self._recording_lock(recording_id):
+                self._discard(recording_id)
+
+    def _advance(self, recording_id: str) -> None:
+        recording_dir = self._recording_dir(recording_id)
+        partial_path = os.path.join(recording_dir, PARTIAL_FILENAME)
+
+        with self._recording_lock(recording_id):
+            state = self._load_state(recording_dir) or {"next_index": 0, "size": 0}
+            if state.get("disabled"):
+                return
+
+            with self._lock:
+                pending = self._pending.get(recording_id, {})
+                stale = [index for index in pending if index < state["next_index"]]
+                ready = []
+                index = state["next_index"]
+                while index in pending:
+                    ready.append(pending.pop(index))
+                    index += 1
+                for index in stale:
+                    pending.pop(index)
+
+            if stale:
+                # An already-appended chunk was uploaded again
+                self._discard(recording_id, disabled=True)
+                return
+
+            if not ready:
+                return
+
+            ready = [blob_store.local_path(key) for key in ready]
+
+            # Only the very first chunk may carry the WebM header
+            continuation = ready if state["next_index"] else ready[1:]
+            if any(has_ebml_header(path) for path in continuation):
+                # Self-contained chunks cannot be joined by concatenation
+                self._discard(recording_id, disabled=True)
+                return
+
+            if state["next_index"]:
+                partial = encryption_service.open_encrypted_appender(partial_path)
+            else:
+                partial = encryption_service.open_encrypted_writer(partial_path)
+            with partial:
+                for block in iter_chunk_bytes(ready):
+                    partial.write(block)
+            size = os.path.getsize(partial_path)
+
+            self._save_state(recording_dir, {
+                "next_index": state["next_index"] + len(ready),
+                "size": size,
+            })
+
+    def _load_state(self, recording_dir: str) -> Optional[dict]:
+        """Load assembly state, discarding a running file that no longer matches it"""
+        state_path = os.path.join(recording_dir, STATE_FILENAME)
+        partial_path = os.path.join(recording_dir, PARTIAL_FILENAME)
+
+        if not os.path.exists(state_path):
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return None
+
+        with open(state_path) as f:
+            state = json.load(f)
+
+        if state.get("disabled"):
+            return state
+
+        # An append rewrites the final frame, so a size mismatch (a crash
+        # between appending and saving state) cannot be repaired in place
+        if not os.path.exists(partial_path) or os.path.getsize(partial_path) != state["size"]:
+            self._remove_files(recording_dir)
+            return None
+
+        return state
+
+    def _save_state(self, recording_dir: str, state: dict) -> None:
+        state_path = os.path.join(recording_dir, STATE_FILENAME)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
+
+    def _discard(self, recording_id: str, disabled: bool = False) -> None:
+        recording_dir = self._recording_dir(recording_id)
+        self._remove_files(recording_dir)
+        if disabled:
+            self._save_state(recording_dir, {"disabled": True})
+
+    def _remove_files(self, recording_dir: str) -> None:
+        for filename in (PARTIAL_FILENAME, STATE_FILENAME):
+            path = os.path.join(recording_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# Global incremental assembler instance
+incremental_assembler = IncrementalAssembler()
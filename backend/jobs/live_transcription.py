@@ -0,0 +1,202 @@
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from llm.interface import AsyncLLMProvider, LLMProvider
+from llm.http_client import SharedHTTPClient, shared_http_client
+from llm.requestyai_provider import AsyncRequestYaiProvider, RequestYaiProvider
+from repositories.recording_repository import MySQLRecordingRepository
+from storage.blob_store import blob_store
+from utils.audio_utils import has_ebml_header, iter_chunk_bytes, webm_init_segment
+from utils.encryption_utils import encryption_service
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class _LoopBoundProvider:
+    """Blocking LLMProvider facade over an async provider running on the shared client's loop"""
+
+    def __init__(self, provider: AsyncLLMProvider, http_client: SharedHTTPClient):
+        self.provider = provider
+        self.http_client = http_client
+
+    def transcribe_audio(self, audio) -> str:
+        return self.http_client.submit(self.provider.transcribe_audio(audio)).result()
+
+
+def default_chunk_provider_factory() -> LLMProvider:
+    """Chunks are short, so they go to the provider whole, without segmentation"""
+    if shared_http_client.is_open:
+        return _LoopBoundProvider(AsyncRequestYaiProvider(), shared_http_client)
+    return RequestYaiProvider()
+
+
+def chunk_audio(first_chunk_path: str, chunk_index: int, chunk_path: str) -> io.BytesIO:
+    """
+    Build a standalone WebM file for one uploaded chunk
+
+    MediaRecorder fragments after the first lack the WebM header, so the
+    initialization segment of chunk 0 is prefixed to them.
+
+    Args:
+        first_chunk_path: Path to chunk 0 of the recording
+        chunk_index: Index of the chunk to transcribe
+        chunk_path: Path to the chunk to transcribe
+
+    Returns:
+        In-memory WebM file
+    """
+    data = b"".join(iter_chunk_bytes([chunk_path]))
+    if chunk_index != 0 and not has_ebml_header(chunk_path):
+        data = webm_init_segment(first_chunk_path) + data
+
+    audio = io.BytesIO(data)
+    audio.name = f"chunk_{chunk_index:04d}.webm"
+    return audio
+
+
+class LiveTranscriber:
+    """
+    Transcribes chunks of opted-in recordings as soon as they are uploaded
+
+    Each chunk's transcript is stored (encrypted) in its own row, so when
+    the recording finishes only chunks that have not been transcribed yet
+    are sent to the provider and the final transcript is a join.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        provider_factory: Callable[[], LLMProvider] = default_chunk_provider_factory,
+    ):
+        self.max_workers = max_workers or settings.LIVE_TRANSCRIPTION_WORKERS
+        self.session_factory = session_factory
+        self.provider_factory = provider_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, List[Future]] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker pool (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="live-transcription",
+                )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def chunk_uploaded(self, recording_id: str, chunk_index: int) -> None:
+        """
+        Queue a freshly stored chunk for transcription
+
+        Args:
+            recording_id: ID of the recording
+            chunk_index: Index of the uploaded chunk
+        """
+        self.start()
+        with self._lock:
+            future = self._executor.submit(self._run, recording_id, chunk_index)
+            self._jobs.setdefault(recording_id, []).append(future)
+        # Outside the lock: the callback runs right here if the job already finished
+        future.add_done_callback(lambda done: self._forget(recording_id, done))
+
+    def complete(
+        self,
+        db: Session,
+        recording_id: str,
+        chunks: List[Tuple[int, str]],
+        llm_provider: LLMProvider
+    ) -> str:
+        """
+        Transcribe any chunks still missing a transcript and join them all
+
+        Args:
+            db: Database session owned by the caller
+            recording_id: ID of the recording
+            chunks: ``(chunk_index, chunk_key)`` pairs for every stored chunk
+            llm_provider: Provider used for chunks not transcribed live
+
+        Returns:
+            Full transcript, chunk transcripts joined in index order
+        """
+        with self._lock:
+            pending = self._jobs.pop(recording_id, [])
+        wait(pending)
+
+        recording_repo = MySQLRecordingRepository(db)
+        transcripts = {
+            chunk_transcript.chunk_index: chunk_transcript.transcription_text
+            for chunk_transcript in recording_repo.get_chunk_transcripts(recording_id)
+        }
+
+        chunks = sorted(chunks)
+        texts = []
+        for chunk_index, chunk_key in chunks:
+            if chunk_index in transcripts:
+                texts.append(encryption_service.decrypt_text(transcripts[chunk_index]))
+                continue
+
+            first_chunk_path = blob_store.local_path(chunks[0][1])
+            with chunk_audio(first_chunk_path, chunk_index, blob_store.local_path(chunk_key)) as audio:
+                text = llm_provider.transcribe_audio(audio)
+            recording_repo.save_chunk_transcript(
+                recording_id, chunk_index, encryption_service.encrypt_text(text)
+            )
+            texts.append(text)
+
+        return " ".join(text.strip() for text in texts if text and text.strip())
+
+    def _forget(self, recording_id: str, future: Future) -> None:
+        # Recordings that are never finished must not keep their futures forever
+        with self._lock:
+            futures = self._jobs.get(recording_id)
+            if futures is None or future not in futures:
+                return
+            futures.remove(future)
+            if not futures:
+                del self._jobs[recording_id]
+
+    def _run(self, recording_id: str, chunk_index: int) -> None:
+        db = self.session_factory()
+        try:
+            recording_repo = MySQLRecordingRepository(db)
+            chunk = recording_repo.get_chunk(recording_id, chunk_index)
+            first_chunk = recording_repo.get_chunk(recording_id, 0)
+            if chunk is None or first_chunk is None:
+                # Chunk 0 has not arrived yet; finishing the recording fills the gap
+                return
+
+            with chunk_audio(
+                blob_store.local_path(first_chunk.audio_blob_path),
+                chunk_index,
+                blob_store.local_path(chunk.audio_blob_path)
+            ) as audio:
+                text = self.provider_factory().transcribe_audio(audio)
+
+            recording_repo.save_chunk_transcript(
+                recording_id, chunk_index, encryption_service.encrypt_text(text)
+            )
+        except Exception:
+            # Live transcription is best effort; finishing the recording retries the chunk
+            logger.exception(
+                "Live transcription failed for recording %s chunk %s", recording_id, chunk_index
+            )
+        finally:
+            db.close()
+
+
+# Global live transcriber instance
+live_transcriber = LiveTranscriber()
@@ -0,0 +1,289 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from jobs.assembly import PARTIAL_FILENAME, STATE_FILENAME
+from repositories.recording_repository import MySQLRecordingRepository
+from storage.blob_store import STAGING_SUFFIX, blob_store
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Local working files: blob store temporaries and staging files, resumable
+# chunk uploads (".part") and the incremental assembler's running file
+WORKING_FILE_SUFFIXES = (".tmp", STAGING_SUFFIX, ".part", ".upload", ".download")
+WORKING_FILENAMES = (PARTIAL_FILENAME, STATE_FILENAME)
+
+EXPIRED_SESSION_MESSAGE = "Recording session expired"
+
+
+class _SweepStopped(Exception):
+    """Raised inside a sweep when the sweeper is shutting down"""
+
+
+class _RateLimiter:
+    """Spaces deletions evenly, so a sweep trickles along beside uploads instead of bursting"""
+
+    def __init__(self, per_second: float, stop: threading.Event):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._stop = stop
+        self._next = time.monotonic()
+
+    def wait(self, count: int = 1) -> None:
+        """Wait for the next slot, then reserve ``count`` deletions"""
+        if self._stop.is_set():
+            raise _SweepStopped()
+        if not self.interval:
+            return
+        delay = self._next - time.monotonic()
+        if delay > 0 and self._stop.wait(delay):
+            raise _SweepStopped()
+        self._next = max(self._next, time.monotonic()) + count * self.interval
+
+
+def _is_working_file(name: str) -> bool:
+    return name in WORKING_FILENAMES or name.endswith(WORKING_FILE_SUFFIXES)
+
+
+class RetentionSweeper:
+    """
+    Background thread that enforces the storage retention policies
+
+    Each sweep:
+
+    - deletes the chunk audio of ended recordings once their encrypted
+      full audio exists (``RETENTION_CHUNK_HOURS`` after they ended);
+      chunk rows are kept for their metadata
+    - expires active and paused recordings with no activity for
+      ``RETENTION_STALE_SESSION_HOURS``: they are marked failed, then
+      their audio is deleted
+    - deletes stored recordings that have no database row, and chunk rows
+      of open recordings whose audio is gone, so the upload manifest asks
+      the client for them again
+    - deletes local working files (staging, temporary and partial upload
+      files, assembly state) untouched for ``RETENTION_ORPHAN_HOURS``
+    - deletes the least recently used local copies of remote blobs beyond
+      the blob store's cache budget (``S3_CACHE_MAX_BYTES``)
+
+    Recordings are processed ``batch_size`` at a time on a single thread
+    and deletions are throttled to ``max_deletes_per_second``, so storage
+    I/O stays available to uploads.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_deletes_per_second: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.interval_seconds = (
+            interval_seconds if interval_seconds is not None
+            else settings.RETENTION_SWEEP_INTERVAL_SECONDS
+        )
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.max_deletes_per_second = (
+            max_deletes_per_second if max_deletes_per_second is not None
+            else settings.RETENTION_MAX_DELETES_PER_SECOND
+        )
+        self.session_factory = session_factory
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the sweeper thread (idempotent; does nothing when the interval is 0)"""
+        with self._lock:
+            if self._thread is None and self.interval_seconds > 0:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="retention-sweeper", daemon=True
+                )
+                self._thread.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the sweeper thread, interrupting a running sweep"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and wait:
+            thread.join()
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Apply every retention policy once
+
+        Returns:
+            Number of items deleted (or expired) per policy
+        """
+        limiter = _RateLimiter(self.max_deletes_per_second, self._stop)
+        report: Dict[str, int] = {}
+        db = self.session_factory()
+        try:
+            recording_repo = MySQLRecordingRepository(db)
+            report["chunks"] = self._purge_archived_chunks(recording_repo, limiter)
+            report["stale_sessions"] = self._expire_stale_sessions(recording_repo, limiter)
+            report["orphaned_recordings"] = self._delete_orphaned_recordings(recording_repo, limiter)
+            report["missing_chunks"] = self._forget_missing_chunks(recording_repo, limiter)
+            report["working_files"] = self._delete_working_files(limiter)
+            report["cached_copies"] = self._trim_blob_cache(limiter)
+        except _SweepStopped:
+            logger.info("Retention sweep interrupted by shutdown")
+        finally:
+            db.close()
+
+        logger.info("Retention sweep finished: %s", report)
+        return report
+
+    def _run(self) -> None:
+        # The first sweep waits one interval, keeping startup I/O free for clients
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Retention sweep failed")
+
+    def _purge_archived_chunks(self, recording_repo: MySQLRecordingRepository, limiter: _RateLimiter) -> int:
+        if settings.RETENTION_CHUNK_HOURS < 0:
+            return 0
+
+        ended_before = datetime.utcnow() - timedelta(hours=settings.RETENTION_CHUNK_HOURS)
+        purged = 0
+        after = None
+        while True:
+            recordings = recording_repo.list_archived_recordings(ended_before, self.batch_size, after)
+            if not recordings:
+                return purged
+
+            for recording in recordings:
+                if not blob_store.exists(recording.audio_file_path):
+                    # The chunks are the only copy of this recording's audio
+                    logger.warning("Keeping chunks of recording %s: its full audio is missing", recording.id)
+                    continue
+                for chunk in recording_repo.get_chunks(recording.id):
+                    limiter.wait()
+                    blob_store.delete(chunk.audio_blob_path)
+                    purged += 1
+                recording_repo.mark_chunks_purged(recording.id)
+            after = (recordings[-1].updated_at, recordings[-1].id)
+
+    def _expire_stale_sessions(self, recording_repo: MySQLRecordingRepository, limiter: _RateLimiter) -> int:
+        if settings.RETENTION_STALE_SESSION_HOURS < 0:
+            return 0
+
+        inactive_since = datetime.utcnow() - timedelta(hours=settings.RETENTION_STALE_SESSION_HOURS)
+        expired = 0
+        while True:
+            recordings = recording_repo.list_stale_sessions(inactive_since, self.batch_size)
+            if not recordings:
+                return expired
+
+            for recording in recordings:
+                limiter.wait()
+                # Status first, and only if still stale: once failed, the recording
+                # accepts no uploads, so deleting its audio cannot race a resume
+                if not recording_repo.expire_session(recording.id, inactive_since, EXPIRED_SESSION_MESSAGE):
+                    continue
+                deleted = blob_store.delete_recording(recording.id)
+                logger.info("Expired stale recording %s (%d files deleted)", recording.id, deleted)
+                expired += 1
+                limiter.wait(deleted)
+
+    def _delete_orphaned_recordings(self, recording_repo: MySQLRecordingRepository, limiter: _RateLimiter) -> int:
+        if settings.RETENTION_ORPHAN_HOURS < 0:
+            return 0
+
+        # Recording rows are committed before any of their audio is written;
+        # the grace period still protects against a database restored from backup
+        modified_before = time.time() - settings.RETENTION_ORPHAN_HOURS * 3600
+        deleted = 0
+        batch: List[str] = []
+        for recording_id, last_modified in blob_store.iter_recordings():
+            if last_modified < modified_before:
+                batch.append(recording_id)
+            if len(batch) >= self.batch_size:
+                deleted += self._delete_unknown_recordings(recording_repo, batch, limiter)
+                batch = []
+        if batch:
+            deleted += self._delete_unknown_recordings(recording_repo, batch, limiter)
+        return deleted
+
+    def _delete_unknown_recordings(
+        self,
+        recording_repo: MySQLRecordingRepository,
+        recording_ids: List[str],
+        limiter: _RateLimiter
+    ) -> int:
+        known = recording_repo.existing_recording_ids(recording_ids)
+        deleted = 0
+        for recording_id in recording_ids:
+            if recording_id in known:
+                continue
+            limiter.wait()
+            removed = blob_store.delete_recording(recording_id)
+            limiter.wait(removed)
+            logger.info("Deleted orphaned audio of recording %s (%d files)", recording_id, removed)
+            deleted += 1
+        return deleted
+
+    def _forget_missing_chunks(self, recording_repo: MySQLRecordingRepository, limiter: _RateLimiter) -> int:
+        forgotten = 0
+        after = None
+        while True:
+            recordings = recording_repo.list_open_recordings(self.batch_size, after)
+            if not recordings:
+                return forgotten
+
+            for recording in recordings:
+                # Chunk rows are written after their audio, so a missing blob is really gone
+                missing = [
+                    chunk.chunk_index
+                    for chunk in recording_repo.get_chunks(recording.id)
+                    if not blob_store.exists(chunk.audio_blob_path)
+                ]
+                if missing:
+                    limiter.wait(len(missing))
+                    forgotten += recording_repo.delete_chunks(recording.id, missing)
+                    logger.warning("Recording %s lost the audio of chunks %s", recording.id, missing)
+            after = recordings[-1].id
+
+    def _delete_working_files(self, limiter: _RateLimiter) -> int:
+        if settings.RETENTION_ORPHAN_HOURS < 0:
+            return 0
+
+        modified_before = time.time() - settings.RETENTION_ORPHAN_HOURS * 3600
+        deleted = 0
+        for directory, _, names in os.walk(settings.AUDIO_STORAGE_PATH):
+            for name in names:
+                if not _is_working_file(name):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) >= modified_before:
+                        continue
+                    limiter.wait()
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                deleted += 1
+        return deleted
+
+    def _trim_blob_cache(self, limiter: _RateLimiter) -> int:
+        deleted = 0
+        for path in blob_store.stale_local_copies():
+            limiter.wait()
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            deleted += 1
+        return deleted
+
+
+# Global retention sweeper instance
+retention_sweeper = RetentionSweeper()
@@ -0,0 +1,207 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from llm.interface import LLMProvider
+from llm.http_client import shared_http_client
+from llm.requestyai_provider import AsyncRequestYaiProvider, RequestYaiProvider
+from llm.segmented_provider import SegmentedTranscriptionProvider
+from llm.transcription_cache import transcription_cache
+from repositories.recording_repository import MySQLRecordingRepository
+from jobs.assembly import incremental_assembler
+from jobs.live_transcription import live_transcriber
+from storage.blob_store import blob_store, full_audio_key
+from utils.audio_utils import transcode_encrypted_audio
+from utils.encryption_utils import encryption_service
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_transcription_job(db: Session, recording_id: str, llm_provider: LLMProvider) -> None:
+    """
+    Assemble and transcribe a finished recording
+
+    Failures are recorded on the recording (status ``failed``) instead of
+    being raised, since there is no request left to report them to.
+
+    Args:
+        db: Database session owned by the caller
+        recording_id: ID of the recording to transcribe
+        llm_provider: Provider used for the transcription
+    """
+    recording_repo = MySQLRecordingRepository(db)
+
+    audio_format = settings.AUDIO_ARCHIVE_FORMAT
+    audio_key = full_audio_key(recording_id, audio_format)
+
+    try:
+        chunks = recording_repo.get_chunks(recording_id)
+        if not chunks:
+            raise ValueError("No audio chunks found for this recording")
+
+        chunk_keys = [(chunk.chunk_index, chunk.audio_blob_path) for chunk in chunks]
+
+        # Append whatever the incremental assembler has not already joined;
+        # the result is written encrypted (HIPAA compliance), converted to
+        # the archival format if that is not the recorded WebM, and handed
+        # to the blob store (a multipart upload on S3)
+        assembled_path = blob_store.staging_path(full_audio_key(recording_id))
+        incremental_assembler.finalize(recording_id, chunk_keys, assembled_path)
+        if audio_format == "webm":
+            staged_path = assembled_path
+        else:
+            staged_path = transcode_encrypted_audio(
+                assembled_path, blob_store.staging_path(audio_key), audio_format
+            )
+            os.remove(assembled_path)
+        blob_store.put_file(audio_key, staged_path)
+
+        recording = recording_repo.get_recording(recording_id)
+        if recording.live_transcription:
+            # Chunks were transcribed as they arrived; only stragglers are left
+            transcription_text = live_transcriber.complete(db, recording_id, chunk_keys, llm_provider)
+        else:
+            encrypted_path = blob_store.local_path(audio_key)
+
+            # Identical audio (a retried finish) is answered from the cache,
+            # keyed by the chunks' checksums rather than by decrypting the
+            # audio an extra time; chunks stored without one are not cached
+            cache_key = None
+            transcription_text = None
+            checksums = [chunk.checksum for chunk in chunks]
+            if transcription_cache.enabled and None not in checksums:
+                cache_key = transcription_cache.key_for_chunks(llm_provider, audio_format, checksums)
+                transcription_text = transcription_cache.get(cache_key)
+
+            if transcription_text is None:
+                # Transcribe using LLM provider, decrypting on the fly
+                audio_name = f"full_audio.{audio_format}"
+                with encryption_service.open_decrypted_reader(encrypted_path, name=audio_name) as audio:
+                    transcription_text = llm_provider.transcribe_audio(audio)
+                if cache_key is not None:
+                    transcription_cache.set(cache_key, transcription_text)
+
+        # Encrypt transcription (HIPAA compliance)
+        encrypted_transcription = encryption_service.encrypt_text_bytes(transcription_text)
+
+        recording_repo.mark_ended(
+            recording_id=recording_id,
+            full_audio_path=audio_key,
+            transcription=encrypted_transcription
+        )
+
+    except Exception as e:
+        logger.exception("Transcription failed for recording %s", recording_id)
+        db.rollback()
+        recording_repo.mark_failed(recording_id, str(e))
+
+
+def default_provider_factory() -> LLMProvider:
+    """Create the production provider: RequestYai behind segmented parallel transcription"""
+    if shared_http_client.is_open:
+        # Segments share the application's pooled keep-alive connections
+        return SegmentedTranscriptionProvider(
+            AsyncRequestYaiProvider(),
+            loop=shared_http_client.loop,
+            cache=transcription_cache
+        )
+    return SegmentedTranscriptionProvider(RequestYaiProvider(), cache=transcription_cache)
+
+
+class TranscriptionQueue:
+    """Pool of background workers that run transcription jobs off the event loop"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        provider_factory: Callable[[], LLMProvider] = default_provider_factory,
+    ):
+        self.max_workers = max_workers or settings.TRANSCRIPTION_WORKERS
+        self.session_factory = session_factory
+        self.provider_factory = provider_factory
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker pool (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="transcription",
+                )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and optionally wait for running ones"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def enqueue(self, recording_id: str) -> bool:
+        """
+        Queue a recording for transcription
+
+        Args:
+            recording_id: ID of the recording to transcribe
+
+        Returns:
+            False if a job for this recording is already pending, True otherwise
+        """
+        self.start()
+        with self._lock:
+            if self.is_pending(recording_id):
+                return False
+            future = self._executor.submit(self._run, recording_id)
+            self._jobs[recording_id] = future
+        future.add_done_callback(lambda _: self._forget(recording_id, future))
+        return True
+
+    def recover(self) -> int:
+        """
+        Re-queue recordings a previous process left in ``transcribing``
+
+        Jobs only live in memory, so without this a restart or crash during
+        a job would leave its recording transcribing for good.
+
+        Returns:
+            Number of recordings queued
+        """
+        db = self.session_factory()
+        try:
+            recording_ids = MySQLRecordingRepository(db).list_transcribing_recording_ids()
+        finally:
+            db.close()
+
+        queued = sum(self.enqueue(recording_id) for recording_id in recording_ids)
+        if queued:
+            logger.info("Re-queued %d interrupted transcription job(s)", queued)
+        return queued
+
+    def is_pending(self, recording_id: str) -> bool:
+        """Check whether a job for this recording is queued or running"""
+        future = self._jobs.get(recording_id)
+        return future is not None and not future.done()
+
+    def _forget(self, recording_id: str, future: Future) -> None:
+        with self._lock:
+            if self._jobs.get(recording_id) is future:
+                del self._jobs[recording_id]
+
+    def _run(self, recording_id: str) -> None:
+        db = self.session_factory()
+        try:
+            run_transcription_job(db, recording_id, self.provider_factory())
+        finally:
+            db.close()
+
+
+# Global transcription queue instance
+transcription_queue = TranscriptionQueue()
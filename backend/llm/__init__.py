@@ -1,4 +1,28 @@
-from llm.interface import LLMProvider
-from llm.requestyai_provider import RequestYaiProvider, MockLLMProvider
+from llm.interface import LLMProvider, AsyncLLMProvider
+from llm.http_client import SharedHTTPClient, shared_http_client
+from llm.requestyai_provider import RequestYaiProvider, AsyncRequestYaiProvider, MockLLMProvider
+from llm.transcription_cache import (
+    TranscriptionCache,
+    MemoryCacheBackend,
+    EncryptedFileCacheBackend,
+    DatabaseCacheBackend,
+    transcription_cache,
+)
+from llm.segmented_provider import SegmentedTranscriptionProvider, stitch_transcripts
 
-__all__ = ["LLMProvider", "RequestYaiProvider", "MockLLMProvider"]
+__all__ = [
+    "LLMProvider",
+    "AsyncLLMProvider",
+    "SharedHTTPClient",
+    "shared_http_client",
+    "RequestYaiProvider",
+    "AsyncRequestYaiProvider",
+    "MockLLMProvider",
+    "SegmentedTranscriptionProvider",
+    "stitch_transcripts",
+    "TranscriptionCache",
+    "MemoryCacheBackend",
+    "EncryptedFileCacheBackend",
+    "DatabaseCacheBackend",
+    "transcription_cache",
+]
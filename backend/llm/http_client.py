@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from concurrent.futures import Future
+from typing import Coroutine, Optional
+import httpx
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SharedHTTPClient:
+    """
+    One pooled ``httpx.AsyncClient`` shared by every outbound LLM call
+
+    Opened and closed with the application so connections (and their
+    TLS sessions) are kept alive and reused across requests. Code running
+    outside the event loop, such as background transcription jobs, can
+    schedule coroutines onto the client's loop with ``submit``.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Shared HTTP client is not open")
+        return self._client
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            raise RuntimeError("Shared HTTP client is not open")
+        return self._loop
+
+    async def open(self) -> httpx.AsyncClient:
+        """Create the client on the running event loop (idempotent)"""
+        if self._client is None:
+            http2 = _http2_available()
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=10.0),
+            )
+            self._loop = asyncio.get_running_loop()
+            logger.info("Shared LLM HTTP client opened (http2=%s)", http2)
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        Schedule a coroutine on the client's event loop from another thread
+
+        Args:
+            coro: Coroutine that uses the shared client
+
+        Returns:
+            Future resolving to the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+# Global shared HTTP client instance
+shared_http_client = SharedHTTPClient()
@@ -1,15 +1,32 @@
-from typing import Protocol
+from typing import BinaryIO, Protocol, Union
 
 
 class LLMProvider(Protocol):
     """Interface for LLM transcription providers"""
 
-    def transcribe_audio(self, audio_path: str) -> str:
+    def transcribe_audio(self, audio: Union[str, BinaryIO]) -> str:
         """
-        Takes a path to an audio file and returns transcription text.
+        Takes an audio file and returns transcription text.
 
         Args:
-            audio_path: Path to the audio file to transcribe
+            audio: Path to the audio file, or a readable binary file object
+                (e.g. a decrypt-on-read stream over encrypted storage)
+
+        Returns:
+            Transcribed text from the audio file
+        """
+        ...
+
+
+class AsyncLLMProvider(Protocol):
+    """Interface for LLM transcription providers with non-blocking I/O"""
+
+    async def transcribe_audio(self, audio: Union[str, BinaryIO]) -> str:
+        """
+        Takes an audio file and returns transcription text.
+
+        Args:
+            audio: Path to the audio file, or a readable binary file object
 
         Returns:
             Transcribed text from the audio file
@@ -1,5 +1,9 @@
+import os
+import asyncio
+import httpx
 import requests
-from typing import Optional
+from typing import AsyncIterator, BinaryIO, Optional, Tuple, Union
+from llm.http_client import shared_http_client
 from config import settings
 
 
@@ -8,14 +12,15 @@ class RequestYaiProvider:
 
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or settings.LLM_API_KEY
-        self.api_url = "https://api.requestyai.com/v1/transcribe"  # Placeholder URL
+        self.api_url = settings.LLM_API_URL
+        self.cache_namespace = f"requestyai:{settings.LLM_MODEL_VERSION}"
 
-    def transcribe_audio(self, audio_path: str) -> str:
+    def transcribe_audio(self, audio: Union[str, BinaryIO]) -> str:
         """
         Transcribe audio file using RequestYai API
 
         Args:
-            audio_path: Path to the audio file to transcribe
+            audio: Path to the audio file, or a readable binary file object
 
         Returns:
             Transcribed text from the audio file
@@ -24,49 +29,166 @@ class RequestYaiProvider:
             Exception: If transcription fails
         """
         try:
-            # Open audio file
-            with open(audio_path, 'rb') as audio_file:
-                files = {'file': audio_file}
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}'
-                }
+            if isinstance(audio, str):
+                with open(audio, 'rb') as audio_file:
+                    return self._transcribe(audio_file)
+            return self._transcribe(audio)
 
-                # Make API request
-                response = requests.post(
-                    self.api_url,
-                    files=files,
-                    headers=headers,
-                    timeout=300  # 5 minutes timeout for long audio files
-                )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"RequestYai API error: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Transcription failed: {str(e)}")
 
-                response.raise_for_status()
+    def _transcribe(self, audio_file: BinaryIO) -> str:
+        filename = os.path.basename(getattr(audio_file, 'name', 'audio'))
+        files = {'file': (filename, audio_file)}
+        headers = {
+            'Authorization': f'Bearer {self.api_key}'
+        }
 
-                # Parse response
-                result = response.json()
-                transcription = result.get('transcription', result.get('text', ''))
+        # Make API request
+        response = requests.post(
+            self.api_url,
+            files=files,
+            headers=headers,
+            timeout=300  # 5 minutes timeout for long audio files
+        )
 
-                if not transcription:
-                    raise ValueError("No transcription returned from API")
+        response.raise_for_status()
 
-                return transcription
+        # Parse response
+        result = response.json()
+        transcription = result.get('transcription', result.get('text', ''))
 
-        except requests.exceptions.RequestException as e:
+        if not transcription:
+            raise ValueError("No transcription returned from API")
+
+        return transcription
+
+
+# Audio is streamed to the API in blocks of this size
+UPLOAD_BLOCK_SIZE = 64 * 1024
+
+
+def _upload_size(audio_file: BinaryIO) -> Optional[int]:
+    """Return the bytes left in a seekable file, or None if its length is unknown"""
+    seekable = getattr(audio_file, 'seekable', None)
+    if seekable is None or not seekable():
+        return None
+    position = audio_file.tell()
+    size = audio_file.seek(0, os.SEEK_END) - position
+    audio_file.seek(position)
+    return size
+
+
+def _multipart_envelope(boundary: str, filename: str) -> Tuple[bytes, bytes]:
+    """Return the multipart/form-data bytes before and after the file field's content"""
+    filename = filename.replace('\\', '\\\\').replace('"', '%22')
+    head = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        'Content-Type: application/octet-stream\r\n\r\n'
+    )
+    return head.encode(), f'\r\n--{boundary}--\r\n'.encode()
+
+
+async def _stream_upload(audio_file: BinaryIO, head: bytes, tail: bytes) -> AsyncIterator[bytes]:
+    """Yield a multipart body, reading (and decrypting) the file off the event loop"""
+    yield head
+    while True:
+        block = await asyncio.to_thread(audio_file.read, UPLOAD_BLOCK_SIZE)
+        if not block:
+            break
+        yield block
+    yield tail
+
+
+class AsyncRequestYaiProvider:
+    """RequestYai implementation of the async LLM transcription provider"""
+
+    def __init__(self, api_key: Optional[str] = None, client: Optional[httpx.AsyncClient] = None):
+        self.api_key = api_key or settings.LLM_API_KEY
+        self.api_url = settings.LLM_API_URL
+        self.cache_namespace = f"requestyai:{settings.LLM_MODEL_VERSION}"
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Default to the application-wide pooled client
+        return self._client or shared_http_client.client
+
+    async def transcribe_audio(self, audio: Union[str, BinaryIO]) -> str:
+        """
+        Transcribe audio file using RequestYai API without blocking the event loop
+
+        Args:
+            audio: Path to the audio file, or a readable binary file object
+
+        Returns:
+            Transcribed text from the audio file
+
+        Raises:
+            Exception: If transcription fails
+        """
+        try:
+            if isinstance(audio, str):
+                audio_file = await asyncio.to_thread(open, audio, 'rb')
+                try:
+                    response = await self._post(audio_file)
+                finally:
+                    audio_file.close()
+            else:
+                response = await self._post(audio)
+            response.raise_for_status()
+
+            result = response.json()
+            transcription = result.get('transcription', result.get('text', ''))
+
+            if not transcription:
+                raise ValueError("No transcription returned from API")
+
+            return transcription
+
+        except httpx.HTTPError as e:
             raise Exception(f"RequestYai API error: {str(e)}")
         except Exception as e:
             raise Exception(f"Transcription failed: {str(e)}")
 
+    async def _post(self, audio_file: BinaryIO) -> httpx.Response:
+        # The body is streamed from the file rather than read into memory first
+        boundary = os.urandom(16).hex()
+        head, tail = _multipart_envelope(boundary, os.path.basename(getattr(audio_file, 'name', 'audio')))
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+        }
+
+        # Streams of unknown length (decrypt-on-read files) are sent chunked
+        size = await asyncio.to_thread(_upload_size, audio_file)
+        if size is not None:
+            headers['Content-Length'] = str(len(head) + size + len(tail))
+
+        return await self.client.post(
+            self.api_url,
+            content=_stream_upload(audio_file, head, tail),
+            headers=headers,
+        )
+
 
 class MockLLMProvider:
     """Mock LLM provider for testing purposes"""
 
-    def transcribe_audio(self, audio_path: str) -> str:
+    cache_namespace = "mock"
+
+    def transcribe_audio(self, audio: Union[str, BinaryIO]) -> str:
         """
         Mock transcription that returns a placeholder text
 
         Args:
-            audio_path: Path to the audio file (unused in mock)
+            audio: Path to the audio file or a file object (unused in mock)
 
         Returns:
             Mock transcription text
         """
-        return f"[Mock transcription for {audio_path}] This is a sample transcription of the audio file. In a real implementation, this would contain the actual transcribed text from the RequestYai API."
+        name = audio if isinstance(audio, str) else getattr(audio, 'name', 'audio stream')
+        return f"[Mock transcription for {name}] This is a sample transcription of the audio file. In a real implementation, this would contain the actual transcribed text from the RequestYai API."
@@ -0,0 +1,209 @@
+import io
+import re
+import math
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Union
+from llm.interface import AsyncLLMProvider, LLMProvider
+from llm.transcription_cache import TranscriptionCache, provider_cache_namespace
+from utils.audio_utils import iter_pcm, pcm_to_wav, split_pcm_segments
+from config import settings
+
+
+# Upper bound on speech rate, used to turn the overlap length into words
+MAX_WORDS_PER_SECOND = 4
+
+# Longest run of words accepted as overlap when no overlap length is given
+MAX_OVERLAP_WORDS = 60
+
+# Fewer matching words than this is treated as coincidence, not overlap
+MIN_OVERLAP_WORDS = 2
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def overlap_words(overlap_seconds: float) -> int:
+    """Most words a speaker can fit into ``overlap_seconds`` of audio"""
+    return math.ceil(overlap_seconds * MAX_WORDS_PER_SECOND)
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = MAX_OVERLAP_WORDS) -> str:
+    """
+    Join segment transcripts, dropping text repeated in the overlaps
+
+    Overlapping audio is transcribed twice: at the end of one segment and
+    at the start of the next. Only that shape is accepted as overlap, the
+    longest run of words (``MIN_OVERLAP_WORDS`` to ``max_overlap_words``)
+    that ends the transcript so far and starts the next segment; words the
+    two merely share elsewhere are kept. Segments with no such run are
+    joined unchanged.
+
+    Args:
+        texts: Transcripts of consecutive overlapping segments, in order
+        max_overlap_words: Longest overlap accepted, in words
+
+    Returns:
+        Single stitched transcript
+    """
+    words: List[str] = []
+
+    for text in texts:
+        new_words = text.split()
+        if not words:
+            words = new_words
+            continue
+
+        longest = min(max_overlap_words, len(words), len(new_words))
+        tail = [_normalize_word(word) for word in words[-longest:]] if longest else []
+        head = [_normalize_word(word) for word in new_words[:longest]]
+        overlap = next(
+            (size for size in range(longest, MIN_OVERLAP_WORDS - 1, -1) if tail[-size:] == head[:size]),
+            0,
+        )
+        # The next segment's copy wins: it heard the overlap with more context after it
+        words = words[:len(words) - overlap] + new_words
+
+    return " ".join(words)
+
+
+class SegmentedTranscriptionProvider:
+    """
+    Transcribes long audio as overlapping segments in parallel
+
+    Wraps any LLMProvider. The audio is decoded once, split on quiet spots
+    into fixed-length windows that overlap their neighbours, and each
+    window is sent to the wrapped provider as a WAV file with at most
+    ``max_concurrency`` requests in flight. End-to-end time therefore
+    scales with the concurrency limit rather than recording length.
+
+    An AsyncLLMProvider is driven on ``loop`` (the loop owning its HTTP
+    client), so ``transcribe_audio`` must then be called from another
+    thread, as the background transcription workers do.
+
+    With a ``cache``, segments whose PCM was transcribed before by the same
+    provider are answered from the cache instead of being sent again.
+    """
+
+    def __init__(
+        self,
+        provider: Union[LLMProvider, AsyncLLMProvider],
+        segment_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        cache: Optional[TranscriptionCache] = None
+    ):
+        self.provider = provider
+        self.loop = loop
+        self.cache = cache
+        self._is_async = inspect.iscoroutinefunction(provider.transcribe_audio)
+        if self._is_async and loop is None:
+            raise ValueError("An event loop is required to drive an async provider")
+        self.segment_seconds = segment_seconds or settings.TRANSCRIPTION_SEGMENT_SECONDS
+        self.overlap_seconds = (
+            overlap_seconds if overlap_seconds is not None
+            else settings.TRANSCRIPTION_SEGMENT_OVERLAP_SECONDS
+        )
+        self.max_concurrency = max_concurrency or settings.TRANSCRIPTION_MAX_CONCURRENCY
+
+        # Stitched output depends on how the audio was segmented
+        self.cache_namespace = (
+            f"{provider_cache_namespace(provider)}"
+            f"/segments:{self.segment_seconds}:{self.overlap_seconds}"
+        )
+
+    def transcribe_audio(self, audio: Union[str, BinaryIO]) -> str:
+        """
+        Transcribe audio by segments and stitch the results
+
+        Args:
+            audio: Path to the audio file, or a readable binary file object
+
+        Returns:
+            Transcribed text from the audio file
+        """
+        pcm_blocks = iter_pcm(audio)
+        try:
+            return self.transcribe_pcm(pcm_blocks)
+        finally:
+            # Stops ffmpeg early if a segment failed
+            pcm_blocks.close()
+
+    def transcribe_pcm(self, pcm_blocks: Iterator[bytes]) -> str:
+        """
+        Transcribe an already decoded mono 16-bit PCM stream
+
+        Args:
+            pcm_blocks: Iterator of PCM blocks at the default sample rate
+
+        Returns:
+            Stitched transcription text
+        """
+        segments = split_pcm_segments(pcm_blocks, self.segment_seconds, self.overlap_seconds)
+
+        # Decoding waits for a free slot, so at most max_concurrency
+        # segments are held in memory at once
+        slots = threading.BoundedSemaphore(self.max_concurrency)
+        failed = threading.Event()
+        futures = []
+
+        def on_done(future) -> None:
+            slots.release()
+            if not future.cancelled() and future.exception() is not None:
+                failed.set()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="segment") as pool:
+            try:
+                for index, (_, pcm) in enumerate(segments):
+                    slots.acquire()
+                    if failed.is_set():
+                        # Stop decoding; the failure is raised below
+                        slots.release()
+                        break
+                    future = self._submit(pool, index, pcm)
+                    future.add_done_callback(on_done)
+                    futures.append(future)
+
+                texts = [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return stitch_transcripts(texts, overlap_words(self.overlap_seconds))
+
+    def _submit(self, pool: ThreadPoolExecutor, index: int, pcm: bytes) -> Future:
+        cache_key = None
+        if self.cache is not None and self.cache.enabled:
+            cache_key = self.cache.key_for(self.provider, [pcm])
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+        if self._is_async:
+            coro = self.provider.transcribe_audio(self._segment_file(index, pcm))
+            future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        else:
+            future = pool.submit(self._transcribe_segment, index, pcm)
+
+        if cache_key is not None:
+            future.add_done_callback(lambda done: self._store(cache_key, done))
+        return future
+
+    def _store(self, cache_key: str, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.cache.set(cache_key, future.result())
+
+    def _transcribe_segment(self, index: int, pcm: bytes) -> str:
+        return self.provider.transcribe_audio(self._segment_file(index, pcm))
+
+    def _segment_file(self, index: int, pcm: bytes) -> io.BytesIO:
+        segment = io.BytesIO(pcm_to_wav(pcm))
+        segment.name = f"segment_{index:04d}.wav"
+        return segment
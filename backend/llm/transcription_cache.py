@@ -0,0 +1,262 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Protocol
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from repositories.transcription_cache_repository import MySQLTranscriptionCacheRepository
+from utils.encryption_utils import encryption_service
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def provider_cache_namespace(provider) -> str:
+    """
+    Identify the provider (and model version) a transcription came from
+
+    Providers may set a ``cache_namespace`` attribute; anything else is
+    keyed by its class name.
+    """
+    return getattr(provider, "cache_namespace", None) or type(provider).__name__
+
+
+class TranscriptionCacheBackend(Protocol):
+    """Interface for transcription cache storage"""
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached transcription, or None on a miss"""
+        ...
+
+    def set(self, key: str, transcription: str) -> None:
+        """Store a transcription, evicting least recently used entries if full"""
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache bounded by number of entries"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else settings.TRANSCRIPTION_CACHE_MAX_ENTRIES
+        )
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            transcription = self._entries.get(key)
+            if transcription is not None:
+                self._entries.move_to_end(key)
+            return transcription
+
+    def set(self, key: str, transcription: str) -> None:
+        with self._lock:
+            self._entries[key] = transcription
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class EncryptedFileCacheBackend:
+    """
+    On-disk cache with one encrypted file per entry, bounded by total size
+
+    Recency is tracked through file modification times, so the LRU order
+    survives restarts and is shared by every worker using the directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or settings.TRANSCRIPTION_CACHE_PATH
+        self.max_bytes = (
+            max_bytes if max_bytes is not None
+            else settings.TRANSCRIPTION_CACHE_MAX_BYTES
+        )
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                encrypted = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return encryption_service.decrypt_text(encrypted)
+
+    def set(self, key: str, transcription: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        # Encrypt transcription (HIPAA compliance)
+        with open(tmp_path, "w") as f:
+            f.write(encryption_service.encrypt_text(transcription))
+
+        with self._lock:
+            size = self._current_size()
+            if os.path.exists(path):
+                size -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._size = size + os.path.getsize(path)
+            if self._size > self.max_bytes:
+                self._evict(keep=path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.enc")
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".enc")]
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        return self._size
+
+    def _evict(self, keep: str) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.max_bytes:
+                break
+            if entry.path == keep:
+                # The entry just written stays even if it alone exceeds the limit
+                continue
+            size -= entry.stat().st_size
+            os.remove(entry.path)
+        self._size = size
+
+
+class DatabaseCacheBackend:
+    """Cache stored in the transcription_cache table, shared across hosts"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else settings.TRANSCRIPTION_CACHE_MAX_ENTRIES
+        )
+        self.session_factory = session_factory
+
+    def get(self, key: str) -> Optional[str]:
+        db = self.session_factory()
+        try:
+            entry = MySQLTranscriptionCacheRepository(db).get_entry(key)
+            return encryption_service.decrypt_text(entry.transcription_text) if entry else None
+        finally:
+            db.close()
+
+    def set(self, key: str, transcription: str) -> None:
+        db = self.session_factory()
+        try:
+            cache_repo = MySQLTranscriptionCacheRepository(db)
+            # Encrypt transcription (HIPAA compliance)
+            cache_repo.save_entry(key, encryption_service.encrypt_text(transcription))
+            cache_repo.evict(self.max_entries)
+        finally:
+            db.close()
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of transcriptions
+
+    Keys are a SHA-256 over the provider namespace and the audio bytes, so
+    identical audio sent to the same provider and model version is only
+    transcribed once. Cache failures are logged and treated as misses.
+    """
+
+    def __init__(self, backend: Optional[TranscriptionCacheBackend]):
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key_for(self, provider, audio_blocks: Iterable[bytes]) -> str:
+        """
+        Compute the cache key for audio sent to a provider
+
+        Args:
+            provider: Provider that would transcribe the audio
+            audio_blocks: The audio content, in one or more blocks
+
+        Returns:
+            Hex SHA-256 cache key
+        """
+        digest = hashlib.sha256(provider_cache_namespace(provider).encode() + b"\0")
+        for block in audio_blocks:
+            digest.update(block)
+        return digest.hexdigest()
+
+    def key_for_chunks(self, provider, audio_format: str, checksums: Iterable[str]) -> str:
+        """
+        Compute the cache key for a recording assembled from stored chunks
+
+        Assembly is deterministic, so the chunks' plaintext SHA-256 checksums
+        (in chunk order) and the archive format identify the audio without
+        reading it again.
+
+        Args:
+            provider: Provider that would transcribe the audio
+            audio_format: Archive format the chunks were assembled into
+            checksums: Hex checksums of every chunk, in chunk order
+
+        Returns:
+            Hex SHA-256 cache key
+        """
+        blocks = [f"chunks:{audio_format}".encode()]
+        blocks.extend(f"\0{checksum}".encode() for checksum in checksums)
+        return self.key_for(provider, blocks)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached transcription, or None on a miss"""
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.get(key)
+        except Exception:
+            logger.exception("Transcription cache lookup failed")
+            return None
+
+    def set(self, key: str, transcription: str) -> None:
+        """Store a transcription"""
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, transcription)
+        except Exception:
+            logger.exception("Transcription cache store failed")
+
+
+def create_cache_backend(name: str) -> Optional[TranscriptionCacheBackend]:
+    """
+    Create the cache backend selected in settings
+
+    Args:
+        name: "file", "memory", "database" or "none"
+
+    Returns:
+        Backend instance, or None when caching is disabled
+    """
+    if name == "file":
+        return EncryptedFileCacheBackend()
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "database":
+        return DatabaseCacheBackend()
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown transcription cache backend: {name}")
+
+
+# Global transcription cache instance
+transcription_cache = TranscriptionCache(create_cache_backend(settings.TRANSCRIPTION_CACHE_BACKEND))
@@ -2,9 +2,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 import os
+import asyncio
 import logging
-from database import init_db
+from database import async_engine, engine, init_db
 from routers import auth, recordings
+from jobs.assembly import incremental_assembler
+from jobs.live_transcription import live_transcriber
+from jobs.retention import retention_sweeper
+from jobs.transcription import transcription_queue
+from llm.http_client import shared_http_client
+from utils.blocking_io import blocking_io
+from utils.pool_stats import pool_stats
 from config import settings
 
 # Configure logging
@@ -46,6 +54,19 @@ async def startup_event():
     # Create audio storage directory
     os.makedirs(settings.AUDIO_STORAGE_PATH, exist_ok=True)
 
+    # Open the pooled HTTP client used for LLM calls
+    await shared_http_client.open()
+
+    # Start upload I/O pools and background assembly and transcription workers
+    blocking_io.start()
+    incremental_assembler.start()
+    live_transcriber.start()
+    transcription_queue.start()
+    retention_sweeper.start()
+
+    # Finish recordings whose transcription was interrupted by a restart
+    transcription_queue.recover()
+
     # Validate OAuth configuration
     if not settings.GOOGLE_CLIENT_ID or not settings.GOOGLE_CLIENT_SECRET:
         logger.warning(
@@ -56,6 +77,20 @@ async def startup_event():
         logger.info("Google OAuth configured successfully")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources on shutdown"""
+    # A running retention sweep stops at its next deletion
+    await asyncio.to_thread(retention_sweeper.shutdown, True)
+    # Let in-flight transcriptions finish before exiting; wait off the loop
+    # because their LLM requests still run on it
+    await asyncio.to_thread(transcription_queue.shutdown, True)
+    await asyncio.to_thread(live_transcriber.shutdown, True)
+    await asyncio.to_thread(incremental_assembler.shutdown, True)
+    await asyncio.to_thread(blocking_io.shutdown, True)
+    await shared_http_client.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -68,5 +103,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Health check endpoint, with database pool usage so exhaustion under load is visible"""
+    return {
+        "status": "healthy",
+        "database_pools": {
+            "sync": pool_stats(engine),
+            "async": pool_stats(async_engine),
+        },
+    }
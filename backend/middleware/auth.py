@@ -1,23 +1,61 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from database import get_db
+from database import get_async_db
 from models.user import User
-from repositories.user_repository import MySQLUserRepository
+from repositories.async_user_repository import AsyncMySQLUserRepository
 from utils.jwt_utils import decode_access_token
+from utils.principal_cache import principal_cache
 
 
 security = HTTPBearer()
 
 
+def _user_id_from_token(token: str) -> str:
+    """Validate a token and return the user ID in its subject claim"""
+    payload = decode_access_token(token)
+    user_id: Optional[str] = payload.get("sub") if payload is not None else None
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> str:
+    """
+    Dependency to get the current user's ID from the JWT claims alone
+
+    No database lookup is made, so routes that only compare ownership
+    can authorize without loading the User row.
+
+    Args:
+        credentials: HTTP Bearer token from Authorization header
+
+    Returns:
+        Authenticated user ID
+
+    Raises:
+        HTTPException: If token is invalid
+    """
+    return _user_id_from_token(credentials.credentials)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Dependency to get the current authenticated user from JWT token
 
+    Users are served from the principal cache when possible, so the
+    database is only queried on a miss.
+
     Args:
         credentials: HTTP Bearer token from Authorization header
         db: Database session
@@ -28,28 +66,15 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
+    user_id = _user_id_from_token(credentials.credentials)
 
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user_id: Optional[str] = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
 
     # Get user from database
-    user_repo = MySQLUserRepository(db)
-    user = user_repo.get_user_by_id(user_id)
+    user_repo = AsyncMySQLUserRepository(db)
+    user = await user_repo.get_user_by_id(user_id)
 
     if user is None:
         raise HTTPException(
@@ -58,4 +83,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Detach so later requests never touch this request's session
+    db.expunge(user)
+    principal_cache.set(user)
     return user
@@ -1,4 +1,5 @@
 from models.user import User
-from models.recording import Recording, RecordingChunk
+from models.recording import Recording, RecordingChunk, ChunkTranscript
+from models.transcription_cache import TranscriptionCacheEntry
 
-__all__ = ["User", "Recording", "RecordingChunk"]
+__all__ = ["User", "Recording", "RecordingChunk", "ChunkTranscript", "TranscriptionCacheEntry"]
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Integer, Float
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Integer, BigInteger, Float, Boolean, LargeBinary, UniqueConstraint, Index
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -10,10 +11,16 @@ class RecordingStatus(enum.Enum):
     active = "active"
     paused = "paused"
     ended = "ended"
+    transcribing = "transcribing"
+    failed = "failed"
 
 
 class Recording(Base):
     __tablename__ = "recordings"
+    __table_args__ = (
+        # Keyset pagination of a user's recordings, newest first
+        Index("ix_recordings_user_created_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -21,9 +28,21 @@ class Recording(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     audio_file_path = Column(String(512), nullable=True)
-    transcription_text = Column(Text, nullable=True)
+    # Encrypted transcription as raw bytes (HIPAA compliance); MEDIUMBLOB on MySQL
+    # since a long recording's transcript can exceed BLOB's 64 KB
+    transcription_ciphertext = Column(LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"), nullable=True)
+    transcription_text = Column(Text, nullable=True)  # Legacy base64 encrypted form; see commands.migrate_transcripts
     llm_provider = Column(String(50), default="requestyai", nullable=False)
     notes = Column(Text, nullable=True)  # Enhancement: allow user notes on recording
+    error_message = Column(Text, nullable=True)  # Set when background transcription fails
+    live_transcription = Column(Boolean, default=False, nullable=False)  # Transcribe chunks as they arrive
+    chunks_purged_at = Column(DateTime, nullable=True)  # Chunk audio deleted by the retention sweeper
+
+    # Aggregates over recording_chunks, kept current by the repositories' add_chunks
+    chunks_count = Column(Integer, default=0, nullable=False)
+    total_duration_seconds = Column(Float, default=0.0, nullable=False)
+    total_bytes = Column(BigInteger, default=0, nullable=False)
+    last_chunk_index = Column(Integer, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="recordings")
@@ -37,21 +56,37 @@ class Recording(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "audio_file_path": self.audio_file_path,
-            "transcription_text": self.transcription_text,
             "llm_provider": self.llm_provider,
             "notes": self.notes,
-            "chunks_count": len(self.chunks) if self.chunks else 0,
+            "error_message": self.error_message,
+            "live_transcription": self.live_transcription,
+            "chunks_purged_at": self.chunks_purged_at.isoformat() if self.chunks_purged_at else None,
+            "chunks_count": self.chunks_count or 0,
+            "total_duration_seconds": self.total_duration_seconds or 0.0,
+            "total_bytes": self.total_bytes or 0,
+            "last_chunk_index": self.last_chunk_index,
         }
 
 
 class RecordingChunk(Base):
     __tablename__ = "recording_chunks"
+    __table_args__ = (
+        # Re-uploading an index replaces the chunk instead of adding a row
+        UniqueConstraint(
+            "recording_id", "chunk_index",
+            name="uq_recording_chunks_recording_chunk",
+            # Duplicates from before the constraint: the last upload is the stored audio
+            info={"keep_latest": "uploaded_at"},
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     recording_id = Column(String(36), ForeignKey("recordings.id", ondelete="CASCADE"), nullable=False, index=True)
     chunk_index = Column(Integer, nullable=False)
     audio_blob_path = Column(String(512), nullable=False)
     duration_seconds = Column(Float, nullable=True)
+    size_bytes = Column(Integer, nullable=True)  # Plaintext size
+    checksum = Column(String(64), nullable=True)  # Hex SHA-256 of the plaintext
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
@@ -64,5 +99,29 @@ class RecordingChunk(Base):
             "chunk_index": self.chunk_index,
             "audio_blob_path": self.audio_blob_path,
             "duration_seconds": self.duration_seconds,
+            "size_bytes": self.size_bytes,
+            "checksum": self.checksum,
             "uploaded_at": self.uploaded_at.isoformat() if self.uploaded_at else None,
         }
+
+
+class ChunkTranscript(Base):
+    __tablename__ = "chunk_transcripts"
+    __table_args__ = (
+        UniqueConstraint("recording_id", "chunk_index", name="uq_chunk_transcripts_recording_chunk"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    recording_id = Column(String(36), ForeignKey("recordings.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    transcription_text = Column(Text, nullable=True)  # Encrypted, like Recording.transcription_text
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "recording_id": self.recording_id,
+            "chunk_index": self.chunk_index,
+            "transcription_text": self.transcription_text,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
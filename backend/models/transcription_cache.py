@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+from database import Base
+
+
+class TranscriptionCacheEntry(Base):
+    __tablename__ = "transcription_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # SHA-256 of provider namespace and audio content
+    transcription_text = Column(Text, nullable=False)  # Encrypted
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            "cache_key": self.cache_key,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "last_used_at": self.last_used_at.isoformat() if self.last_used_at else None,
+        }
@@ -1,4 +1,15 @@
+from repositories.chunk_upsert import ChunkUpload
 from repositories.user_repository import MySQLUserRepository
 from repositories.recording_repository import MySQLRecordingRepository
+from repositories.transcription_cache_repository import MySQLTranscriptionCacheRepository
+from repositories.async_user_repository import AsyncMySQLUserRepository
+from repositories.async_recording_repository import AsyncMySQLRecordingRepository
 
-__all__ = ["MySQLUserRepository", "MySQLRecordingRepository"]
+__all__ = [
+    "ChunkUpload",
+    "MySQLUserRepository",
+    "MySQLRecordingRepository",
+    "MySQLTranscriptionCacheRepository",
+    "AsyncMySQLUserRepository",
+    "AsyncMySQLRecordingRepository",
+]
@@ -0,0 +1,212 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple, Union
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.recording import Recording, RecordingChunk, RecordingStatus, ChunkTranscript
+from repositories.chunk_upsert import (
+    ChunkUpload,
+    chunk_upsert_statement,
+    recording_aggregates_statement,
+    stale_transcripts_statement,
+)
+from repositories.recording_summaries import recording_summaries_statement
+from utils.transcript_cache import transcript_cache
+
+
+class AsyncMySQLRecordingRepository:
+    """
+    MySQL implementation of AsyncRecordingRepository
+
+    Lazy loading is not available on an AsyncSession, so relationships are
+    never touched; chunks are read with get_chunks and counts come from the
+    recordings' aggregate columns.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _select_recordings(self):
+        return select(Recording).execution_options(populate_existing=True)
+
+    async def create_recording(self, user_id: str, live_transcription: bool = False) -> Recording:
+        """Create a new recording session"""
+        recording = Recording(
+            user_id=user_id,
+            status=RecordingStatus.active,
+            live_transcription=live_transcription
+        )
+        self.db.add(recording)
+        await self.db.commit()
+        return await self.get_recording(recording.id)
+
+    async def get_recording(self, recording_id: str) -> Optional[Recording]:
+        """Get recording by ID"""
+        result = await self.db.execute(self._select_recordings().where(Recording.id == recording_id))
+        return result.scalars().first()
+
+    async def list_recordings(self, user_id: str) -> List[Recording]:
+        """List all recordings for a user"""
+        result = await self.db.execute(
+            self._select_recordings()
+            .where(Recording.user_id == user_id)
+            .order_by(Recording.created_at.desc())
+        )
+        return list(result.scalars().all())
+
+    async def list_recording_summaries(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None,
+        include_transcription: bool = False
+    ) -> List[Row]:
+        """List one keyset page of a user's recordings as summary rows, newest first"""
+        statement = recording_summaries_statement(user_id, limit, before, include_transcription)
+        result = await self.db.execute(statement)
+        return list(result.all())
+
+    async def add_chunk(
+        self,
+        recording_id: str,
+        chunk_path: str,
+        chunk_index: int,
+        duration_seconds: Optional[float] = None,
+        size_bytes: Optional[int] = None,
+        checksum: Optional[str] = None
+    ) -> RecordingChunk:
+        """Add an audio chunk to a recording, replacing any chunk with the same index"""
+        chunk = ChunkUpload(chunk_index, chunk_path, duration_seconds, size_bytes, checksum)
+        return (await self.add_chunks(recording_id, [chunk]))[0]
+
+    async def add_chunks(
+        self,
+        recording_id: str,
+        chunks: List[Union[ChunkUpload, Sequence]]
+    ) -> List[RecordingChunk]:
+        """Add or replace several chunks in one bulk upsert and one commit"""
+        dialect_name = self.db.get_bind().dialect.name
+        # Transcripts of replaced audio go in the same transaction as the audio
+        await self.db.execute(stale_transcripts_statement(recording_id, chunks))
+        await self.db.execute(chunk_upsert_statement(dialect_name, recording_id, chunks))
+        # Same transaction, so the aggregates never disagree with the chunks
+        await self.db.execute(recording_aggregates_statement(recording_id))
+        await self.db.commit()
+        result = await self.db.execute(
+            select(RecordingChunk)
+            .where(
+                RecordingChunk.recording_id == recording_id,
+                RecordingChunk.chunk_index.in_([chunk[0] for chunk in chunks])
+            )
+            .order_by(RecordingChunk.chunk_index)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def refresh_aggregates(self, recording_id: Optional[str] = None) -> int:
+        """Recompute chunk aggregates for one recording, or all when recording_id is None"""
+        result = await self.db.execute(recording_aggregates_statement(recording_id))
+        await self.db.commit()
+        return result.rowcount
+
+    async def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
+        """Get all chunks for a recording, ordered by chunk_index"""
+        result = await self.db.execute(
+            select(RecordingChunk)
+            .where(RecordingChunk.recording_id == recording_id)
+            .order_by(RecordingChunk.chunk_index)
+        )
+        return list(result.scalars().all())
+
+    async def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get a single chunk of a recording by index"""
+        result = await self.db.execute(
+            select(RecordingChunk).where(
+                RecordingChunk.recording_id == recording_id,
+                RecordingChunk.chunk_index == chunk_index
+            )
+        )
+        return result.scalars().first()
+
+    async def save_chunk_transcript(
+        self,
+        recording_id: str,
+        chunk_index: int,
+        transcription: str
+    ) -> ChunkTranscript:
+        """Store (or replace) the transcript of a single chunk"""
+        result = await self.db.execute(
+            select(ChunkTranscript).where(
+                ChunkTranscript.recording_id == recording_id,
+                ChunkTranscript.chunk_index == chunk_index
+            )
+        )
+        chunk_transcript = result.scalars().first()
+        if chunk_transcript is None:
+            chunk_transcript = ChunkTranscript(recording_id=recording_id, chunk_index=chunk_index)
+            self.db.add(chunk_transcript)
+
+        chunk_transcript.transcription_text = transcription
+        await self.db.commit()
+        await self.db.refresh(chunk_transcript)
+        return chunk_transcript
+
+    async def get_chunk_transcripts(self, recording_id: str) -> List[ChunkTranscript]:
+        """Get all chunk transcripts for a recording, ordered by chunk_index"""
+        result = await self.db.execute(
+            select(ChunkTranscript)
+            .where(ChunkTranscript.recording_id == recording_id)
+            .order_by(ChunkTranscript.chunk_index)
+        )
+        return list(result.scalars().all())
+
+    async def mark_paused(self, recording_id: str) -> Optional[Recording]:
+        """Mark recording as paused"""
+        return await self._update(recording_id, status=RecordingStatus.paused)
+
+    async def mark_transcribing(self, recording_id: str) -> Optional[Recording]:
+        """Mark recording as queued for background transcription"""
+        return await self._update(recording_id, status=RecordingStatus.transcribing, error_message=None)
+
+    async def mark_failed(self, recording_id: str, error_message: str) -> Optional[Recording]:
+        """Mark recording as failed with the transcription error"""
+        return await self._update(recording_id, status=RecordingStatus.failed, error_message=error_message)
+
+    async def mark_ended(
+        self,
+        recording_id: str,
+        full_audio_path: str,
+        transcription: bytes
+    ) -> Optional[Recording]:
+        """Mark recording as ended with transcription (encrypted bytes)"""
+        return await self._update(
+            recording_id,
+            status=RecordingStatus.ended,
+            audio_file_path=full_audio_path,
+            transcription_ciphertext=transcription,
+            transcription_text=None,
+            error_message=None
+        )
+
+    async def update_recording(self, recording_id: str, **kwargs) -> Optional[Recording]:
+        """Update recording fields"""
+        # Handle enum conversion for status
+        if isinstance(kwargs.get("status"), str):
+            kwargs["status"] = RecordingStatus(kwargs["status"])
+        return await self._update(
+            recording_id,
+            **{key: value for key, value in kwargs.items() if hasattr(Recording, key)}
+        )
+
+    async def _update(self, recording_id: str, **values) -> Optional[Recording]:
+        recording = await self.get_recording(recording_id)
+        if not recording:
+            return None
+
+        for key, value in values.items():
+            setattr(recording, key, value)
+
+        await self.db.commit()
+        transcript_cache.invalidate(recording_id)
+        # Reload so server-side values such as updated_at are current
+        return await self.get_recording(recording_id)
@@ -0,0 +1,56 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.user import User
+from utils.principal_cache import principal_cache
+
+
+class AsyncMySQLUserRepository:
+    """MySQL implementation of AsyncUserRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_user(
+        self,
+        google_id: str,
+        email: str,
+        display_name: Optional[str] = None,
+        avatar_url: Optional[str] = None
+    ) -> User:
+        """Create a new user"""
+        user = User(
+            google_id=google_id,
+            email=email,
+            display_name=display_name,
+            avatar_url=avatar_url
+        )
+        self.db.add(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
+        """Get user by ID"""
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+
+    async def get_user_by_google_id(self, google_id: str) -> Optional[User]:
+        """Get user by Google ID"""
+        result = await self.db.execute(select(User).where(User.google_id == google_id))
+        return result.scalars().first()
+
+    async def update_user(self, user_id: str, **kwargs) -> Optional[User]:
+        """Update user information"""
+        user = await self.get_user_by_id(user_id)
+        if not user:
+            return None
+
+        for key, value in kwargs.items():
+            if hasattr(user, key):
+                setattr(user, key, value)
+
+        await self.db.commit()
+        await self.db.refresh(user)
+        principal_cache.invalidate(user_id)
+        return user
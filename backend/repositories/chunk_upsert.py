@@ -0,0 +1,140 @@
+import uuid
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional, Sequence, Union
+from sqlalchemy import and_, delete, exists, func, or_, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from models.recording import ChunkTranscript, Recording, RecordingChunk
+
+
+# Columns replaced when a chunk index is uploaded again
+UPSERT_COLUMNS = ("audio_blob_path", "duration_seconds", "size_bytes", "checksum", "uploaded_at")
+
+
+class ChunkUpload(NamedTuple):
+    """A stored chunk file, ready to be recorded in recording_chunks"""
+
+    chunk_index: int
+    chunk_path: str
+    duration_seconds: Optional[float] = None
+    size_bytes: Optional[int] = None
+    checksum: Optional[str] = None
+
+
+def chunk_upsert_statement(
+    dialect_name: str,
+    recording_id: str,
+    chunks: Iterable[Union[ChunkUpload, Sequence]]
+):
+    """
+    Build one INSERT for many chunks that replaces existing chunk indexes
+
+    Relies on the unique (recording_id, chunk_index) index, so concurrent
+    uploads of the same index can never produce two rows.
+
+    Args:
+        dialect_name: Name of the database dialect ("mysql", "sqlite", "postgresql")
+        recording_id: ID of the recording
+        chunks: ChunkUpload tuples (plain tuples in the same field order work too)
+
+    Returns:
+        Executable insert statement
+    """
+    now = datetime.utcnow()
+    rows = []
+    for chunk in chunks:
+        chunk = ChunkUpload(*chunk)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "recording_id": recording_id,
+            "chunk_index": chunk.chunk_index,
+            "audio_blob_path": chunk.chunk_path,
+            "duration_seconds": chunk.duration_seconds,
+            "size_bytes": chunk.size_bytes,
+            "checksum": chunk.checksum,
+            "uploaded_at": now,
+        })
+
+    if dialect_name == "mysql":
+        statement = mysql.insert(RecordingChunk).values(rows)
+        return statement.on_duplicate_key_update(
+            {column: statement.inserted[column] for column in UPSERT_COLUMNS}
+        )
+
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect = sqlite if dialect_name == "sqlite" else postgresql
+        statement = dialect.insert(RecordingChunk).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=["recording_id", "chunk_index"],
+            set_={column: statement.excluded[column] for column in UPSERT_COLUMNS}
+        )
+
+    raise ValueError(f"Chunk upserts are not supported on {dialect_name}")
+
+
+def stale_transcripts_statement(recording_id: str, chunks: Iterable[Union[ChunkUpload, Sequence]]):
+    """
+    Build a DELETE of the chunk transcripts a chunk upsert makes stale
+
+    Run in the same transaction before the upsert: a transcript is kept
+    only when the stored chunk has the same checksum as its replacement.
+    Chunks uploaded without a checksum always lose their transcript.
+
+    Args:
+        recording_id: ID of the recording
+        chunks: ChunkUpload tuples about to be upserted
+
+    Returns:
+        Executable delete statement
+    """
+    conditions = []
+    for chunk in chunks:
+        chunk = ChunkUpload(*chunk)
+        condition = ChunkTranscript.chunk_index == chunk.chunk_index
+        if chunk.checksum is not None:
+            unchanged = exists().where(
+                RecordingChunk.recording_id == recording_id,
+                RecordingChunk.chunk_index == chunk.chunk_index,
+                RecordingChunk.checksum == chunk.checksum
+            )
+            condition = and_(condition, ~unchanged)
+        conditions.append(condition)
+
+    return (
+        delete(ChunkTranscript)
+        .where(ChunkTranscript.recording_id == recording_id, or_(*conditions))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recording_aggregates_statement(recording_id: Optional[str] = None):
+    """
+    Build an UPDATE that recomputes recordings' chunk aggregates
+
+    Run in the same transaction as a chunk upsert, it keeps the aggregate
+    columns consistent with recording_chunks even when a chunk is replaced.
+    Each value is an index-backed aggregate over one recording's chunks.
+
+    Args:
+        recording_id: Recording to refresh, or None for every recording
+
+    Returns:
+        Executable update statement
+    """
+    def aggregate(expression):
+        return (
+            select(expression)
+            .where(RecordingChunk.recording_id == Recording.id)
+            .scalar_subquery()
+        )
+
+    statement = update(Recording).values(
+        chunks_count=aggregate(func.count(RecordingChunk.id)),
+        total_duration_seconds=aggregate(func.coalesce(func.sum(RecordingChunk.duration_seconds), 0.0)),
+        total_bytes=aggregate(func.coalesce(func.sum(RecordingChunk.size_bytes), 0)),
+        last_chunk_index=aggregate(func.max(RecordingChunk.chunk_index)),
+        # Aggregates describe the chunks, not an edit of the recording
+        updated_at=Recording.updated_at,
+    )
+    if recording_id is not None:
+        statement = statement.where(Recording.id == recording_id)
+    return statement.execution_options(synchronize_session=False)
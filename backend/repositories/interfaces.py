@@ -1,6 +1,10 @@
-from typing import Protocol, List, Optional
+from datetime import datetime
+from typing import Protocol, List, Optional, Sequence, Tuple, Union
+from sqlalchemy.engine import Row
 from models.user import User
-from models.recording import Recording, RecordingChunk
+from models.recording import Recording, RecordingChunk, ChunkTranscript
+from models.transcription_cache import TranscriptionCacheEntry
+from repositories.chunk_upsert import ChunkUpload
 
 
 class UserRepository(Protocol):
@@ -32,7 +36,7 @@ class UserRepository(Protocol):
 class RecordingRepository(Protocol):
     """Interface for Recording repository operations"""
 
-    def create_recording(self, user_id: str) -> Recording:
+    def create_recording(self, user_id: str, live_transcription: bool = False) -> Recording:
         """Create a new recording session"""
         ...
 
@@ -44,33 +48,220 @@ class RecordingRepository(Protocol):
         """List all recordings for a user"""
         ...
 
+    def list_recording_summaries(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None,
+        include_transcription: bool = False
+    ) -> List[Row]:
+        """List one keyset page of a user's recordings as summary rows, newest first"""
+        ...
+
     def add_chunk(
         self,
         recording_id: str,
         chunk_path: str,
         chunk_index: int,
-        duration_seconds: Optional[float] = None
+        duration_seconds: Optional[float] = None,
+        size_bytes: Optional[int] = None,
+        checksum: Optional[str] = None
     ) -> RecordingChunk:
-        """Add an audio chunk to a recording"""
+        """Add an audio chunk to a recording, replacing any chunk with the same index"""
+        ...
+
+    def add_chunks(
+        self,
+        recording_id: str,
+        chunks: List[Union[ChunkUpload, Sequence]]
+    ) -> List[RecordingChunk]:
+        """Add or replace several chunks in one bulk upsert"""
+        ...
+
+    def refresh_aggregates(self, recording_id: Optional[str] = None) -> int:
+        """Recompute chunk aggregates for one recording, or all when recording_id is None"""
         ...
 
     def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
         """Get all chunks for a recording"""
         ...
 
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get a single chunk of a recording by index"""
+        ...
+
+    def save_chunk_transcript(
+        self,
+        recording_id: str,
+        chunk_index: int,
+        transcription: str
+    ) -> ChunkTranscript:
+        """Store (or replace) the transcript of a single chunk"""
+        ...
+
+    def get_chunk_transcripts(self, recording_id: str) -> List[ChunkTranscript]:
+        """Get all chunk transcripts for a recording, ordered by chunk_index"""
+        ...
+
     def mark_paused(self, recording_id: str) -> Optional[Recording]:
         """Mark recording as paused"""
         ...
 
+    def mark_transcribing(self, recording_id: str) -> Optional[Recording]:
+        """Mark recording as queued for background transcription"""
+        ...
+
+    def mark_failed(self, recording_id: str, error_message: str) -> Optional[Recording]:
+        """Mark recording as failed with the transcription error"""
+        ...
+
     def mark_ended(
         self,
         recording_id: str,
         full_audio_path: str,
-        transcription: str
+        transcription: bytes
     ) -> Optional[Recording]:
-        """Mark recording as ended with transcription"""
+        """Mark recording as ended with transcription (encrypted bytes)"""
         ...
 
     def update_recording(self, recording_id: str, **kwargs) -> Optional[Recording]:
         """Update recording fields"""
         ...
+
+
+class AsyncUserRepository(Protocol):
+    """Interface for User repository operations on an AsyncSession"""
+
+    async def create_user(
+        self,
+        google_id: str,
+        email: str,
+        display_name: Optional[str] = None,
+        avatar_url: Optional[str] = None
+    ) -> User:
+        """Create a new user"""
+        ...
+
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
+        """Get user by ID"""
+        ...
+
+    async def get_user_by_google_id(self, google_id: str) -> Optional[User]:
+        """Get user by Google ID"""
+        ...
+
+    async def update_user(self, user_id: str, **kwargs) -> Optional[User]:
+        """Update user information"""
+        ...
+
+
+class AsyncRecordingRepository(Protocol):
+    """Interface for Recording repository operations on an AsyncSession"""
+
+    async def create_recording(self, user_id: str, live_transcription: bool = False) -> Recording:
+        """Create a new recording session"""
+        ...
+
+    async def get_recording(self, recording_id: str) -> Optional[Recording]:
+        """Get recording by ID"""
+        ...
+
+    async def list_recordings(self, user_id: str) -> List[Recording]:
+        """List all recordings for a user"""
+        ...
+
+    async def list_recording_summaries(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None,
+        include_transcription: bool = False
+    ) -> List[Row]:
+        """List one keyset page of a user's recordings as summary rows, newest first"""
+        ...
+
+    async def add_chunk(
+        self,
+        recording_id: str,
+        chunk_path: str,
+        chunk_index: int,
+        duration_seconds: Optional[float] = None,
+        size_bytes: Optional[int] = None,
+        checksum: Optional[str] = None
+    ) -> RecordingChunk:
+        """Add an audio chunk to a recording, replacing any chunk with the same index"""
+        ...
+
+    async def add_chunks(
+        self,
+        recording_id: str,
+        chunks: List[Union[ChunkUpload, Sequence]]
+    ) -> List[RecordingChunk]:
+        """Add or replace several chunks in one bulk upsert"""
+        ...
+
+    async def refresh_aggregates(self, recording_id: Optional[str] = None) -> int:
+        """Recompute chunk aggregates for one recording, or all when recording_id is None"""
+        ...
+
+    async def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
+        """Get all chunks for a recording"""
+        ...
+
+    async def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get a single chunk of a recording by index"""
+        ...
+
+    async def save_chunk_transcript(
+        self,
+        recording_id: str,
+        chunk_index: int,
+        transcription: str
+    ) -> ChunkTranscript:
+        """Store (or replace) the transcript of a single chunk"""
+        ...
+
+    async def get_chunk_transcripts(self, recording_id: str) -> List[ChunkTranscript]:
+        """Get all chunk transcripts for a recording, ordered by chunk_index"""
+        ...
+
+    async def mark_paused(self, recording_id: str) -> Optional[Recording]:
+        """Mark recording as paused"""
+        ...
+
+    async def mark_transcribing(self, recording_id: str) -> Optional[Recording]:
+        """Mark recording as queued for background transcription"""
+        ...
+
+    async def mark_failed(self, recording_id: str, error_message: str) -> Optional[Recording]:
+        """Mark recording as failed with the transcription error"""
+        ...
+
+    async def mark_ended(
+        self,
+        recording_id: str,
+        full_audio_path: str,
+        transcription: bytes
+    ) -> Optional[Recording]:
+        """Mark recording as ended with transcription (encrypted bytes)"""
+        ...
+
+    async def update_recording(self, recording_id: str, **kwargs) -> Optional[Recording]:
+        """Update recording fields"""
+        ...
+
+
+class TranscriptionCacheRepository(Protocol):
+    """Interface for transcription cache repository operations"""
+
+    def get_entry(self, cache_key: str) -> Optional[TranscriptionCacheEntry]:
+        """Get a cache entry and mark it as recently used"""
+        ...
+
+    def save_entry(self, cache_key: str, transcription: str) -> TranscriptionCacheEntry:
+        """Create or replace a cache entry"""
+        ...
+
+    def evict(self, max_entries: int) -> int:
+        """Delete the least recently used entries beyond max_entries"""
+        ...
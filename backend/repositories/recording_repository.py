@@ -1,6 +1,31 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence, Set, Tuple, Union
+from sqlalchemy import and_, exists, or_, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from models.recording import Recording, RecordingChunk, RecordingStatus
+from models.recording import Recording, RecordingChunk, RecordingStatus, ChunkTranscript
+from repositories.chunk_upsert import (
+    ChunkUpload,
+    chunk_upsert_statement,
+    recording_aggregates_statement,
+    stale_transcripts_statement,
+)
+from repositories.recording_summaries import recording_summaries_statement
+from utils.encryption_utils import encryption_service
+from utils.transcript_cache import transcript_cache
+
+
+def _stale_session_criteria(inactive_since: datetime) -> tuple:
+    """Filter criteria for active and paused recordings idle since inactive_since"""
+    recent_chunk = exists().where(
+        RecordingChunk.recording_id == Recording.id,
+        RecordingChunk.uploaded_at >= inactive_since
+    )
+    return (
+        Recording.status.in_([RecordingStatus.active, RecordingStatus.paused]),
+        Recording.updated_at < inactive_since,
+        ~recent_chunk
+    )
 
 
 class MySQLRecordingRepository:
@@ -9,11 +34,12 @@ class MySQLRecordingRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_recording(self, user_id: str) -> Recording:
+    def create_recording(self, user_id: str, live_transcription: bool = False) -> Recording:
         """Create a new recording session"""
         recording = Recording(
             user_id=user_id,
-            status=RecordingStatus.active
+            status=RecordingStatus.active,
+            live_transcription=live_transcription
         )
         self.db.add(recording)
         self.db.commit()
@@ -33,24 +59,59 @@ class MySQLRecordingRepository:
             .all()
         )
 
+    def list_recording_summaries(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None,
+        include_transcription: bool = False
+    ) -> List[Row]:
+        """List one keyset page of a user's recordings as summary rows, newest first"""
+        statement = recording_summaries_statement(user_id, limit, before, include_transcription)
+        return list(self.db.execute(statement).all())
+
     def add_chunk(
         self,
         recording_id: str,
         chunk_path: str,
         chunk_index: int,
-        duration_seconds: Optional[float] = None
+        duration_seconds: Optional[float] = None,
+        size_bytes: Optional[int] = None,
+        checksum: Optional[str] = None
     ) -> RecordingChunk:
-        """Add an audio chunk to a recording"""
-        chunk = RecordingChunk(
-            recording_id=recording_id,
-            chunk_index=chunk_index,
-            audio_blob_path=chunk_path,
-            duration_seconds=duration_seconds
+        """Add an audio chunk to a recording, replacing any chunk with the same index"""
+        chunk = ChunkUpload(chunk_index, chunk_path, duration_seconds, size_bytes, checksum)
+        return self.add_chunks(recording_id, [chunk])[0]
+
+    def add_chunks(
+        self,
+        recording_id: str,
+        chunks: List[Union[ChunkUpload, Sequence]]
+    ) -> List[RecordingChunk]:
+        """Add or replace several chunks in one bulk upsert and one commit"""
+        dialect_name = self.db.get_bind().dialect.name
+        # Transcripts of replaced audio go in the same transaction as the audio
+        self.db.execute(stale_transcripts_statement(recording_id, chunks))
+        self.db.execute(chunk_upsert_statement(dialect_name, recording_id, chunks))
+        # Same transaction, so the aggregates never disagree with the chunks
+        self.db.execute(recording_aggregates_statement(recording_id))
+        self.db.commit()
+        return (
+            self.db.query(RecordingChunk)
+            .filter(
+                RecordingChunk.recording_id == recording_id,
+                RecordingChunk.chunk_index.in_([chunk[0] for chunk in chunks])
+            )
+            .order_by(RecordingChunk.chunk_index)
+            .populate_existing()
+            .all()
         )
-        self.db.add(chunk)
+
+    def refresh_aggregates(self, recording_id: Optional[str] = None) -> int:
+        """Recompute chunk aggregates for one recording, or all when recording_id is None"""
+        result = self.db.execute(recording_aggregates_statement(recording_id))
         self.db.commit()
-        self.db.refresh(chunk)
-        return chunk
+        return result.rowcount
 
     def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
         """Get all chunks for a recording, ordered by chunk_index"""
@@ -61,6 +122,50 @@ class MySQLRecordingRepository:
             .all()
         )
 
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get a single chunk of a recording by index"""
+        return (
+            self.db.query(RecordingChunk)
+            .filter(
+                RecordingChunk.recording_id == recording_id,
+                RecordingChunk.chunk_index == chunk_index
+            )
+            .first()
+        )
+
+    def save_chunk_transcript(
+        self,
+        recording_id: str,
+        chunk_index: int,
+        transcription: str
+    ) -> ChunkTranscript:
+        """Store (or replace) the transcript of a single chunk"""
+        chunk_transcript = (
+            self.db.query(ChunkTranscript)
+            .filter(
+                ChunkTranscript.recording_id == recording_id,
+                ChunkTranscript.chunk_index == chunk_index
+            )
+            .first()
+        )
+        if chunk_transcript is None:
+            chunk_transcript = ChunkTranscript(recording_id=recording_id, chunk_index=chunk_index)
+            self.db.add(chunk_transcript)
+
+        chunk_transcript.transcription_text = transcription
+        self.db.commit()
+        self.db.refresh(chunk_transcript)
+        return chunk_transcript
+
+    def get_chunk_transcripts(self, recording_id: str) -> List[ChunkTranscript]:
+        """Get all chunk transcripts for a recording, ordered by chunk_index"""
+        return (
+            self.db.query(ChunkTranscript)
+            .filter(ChunkTranscript.recording_id == recording_id)
+            .order_by(ChunkTranscript.chunk_index)
+            .all()
+        )
+
     def mark_paused(self, recording_id: str) -> Optional[Recording]:
         """Mark recording as paused"""
         recording = self.get_recording(recording_id)
@@ -72,22 +177,49 @@ class MySQLRecordingRepository:
         self.db.refresh(recording)
         return recording
 
+    def mark_transcribing(self, recording_id: str) -> Optional[Recording]:
+        """Mark recording as queued for background transcription"""
+        recording = self.get_recording(recording_id)
+        if not recording:
+            return None
+
+        recording.status = RecordingStatus.transcribing
+        recording.error_message = None
+        self.db.commit()
+        self.db.refresh(recording)
+        return recording
+
+    def mark_failed(self, recording_id: str, error_message: str) -> Optional[Recording]:
+        """Mark recording as failed with the transcription error"""
+        recording = self.get_recording(recording_id)
+        if not recording:
+            return None
+
+        recording.status = RecordingStatus.failed
+        recording.error_message = error_message
+        self.db.commit()
+        self.db.refresh(recording)
+        return recording
+
     def mark_ended(
         self,
         recording_id: str,
         full_audio_path: str,
-        transcription: str
+        transcription: bytes
     ) -> Optional[Recording]:
-        """Mark recording as ended with transcription"""
+        """Mark recording as ended with transcription (encrypted bytes)"""
         recording = self.get_recording(recording_id)
         if not recording:
             return None
 
         recording.status = RecordingStatus.ended
         recording.audio_file_path = full_audio_path
-        recording.transcription_text = transcription
+        recording.transcription_ciphertext = transcription
+        recording.transcription_text = None
+        recording.error_message = None
         self.db.commit()
         self.db.refresh(recording)
+        transcript_cache.invalidate(recording_id)
         return recording
 
     def update_recording(self, recording_id: str, **kwargs) -> Optional[Recording]:
@@ -105,4 +237,147 @@ class MySQLRecordingRepository:
 
         self.db.commit()
         self.db.refresh(recording)
+        transcript_cache.invalidate(recording_id)
         return recording
+
+    def list_archived_recordings(
+        self,
+        ended_before: datetime,
+        limit: int,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[Recording]:
+        """
+        List ended recordings whose chunks are still stored, oldest first
+
+        Args:
+            ended_before: Only recordings last updated before this time
+            limit: Maximum number of recordings
+            after: ``(updated_at, id)`` of the last recording of the previous page
+
+        Returns:
+            One keyset page of recordings
+        """
+        query = self.db.query(Recording).filter(
+            Recording.status == RecordingStatus.ended,
+            Recording.audio_file_path.isnot(None),
+            Recording.chunks_purged_at.is_(None),
+            Recording.updated_at < ended_before
+        )
+        if after is not None:
+            updated_at, recording_id = after
+            query = query.filter(or_(
+                Recording.updated_at > updated_at,
+                and_(Recording.updated_at == updated_at, Recording.id > recording_id)
+            ))
+        return query.order_by(Recording.updated_at, Recording.id).limit(limit).all()
+
+    def list_stale_sessions(self, inactive_since: datetime, limit: int) -> List[Recording]:
+        """List active and paused recordings with no update and no chunk upload since inactive_since"""
+        return (
+            self.db.query(Recording)
+            .filter(*_stale_session_criteria(inactive_since))
+            .order_by(Recording.updated_at, Recording.id)
+            .limit(limit)
+            .all()
+        )
+
+    def list_open_recordings(self, limit: int, after: Optional[str] = None) -> List[Recording]:
+        """List active and paused recordings in ID order, one keyset page at a time"""
+        query = self.db.query(Recording).filter(
+            Recording.status.in_([RecordingStatus.active, RecordingStatus.paused])
+        )
+        if after is not None:
+            query = query.filter(Recording.id > after)
+        return query.order_by(Recording.id).limit(limit).all()
+
+    def list_transcribing_recording_ids(self) -> List[str]:
+        """List IDs of recordings waiting for, or in the middle of, transcription"""
+        rows = self.db.query(Recording.id).filter(Recording.status == RecordingStatus.transcribing).all()
+        return [row.id for row in rows]
+
+    def existing_recording_ids(self, recording_ids: Sequence[str]) -> Set[str]:
+        """Get the subset of recording_ids that have a recording row"""
+        rows = self.db.query(Recording.id).filter(Recording.id.in_(list(recording_ids))).all()
+        return {row.id for row in rows}
+
+    def mark_chunks_purged(self, recording_id: str) -> bool:
+        """Record that a recording's chunk audio has been deleted; its chunk rows are kept"""
+        result = self.db.execute(
+            update(Recording)
+            .where(Recording.id == recording_id)
+            # Housekeeping, not an edit of the recording
+            .values(chunks_purged_at=datetime.utcnow(), updated_at=Recording.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def expire_session(self, recording_id: str, inactive_since: datetime, error_message: str) -> bool:
+        """
+        Mark an abandoned recording as failed, if it is still stale
+
+        The status change is a single conditional update, so a recording
+        that was resumed or received a chunk since it was listed is left
+        alone.
+
+        Args:
+            recording_id: Recording ID
+            inactive_since: Cutoff the recording must have been idle since
+            error_message: Error message to store on the recording
+
+        Returns:
+            True if the recording was expired, False if it is no longer stale
+        """
+        result = self.db.execute(
+            update(Recording)
+            .where(Recording.id == recording_id, *_stale_session_criteria(inactive_since))
+            .values(
+                status=RecordingStatus.failed,
+                error_message=error_message,
+                chunks_purged_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def delete_chunks(self, recording_id: str, chunk_indexes: Sequence[int]) -> int:
+        """Delete chunk rows and refresh the recording's aggregates; returns the rows deleted"""
+        result = self.db.execute(
+            RecordingChunk.__table__.delete().where(
+                RecordingChunk.recording_id == recording_id,
+                RecordingChunk.chunk_index.in_(list(chunk_indexes))
+            )
+        )
+        self.db.execute(recording_aggregates_statement(recording_id))
+        self.db.commit()
+        return result.rowcount
+
+    def migrate_legacy_transcriptions(self, batch_size: int = 500) -> int:
+        """
+        Move base64 encrypted transcriptions into the binary column
+
+        The ciphertext is only re-encoded, never decrypted.
+
+        Returns:
+            Number of recordings migrated
+        """
+        migrated = 0
+        while True:
+            recordings = (
+                self.db.query(Recording)
+                .filter(
+                    Recording.transcription_text.isnot(None),
+                    Recording.transcription_ciphertext.is_(None)
+                )
+                .limit(batch_size)
+                .all()
+            )
+            if not recordings:
+                return migrated
+
+            for recording in recordings:
+                recording.transcription_ciphertext = encryption_service.text_to_bytes(recording.transcription_text)
+                recording.transcription_text = None
+            self.db.commit()
+            migrated += len(recordings)
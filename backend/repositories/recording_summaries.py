@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import and_, or_, select
+from models.recording import Recording
+
+
+# Columns of a recording listing; transcription bodies are only added on request
+SUMMARY_COLUMNS = (
+    Recording.id,
+    Recording.user_id,
+    Recording.status,
+    Recording.created_at,
+    Recording.updated_at,
+    Recording.audio_file_path,
+    Recording.llm_provider,
+    Recording.notes,
+    Recording.error_message,
+    Recording.live_transcription,
+    Recording.chunks_count,
+    Recording.total_duration_seconds,
+    Recording.total_bytes,
+    Recording.last_chunk_index,
+)
+
+
+def recording_summaries_statement(
+    user_id: str,
+    limit: int,
+    before: Optional[Tuple[datetime, str]] = None,
+    include_transcription: bool = False
+):
+    """
+    Build the query for one page of a user's recordings, newest first
+
+    Pages are keyed on ``(created_at, id)`` and walk the
+    ``(user_id, created_at, id)`` index, so every page costs the same
+    however deep the client has scrolled. Chunk counts and totals are the
+    recordings' aggregate columns, so recording_chunks is not read.
+
+    Args:
+        user_id: Owner of the recordings
+        limit: Maximum number of rows
+        before: ``(created_at, id)`` of the last row of the previous page
+        include_transcription: Also select the encrypted transcription
+
+    Returns:
+        Select statement yielding summary rows
+    """
+    transcription_columns = (Recording.transcription_ciphertext, Recording.transcription_text)
+    columns = SUMMARY_COLUMNS + (transcription_columns if include_transcription else ())
+
+    statement = select(*columns).where(Recording.user_id == user_id)
+    if before is not None:
+        created_at, recording_id = before
+        statement = statement.where(or_(
+            Recording.created_at < created_at,
+            and_(Recording.created_at == created_at, Recording.id < recording_id)
+        ))
+
+    return statement.order_by(Recording.created_at.desc(), Recording.id.desc()).limit(limit)
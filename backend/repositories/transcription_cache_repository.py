@@ -0,0 +1,52 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
+from models.transcription_cache import TranscriptionCacheEntry
+
+
+class MySQLTranscriptionCacheRepository:
+    """MySQL implementation of TranscriptionCacheRepository"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_entry(self, cache_key: str) -> Optional[TranscriptionCacheEntry]:
+        """Get a cache entry and mark it as recently used"""
+        entry = self.db.query(TranscriptionCacheEntry).filter(
+            TranscriptionCacheEntry.cache_key == cache_key
+        ).first()
+        if entry:
+            entry.last_used_at = datetime.utcnow()
+            self.db.commit()
+            self.db.refresh(entry)
+        return entry
+
+    def save_entry(self, cache_key: str, transcription: str) -> TranscriptionCacheEntry:
+        """Create or replace a cache entry"""
+        entry = self.db.query(TranscriptionCacheEntry).filter(
+            TranscriptionCacheEntry.cache_key == cache_key
+        ).first()
+        if entry:
+            entry.transcription_text = transcription
+            entry.last_used_at = datetime.utcnow()
+        else:
+            entry = TranscriptionCacheEntry(cache_key=cache_key, transcription_text=transcription)
+            self.db.add(entry)
+        self.db.commit()
+        self.db.refresh(entry)
+        return entry
+
+    def evict(self, max_entries: int) -> int:
+        """Delete the least recently used entries beyond max_entries"""
+        stale_keys = [
+            cache_key for (cache_key,) in self.db.query(TranscriptionCacheEntry.cache_key)
+            .order_by(TranscriptionCacheEntry.last_used_at.desc())
+            .offset(max_entries)
+            .all()
+        ]
+        if stale_keys:
+            self.db.query(TranscriptionCacheEntry).filter(
+                TranscriptionCacheEntry.cache_key.in_(stale_keys)
+            ).delete(synchronize_session=False)
+            self.db.commit()
+        return len(stale_keys)
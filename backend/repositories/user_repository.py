@@ -1,6 +1,7 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 from models.user import User
+from utils.principal_cache import principal_cache
 
 
 class MySQLUserRepository:
@@ -48,4 +49,5 @@ class MySQLUserRepository:
 
         self.db.commit()
         self.db.refresh(user)
+        principal_cache.invalidate(user_id)
         return user
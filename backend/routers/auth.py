@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from authlib.integrations.starlette_client import OAuth
 from starlette.requests import Request
 from typing import Optional
-from database import get_db
-from repositories.user_repository import MySQLUserRepository
+from database import get_async_db
+from repositories.async_user_repository import AsyncMySQLUserRepository
 from utils.jwt_utils import create_access_token
 from config import settings
 
@@ -51,7 +51,7 @@ async def google_login(request: Request):
 
 
 @router.get("/google/callback")
-async def google_callback(request: Request, db: Session = Depends(get_db)):
+async def google_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Handle Google OAuth2 callback
 
@@ -91,12 +91,12 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
             )
 
         # Check if user exists, create if not
-        user_repo = MySQLUserRepository(db)
-        user = user_repo.get_user_by_google_id(google_id)
+        user_repo = AsyncMySQLUserRepository(db)
+        user = await user_repo.get_user_by_google_id(google_id)
 
         if not user:
             # Create new user
-            user = user_repo.create_user(
+            user = await user_repo.create_user(
                 google_id=google_id,
                 email=email,
                 display_name=display_name,
@@ -104,7 +104,7 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
             )
         else:
             # Update existing user info
-            user = user_repo.update_user(
+            user = await user_repo.update_user(
                 user_id=user.id,
                 email=email,
                 display_name=display_name,
@@ -1,70 +1,279 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import BinaryIO, List, Optional, Tuple
 import os
-import shutil
-from database import get_db
+import asyncio
+import base64
+import hashlib
+from datetime import datetime
+from database import get_async_db
 from models.user import User
-from models.recording import Recording
-from repositories.recording_repository import MySQLRecordingRepository
-from middleware.auth import get_current_user
-from llm.requestyai_provider import RequestYaiProvider
-from utils.audio_utils import assemble_audio_chunks, get_audio_duration
+from models.recording import Recording, RecordingStatus
+from repositories.async_recording_repository import AsyncMySQLRecordingRepository
+from repositories.chunk_upsert import ChunkUpload
+from storage.blob_store import audio_format_of, blob_store, chunk_key
+from middleware.auth import get_current_user, get_current_user_id
+from jobs.assembly import incremental_assembler
+from jobs.live_transcription import live_transcriber
+from jobs.transcription import transcription_queue
+from utils.audio_utils import ARCHIVE_FORMATS, probe_chunk_duration
+from utils.blocking_io import blocking_io
 from utils.encryption_utils import encryption_service
+from utils.transcript_cache import decrypt_transcription
 from config import settings
 
 
 router = APIRouter(prefix="/recordings", tags=["recordings"])
 
+# Recordings per page of GET /recordings
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Suffix of chunk files whose resumable upload has not finished
+PARTIAL_SUFFIX = ".part"
+
+
+# Copy size for uploads streamed into encrypted chunk files
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _partial_path(recording_id: str, chunk_index: int) -> str:
+    """Local file receiving a resumable chunk upload"""
+    return blob_store.staging_path(chunk_key(recording_id, chunk_index)) + PARTIAL_SUFFIX
+
+
+def _write_encrypted_chunk(source: BinaryIO, key: str) -> Tuple[int, str]:
+    """
+    Encrypt an uploaded chunk while writing it, so no plaintext audio reaches storage
+
+    Returns:
+        Plaintext size in bytes and hex SHA-256 of the plaintext
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with blob_store.open_writer(key) as sink, encryption_service.open_encrypted_stream(sink) as writer:
+        while True:
+            data = source.read(COPY_BUFFER_SIZE)
+            if not data:
+                break
+            digest.update(data)
+            size += len(data)
+            writer.write(data)
+    return size, digest.hexdigest()
+
+
+def _open_partial_chunk(part_path: str, offset: int):
+    """Open a partial chunk upload for writing at offset (0 starts it over)"""
+    if offset == 0:
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        return encryption_service.open_encrypted_writer(part_path)
+    return encryption_service.open_encrypted_appender(part_path)
+
+
+def _partial_size(part_path: str) -> int:
+    """Bytes received so far for a partial chunk upload"""
+    try:
+        return encryption_service.plaintext_size(part_path)
+    except FileNotFoundError:
+        return 0
+
+
+def _complete_partial_chunk(part_path: str, key: str) -> Tuple[int, str]:
+    """Checksum a fully received partial upload and store it as the chunk"""
+    digest = hashlib.sha256()
+    size = 0
+    for block in encryption_service.decrypt_range(part_path):
+        digest.update(block)
+        size += len(block)
+    blob_store.put_file(key, part_path)
+    return size, digest.hexdigest()
+
+
+def _partial_uploads(recording_dir: str) -> List[Tuple[int, int]]:
+    """(chunk_index, received bytes) for every unfinished upload of a recording"""
+    if not os.path.isdir(recording_dir):
+        return []
+    partial = []
+    for name in sorted(os.listdir(recording_dir)):
+        if name.startswith("chunk_") and name.endswith(PARTIAL_SUFFIX):
+            chunk_index = int(name[len("chunk_"):].split(".")[0])
+            partial.append((chunk_index, _partial_size(os.path.join(recording_dir, name))))
+    return partial
+
+
+def _encode_cursor(created_at: datetime, recording_id: str) -> str:
+    """Opaque listing cursor for the position after (created_at, recording_id)"""
+    position = f"{created_at.isoformat()}|{recording_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, recording_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), recording_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _summary_dict(row) -> dict:
+    """Serialize a recording summary row like Recording.to_dict"""
+    summary = dict(row._mapping)
+    summary.pop("transcription_ciphertext", None)
+    summary["status"] = row.status.value
+    summary["created_at"] = row.created_at.isoformat() if row.created_at else None
+    summary["updated_at"] = row.updated_at.isoformat() if row.updated_at else None
+    return summary
+
+
+def _check_accepts_chunks(recording: Recording) -> None:
+    """Reject uploads to recordings that are finished, failed or whose chunk audio was purged"""
+    if (
+        recording.status not in (RecordingStatus.active, RecordingStatus.paused)
+        or recording.chunks_purged_at is not None
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Recording is {recording.status.value} and no longer accepts chunks"
+        )
+
+
+async def _probe_stored_chunk(key: str) -> Optional[float]:
+    """Probe a stored chunk's duration in a worker process"""
+    chunk_path = await blocking_io.run(blob_store.local_path, key)
+    return await blocking_io.run_cpu(probe_chunk_duration, chunk_path)
+
+
+async def _store_chunk(recording_id: str, chunk_index: int, source: BinaryIO) -> ChunkUpload:
+    """Write one uploaded chunk encrypted, then probe its duration in a worker process"""
+    key = chunk_key(recording_id, chunk_index)
+    size, checksum = await blocking_io.run(_write_encrypted_chunk, source, key)
+    duration = await _probe_stored_chunk(key)
+    return ChunkUpload(chunk_index, key, duration, size, checksum)
+
+
+def _parse_range_header(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header
+
+    Args:
+        range_header: Value of the Range header, e.g. ``bytes=0-1023``
+        size: Total size of the resource in bytes
+
+    Returns:
+        ``(start, end)`` with ``end`` exclusive, or None if the header
+        should be ignored (multiple or non-byte ranges)
+
+    Raises:
+        HTTPException: If the range cannot be satisfied
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size
+        else:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+    except ValueError:
+        return None
+
+    if start >= size or start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    return start, end
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_recording(
+    live_transcription: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new recording session
 
     Args:
+        live_transcription: Transcribe each chunk as soon as it is uploaded
         current_user: Authenticated user
         db: Database session
 
     Returns:
         Created recording object
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recording = recording_repo.create_recording(user_id=current_user.id)
-
-    # Create storage directory for this recording's chunks
-    recording_dir = os.path.join(settings.AUDIO_STORAGE_PATH, recording.id)
-    os.makedirs(recording_dir, exist_ok=True)
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.create_recording(
+        user_id=current_user.id,
+        live_transcription=live_transcription
+    )
 
     return recording.to_dict()
 
 
+async def _record_chunk(
+    recording_repo: AsyncMySQLRecordingRepository,
+    recording: Recording,
+    upload: ChunkUpload
+) -> dict:
+    """Upsert a stored chunk and hand it to the background assembler and live transcriber"""
+    chunk = await recording_repo.add_chunk(
+        recording_id=recording.id,
+        chunk_path=upload.chunk_path,
+        chunk_index=upload.chunk_index,
+        duration_seconds=upload.duration_seconds,
+        size_bytes=upload.size_bytes,
+        checksum=upload.checksum
+    )
+
+    # Pre-assemble in the background so finish only appends the tail
+    incremental_assembler.chunk_uploaded(recording.id, upload.chunk_index, upload.chunk_path)
+
+    if recording.live_transcription:
+        live_transcriber.chunk_uploaded(recording.id, upload.chunk_index)
+
+    return chunk.to_dict()
+
+
 @router.post("/{recording_id}/chunks", status_code=status.HTTP_201_CREATED)
 async def upload_chunk(
     recording_id: str,
     chunk_index: int = Form(...),
     audio_chunk: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    checksum: Optional[str] = Form(None),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload an audio chunk for a recording
 
+    Uploading an index again replaces that chunk. If the client sends the
+    chunk's checksum and the server already holds identical content, the
+    stored chunk is returned (200) without writing anything.
+
     Args:
         recording_id: ID of the recording
         chunk_index: Sequential index of this chunk
         audio_chunk: Audio file chunk
-        current_user: Authenticated user
+        checksum: Optional hex SHA-256 of the chunk's content
+        current_user_id: Authenticated user's ID
         db: Database session
 
     Returns:
         Created chunk object
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recording = recording_repo.get_recording(recording_id)
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
 
     if not recording:
         raise HTTPException(
@@ -72,38 +281,130 @@ async def upload_chunk(
             detail="Recording not found"
         )
 
-    if recording.user_id != current_user.id:
+    if recording.user_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to upload chunks to this recording"
         )
 
-    # Save chunk to disk
-    recording_dir = os.path.join(settings.AUDIO_STORAGE_PATH, recording_id)
-    os.makedirs(recording_dir, exist_ok=True)
+    _check_accepts_chunks(recording)
 
-    chunk_filename = f"chunk_{chunk_index:04d}.webm"
-    chunk_path = os.path.join(recording_dir, chunk_filename)
+    if checksum:
+        existing = await recording_repo.get_chunk(recording_id, chunk_index)
+        if existing and existing.checksum == checksum.lower():
+            return JSONResponse(existing.to_dict(), status_code=status.HTTP_200_OK)
+
+    # End the read so the pooled connection is free while the chunk is written and probed
+    await db.commit()
 
     try:
-        with open(chunk_path, "wb") as buffer:
-            shutil.copyfileobj(audio_chunk.file, buffer)
+        # Save chunk to disk and get its duration; writes and probing run in
+        # worker pools so one upload does not stall the others
+        upload = await _store_chunk(recording_id, chunk_index, audio_chunk.file)
+
+        return await _record_chunk(recording_repo, recording, upload)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save audio chunk: {str(e)}"
+        )
+
+
+@router.patch("/{recording_id}/chunks/{chunk_index}")
+async def resume_chunk_upload(
+    recording_id: str,
+    chunk_index: int,
+    request: Request,
+    upload_offset: int = Header(...),
+    upload_length: int = Header(...),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload part of a chunk, continuing an interrupted upload
+
+    The request body holds the chunk's bytes from ``Upload-Offset`` on.
+    Whatever arrives is kept, even if the connection drops, so a client
+    only re-sends the bytes the server does not have yet; the manifest
+    (or a 409 response) reports the offset to resume from. Once
+    ``Upload-Length`` bytes have been received the chunk is stored as if
+    it had been uploaded in one piece.
+
+    Args:
+        recording_id: ID of the recording
+        chunk_index: Sequential index of the chunk
+        request: Raw request, whose body is streamed to disk
+        upload_offset: Position of the first body byte within the chunk
+        upload_length: Total size of the chunk in bytes
+        current_user_id: Authenticated user's ID
+        db: Database session
+
+    Returns:
+        Created chunk object once complete (201), otherwise the upload's progress
+    """
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
+
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+
+    if recording.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to upload chunks to this recording"
+        )
+
+    _check_accepts_chunks(recording)
 
-        # Get duration if possible
-        try:
-            duration = get_audio_duration(chunk_path)
-        except:
-            duration = None
+    # End the read so the pooled connection is free while the body streams in
+    await db.commit()
 
-        # Add chunk to database
-        chunk = recording_repo.add_chunk(
-            recording_id=recording_id,
-            chunk_path=chunk_path,
-            chunk_index=chunk_index,
-            duration_seconds=duration
+    key = chunk_key(recording_id, chunk_index)
+    part_path = await blocking_io.run(_partial_path, recording_id, chunk_index)
+    received = await blocking_io.run(_partial_size, part_path) if upload_offset else 0
+
+    if upload_offset != received or upload_offset > upload_length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload must resume at offset {received}",
+            headers={"Upload-Offset": str(received)},
+        )
+
+    # Encrypted as it streams in (HIPAA compliance); bytes received before
+    # a disconnect stay on disk for the next attempt
+    writer = await blocking_io.run(_open_partial_chunk, part_path, upload_offset)
+    try:
+        async for data in request.stream():
+            if received + len(data) > upload_length:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Request body is longer than Upload-Length"
+                )
+            await blocking_io.run(writer.write, data)
+            received += len(data)
+    finally:
+        await blocking_io.run(writer.close)
+
+    if received < upload_length:
+        return JSONResponse(
+            {"chunk_index": chunk_index, "upload_offset": received, "upload_length": upload_length},
+            headers={"Upload-Offset": str(received)},
         )
 
-        return chunk.to_dict()
+    try:
+        size, checksum = await blocking_io.run(_complete_partial_chunk, part_path, key)
+        duration = await _probe_stored_chunk(key)
+        upload = ChunkUpload(chunk_index, key, duration, size, checksum)
+
+        return JSONResponse(
+            await _record_chunk(recording_repo, recording, upload),
+            status_code=status.HTTP_201_CREATED,
+            headers={"Upload-Offset": str(received)},
+        )
 
     except Exception as e:
         raise HTTPException(
@@ -112,25 +413,166 @@ async def upload_chunk(
         )
 
 
+@router.get("/{recording_id}/chunks/manifest")
+async def get_chunk_manifest(
+    recording_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List the chunks the server has for a recording
+
+    Lets a client that lost its connection re-send only what is missing.
+
+    Args:
+        recording_id: ID of the recording
+        current_user_id: Authenticated user's ID
+        db: Database session
+
+    Returns:
+        Stored chunks with their sizes and checksums, and the offsets
+        of unfinished resumable uploads
+    """
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
+
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+
+    if recording.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this recording"
+        )
+
+    # Purged chunk rows are kept for their metadata, but the audio is gone
+    chunks = [] if recording.chunks_purged_at else await recording_repo.get_chunks(recording_id)
+    recording_dir = os.path.dirname(await blocking_io.run(_partial_path, recording_id, 0))
+    partial = await blocking_io.run(_partial_uploads, recording_dir)
+
+    return {
+        "recording_id": recording_id,
+        "chunks": [
+            {
+                "chunk_index": chunk.chunk_index,
+                "size_bytes": chunk.size_bytes,
+                "checksum": chunk.checksum,
+            }
+            for chunk in chunks
+        ],
+        "partial_uploads": [
+            {"chunk_index": chunk_index, "upload_offset": received}
+            for chunk_index, received in partial
+        ],
+    }
+
+
+@router.post("/{recording_id}/chunks/batch", status_code=status.HTTP_201_CREATED)
+async def upload_chunks(
+    recording_id: str,
+    chunk_indexes: List[int] = Form(...),
+    audio_chunks: List[UploadFile] = File(...),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload several audio chunks for a recording in one request
+
+    Meant for clients replaying chunks after a network drop. The multipart
+    body is parsed as it streams in (large parts spill to temporary files),
+    ownership is checked once, and all chunk rows are inserted with a
+    single bulk insert and commit.
+
+    Args:
+        recording_id: ID of the recording
+        chunk_indexes: Sequential index of each chunk, in the order of audio_chunks
+        audio_chunks: Audio file chunks
+        current_user_id: Authenticated user's ID
+        db: Database session
+
+    Returns:
+        Created chunk objects, ordered by chunk_index
+    """
+    if len(chunk_indexes) != len(audio_chunks):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each audio chunk needs exactly one chunk index"
+        )
+    if len(set(chunk_indexes)) != len(chunk_indexes):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chunk indexes must be unique"
+        )
+    if len(audio_chunks) > settings.UPLOAD_BATCH_MAX_CHUNKS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.UPLOAD_BATCH_MAX_CHUNKS} chunks can be uploaded at once"
+        )
+
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
+
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+
+    if recording.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to upload chunks to this recording"
+        )
+
+    _check_accepts_chunks(recording)
+
+    # End the read so the pooled connection is free while the chunks are written and probed
+    await db.commit()
+
+    try:
+        stored = await asyncio.gather(*(
+            _store_chunk(recording_id, chunk_index, audio_chunk.file)
+            for chunk_index, audio_chunk in zip(chunk_indexes, audio_chunks)
+        ))
+
+        chunks = await recording_repo.add_chunks(recording_id, sorted(stored))
+
+        for chunk in chunks:
+            incremental_assembler.chunk_uploaded(recording_id, chunk.chunk_index, chunk.audio_blob_path)
+            if recording.live_transcription:
+                live_transcriber.chunk_uploaded(recording_id, chunk.chunk_index)
+
+        return [chunk.to_dict() for chunk in chunks]
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save audio chunks: {str(e)}"
+        )
+
+
 @router.patch("/{recording_id}/pause")
 async def pause_recording(
     recording_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark a recording as paused
 
     Args:
         recording_id: ID of the recording
-        current_user: Authenticated user
+        current_user_id: Authenticated user's ID
         db: Database session
 
     Returns:
         Updated recording object
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recording = recording_repo.get_recording(recording_id)
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
 
     if not recording:
         raise HTTPException(
@@ -138,35 +580,39 @@ async def pause_recording(
             detail="Recording not found"
         )
 
-    if recording.user_id != current_user.id:
+    if recording.user_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to modify this recording"
         )
 
-    recording = recording_repo.mark_paused(recording_id)
+    recording = await recording_repo.mark_paused(recording_id)
     return recording.to_dict()
 
 
-@router.post("/{recording_id}/finish")
+@router.post("/{recording_id}/finish", status_code=status.HTTP_202_ACCEPTED)
 async def finish_recording(
     recording_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Mark recording as ended, assemble chunks, and trigger transcription
+    Mark recording as finished and queue assembly and transcription
+
+    The heavy lifting runs on the background transcription queue; poll
+    ``GET /recordings/{recording_id}/status`` until the recording is
+    ``ended`` or ``failed``.
 
     Args:
         recording_id: ID of the recording
-        current_user: Authenticated user
+        current_user_id: Authenticated user's ID
         db: Database session
 
     Returns:
-        Updated recording object with transcription
+        Recording object in the ``transcribing`` state
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recording = recording_repo.get_recording(recording_id)
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
 
     if not recording:
         raise HTTPException(
@@ -174,120 +620,143 @@ async def finish_recording(
             detail="Recording not found"
         )
 
-    if recording.user_id != current_user.id:
+    if recording.user_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to finish this recording"
         )
 
-    try:
-        # Get all chunks
-        chunks = recording_repo.get_chunks(recording_id)
-
-        if not chunks:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No audio chunks found for this recording"
-            )
-
-        # Sort chunks by index
-        chunks = sorted(chunks, key=lambda x: x.chunk_index)
-        chunk_paths = [chunk.audio_blob_path for chunk in chunks]
+    if transcription_queue.is_pending(recording_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Transcription already in progress for this recording"
+        )
 
-        # Assemble chunks into single audio file
-        recording_dir = os.path.join(settings.AUDIO_STORAGE_PATH, recording_id)
-        assembled_path = os.path.join(recording_dir, "full_audio.wav")
+    if recording.chunks_purged_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Audio chunks of this recording have been deleted by the retention policy"
+        )
 
-        assemble_audio_chunks(chunk_paths, assembled_path)
+    if not await recording_repo.get_chunks(recording_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No audio chunks found for this recording"
+        )
 
-        # Encrypt the assembled audio file (HIPAA compliance)
-        encrypted_path = os.path.join(recording_dir, "full_audio_encrypted.bin")
-        encryption_service.encrypt_file(assembled_path, encrypted_path)
+    recording = await recording_repo.mark_transcribing(recording_id)
+    transcription_queue.enqueue(recording_id)
 
-        # Transcribe using LLM provider
-        llm_provider = RequestYaiProvider()
-        transcription_text = llm_provider.transcribe_audio(assembled_path)
+    return recording.to_dict()
 
-        # Encrypt transcription (HIPAA compliance)
-        encrypted_transcription = encryption_service.encrypt_text(transcription_text)
 
-        # Update recording with results
-        recording = recording_repo.mark_ended(
-            recording_id=recording_id,
-            full_audio_path=encrypted_path,
-            transcription=encrypted_transcription
-        )
+@router.get("/{recording_id}/status")
+async def get_recording_status(
+    recording_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the processing status of a recording
 
-        # Clean up unencrypted file
-        if os.path.exists(assembled_path):
-            os.remove(assembled_path)
+    Args:
+        recording_id: ID of the recording
+        current_user_id: Authenticated user's ID
+        db: Database session
 
-        # Return with decrypted transcription for display
-        result = recording.to_dict()
-        result['transcription_text'] = transcription_text
+    Returns:
+        Recording status and, for failed recordings, the error message
+    """
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
 
-        return result
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
 
-    except Exception as e:
+    if recording.user_id != current_user_id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to finish recording: {str(e)}"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this recording"
         )
 
+    return {
+        "id": recording.id,
+        "status": recording.status.value,
+        "error_message": recording.error_message,
+        "updated_at": recording.updated_at.isoformat() if recording.updated_at else None,
+    }
+
 
 @router.get("/")
 async def list_recordings(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_transcription: bool = False,
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all recordings for the current user
+    List the current user's recordings, newest first, one page at a time
 
     Args:
-        current_user: Authenticated user
+        limit: Maximum number of recordings to return
+        cursor: ``next_cursor`` of the previous page
+        include_transcription: Include decrypted transcription text
+        current_user_id: Authenticated user's ID
         db: Database session
 
     Returns:
-        List of recording objects
+        Recording summaries (``items``) and the cursor of the next page,
+        or None on the last page
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recordings = recording_repo.list_recordings(user_id=current_user.id)
-
-    # Decrypt transcriptions for display
-    result = []
-    for recording in recordings:
-        rec_dict = recording.to_dict()
-        if rec_dict.get('transcription_text'):
-            try:
-                rec_dict['transcription_text'] = encryption_service.decrypt_text(
-                    rec_dict['transcription_text']
-                )
-            except:
-                pass  # Keep encrypted if decryption fails
-        result.append(rec_dict)
+    before = _decode_cursor(cursor) if cursor else None
+
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    rows = await recording_repo.list_recording_summaries(
+        user_id=current_user_id,
+        limit=limit + 1,
+        before=before,
+        include_transcription=include_transcription
+    )
+
+    items = []
+    for row in rows[:limit]:
+        summary = _summary_dict(row)
+        if include_transcription:
+            # Decrypt transcriptions for display
+            summary['transcription_text'] = decrypt_transcription(row)
+        items.append(summary)
 
-    return result
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor(last.created_at, last.id)
+
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/{recording_id}")
 async def get_recording(
     recording_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific recording by ID
 
     Args:
         recording_id: ID of the recording
-        current_user: Authenticated user
+        current_user_id: Authenticated user's ID
         db: Database session
 
     Returns:
         Recording object
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recording = recording_repo.get_recording(recording_id)
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
 
     if not recording:
         raise HTTPException(
@@ -295,7 +764,7 @@ async def get_recording(
             detail="Recording not found"
         )
 
-    if recording.user_id != current_user.id:
+    if recording.user_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this recording"
@@ -303,23 +772,84 @@ async def get_recording(
 
     # Decrypt transcription for display
     rec_dict = recording.to_dict()
-    if rec_dict.get('transcription_text'):
-        try:
-            rec_dict['transcription_text'] = encryption_service.decrypt_text(
-                rec_dict['transcription_text']
-            )
-        except:
-            pass  # Keep encrypted if decryption fails
+    rec_dict['transcription_text'] = decrypt_transcription(recording)
 
     return rec_dict
 
 
+@router.get("/{recording_id}/audio")
+async def stream_recording_audio(
+    recording_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream the decrypted audio of a finished recording
+
+    Supports HTTP Range requests: only the encrypted frames covering the
+    requested bytes are decrypted, and plaintext is never written to disk.
+
+    Args:
+        recording_id: ID of the recording
+        range_header: Optional HTTP Range header
+        current_user_id: Authenticated user's ID
+        db: Database session
+
+    Returns:
+        Streaming audio response (206 Partial Content for range requests)
+    """
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
+
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+
+    if recording.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this recording"
+        )
+
+    try:
+        if not recording.audio_file_path:
+            raise FileNotFoundError(recording_id)
+        # Range requests need random access, so remote blobs are read from a local copy
+        audio_path = await blocking_io.run(blob_store.local_path, recording.audio_file_path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Audio not available for this recording"
+        )
+
+    size, read_range = await blocking_io.run(encryption_service.open_ranges, audio_path)
+    byte_range = _parse_range_header(range_header, size) if range_header else None
+    start, end = byte_range or (0, size)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start),
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    return StreamingResponse(
+        read_range(start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=ARCHIVE_FORMATS[audio_format_of(recording.audio_file_path)].media_type,
+        headers=headers,
+    )
+
+
 @router.patch("/{recording_id}/notes")
 async def update_recording_notes(
     recording_id: str,
     notes: str = Form(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update notes for a recording (Enhancement from PRD)
@@ -327,14 +857,14 @@ async def update_recording_notes(
     Args:
         recording_id: ID of the recording
         notes: Notes to add to the recording
-        current_user: Authenticated user
+        current_user_id: Authenticated user's ID
         db: Database session
 
     Returns:
         Updated recording object
     """
-    recording_repo = MySQLRecordingRepository(db)
-    recording = recording_repo.get_recording(recording_id)
+    recording_repo = AsyncMySQLRecordingRepository(db)
+    recording = await recording_repo.get_recording(recording_id)
 
     if not recording:
         raise HTTPException(
@@ -342,11 +872,11 @@ async def update_recording_notes(
             detail="Recording not found"
         )
 
-    if recording.user_id != current_user.id:
+    if recording.user_id != current_user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to modify this recording"
         )
 
-    recording = recording_repo.update_recording(recording_id, notes=notes)
+    recording = await recording_repo.update_recording(recording_id, notes=notes)
     return recording.to_dict()
@@ -0,0 +1,30 @@
+from storage.blob_store import (
+    BlobStore,
+    LocalBlobStore,
+    S3BlobStore,
+    create_blob_store,
+    blob_store,
+    chunk_key,
+    full_audio_key,
+    audio_format_of,
+)
+from storage.durability import DurabilityPolicy, FsyncEach, GroupCommit, NoSync, create_durability_policy
+from storage.layout import recording_dir, shard_prefix
+
+__all__ = [
+    "BlobStore",
+    "LocalBlobStore",
+    "S3BlobStore",
+    "create_blob_store",
+    "blob_store",
+    "chunk_key",
+    "full_audio_key",
+    "audio_format_of",
+    "DurabilityPolicy",
+    "FsyncEach",
+    "GroupCommit",
+    "NoSync",
+    "create_durability_policy",
+    "recording_dir",
+    "shard_prefix",
+]
@@ -0,0 +1,566 @@
+import os
+import uuid
+import shutil
+import logging
+import threading
+from typing import BinaryIO, Dict, Iterator, Optional, Protocol, Tuple
+from storage.durability import DurabilityPolicy, create_durability_policy
+from storage.layout import check_key, check_recording_id, flat_key_path, iter_recording_dirs, key_path, recording_dir
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Copy size for streaming blobs to and from local files
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Name of the assembled (encrypted) audio of a finished recording, per archival format
+FULL_AUDIO_FILENAME = "full_audio.{audio_format}.enc"
+
+# Suffix of local files being built for put_file
+STAGING_SUFFIX = ".staging"
+
+# Directory below the cache directory holding S3BlobStore's local copies
+CACHE_DIRNAME = ".blob_cache"
+
+# Objects deleted by one S3 DeleteObjects request (the API maximum)
+S3_DELETE_BATCH_SIZE = 1000
+
+
+def chunk_key(recording_id: str, chunk_index: int) -> str:
+    """Key of a recording's encrypted audio chunk"""
+    return f"{recording_id}/chunk_{chunk_index:04d}.webm.enc"
+
+
+def full_audio_key(recording_id: str, audio_format: str = "webm") -> str:
+    """Key of a recording's assembled encrypted audio"""
+    return f"{recording_id}/{FULL_AUDIO_FILENAME.format(audio_format=audio_format)}"
+
+
+def audio_format_of(key: str) -> str:
+    """Archival format of assembled audio, from its key ("webm" for older keys and paths)"""
+    prefix, suffix = FULL_AUDIO_FILENAME.split("{audio_format}")
+    name = key.rsplit("/", 1)[-1]
+    if name.startswith(prefix) and name.endswith(suffix):
+        return name[len(prefix):-len(suffix)]
+    return "webm"
+
+
+class BlobStore(Protocol):
+    """
+    Interface for audio blob storage
+
+    Blobs are addressed by store-relative keys such as
+    ``"<recording_id>/chunk_0000.webm.enc"``. Keys that are absolute paths
+    (rows written before keys were introduced) name local files and are
+    used as they are.
+    """
+
+    def open_writer(self, key: str) -> BinaryIO:
+        """Open a streaming sink for a blob; it is stored when the writer is closed"""
+        ...
+
+    def open_reader(self, key: str) -> BinaryIO:
+        """Open a blob as a streaming readable file object"""
+        ...
+
+    def put_file(self, key: str, path: str) -> None:
+        """Store a local file as a blob, consuming the file"""
+        ...
+
+    def local_path(self, key: str) -> str:
+        """
+        Get a local file holding a blob, for code that needs random access
+
+        Raises:
+            FileNotFoundError: If the blob does not exist
+        """
+        ...
+
+    def staging_path(self, key: str) -> str:
+        """Get a local path to build a blob in before handing it to put_file"""
+        ...
+
+    def exists(self, key: str) -> bool:
+        """Check whether a blob exists"""
+        ...
+
+    def size(self, key: str) -> int:
+        """Get the stored size of a blob in bytes"""
+        ...
+
+    def delete(self, key: str) -> None:
+        """Delete a blob; deleting a missing blob is not an error"""
+        ...
+
+    def iter_recordings(self) -> Iterator[Tuple[str, float]]:
+        """
+        List the recordings that have stored blobs
+
+        Yields:
+            ``(recording_id, last_modified)`` pairs, last_modified in epoch seconds
+        """
+        ...
+
+    def delete_recording(self, recording_id: str) -> int:
+        """Delete every blob of a recording; returns the number of files or objects removed"""
+        ...
+
+    def stale_local_copies(self) -> Iterator[str]:
+        """
+        Local copies of remote blobs that exceed the cache budget
+
+        Yields:
+            Paths that may be deleted, least recently used first
+        """
+        ...
+
+
+class _AtomicFileWriter:
+    """File-like sink that writes a temporary file and commits it under its final name on close"""
+
+    def __init__(self, path: str, durability: DurabilityPolicy):
+        self._path = path
+        self._tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        self._durability = durability
+        self._file = open(self._tmp_path, "wb")
+
+    def write(self, data: bytes) -> int:
+        return self._file.write(data)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        try:
+            self._durability.commit(self._tmp_path, self._path)
+        except Exception:
+            self._remove_tmp()
+            raise
+
+    def abort(self) -> None:
+        self._file.close()
+        self._remove_tmp()
+
+    def _remove_tmp(self) -> None:
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "_AtomicFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # The final name never points at a partly written blob
+            self.abort()
+
+
+class LocalBlobStore:
+    """
+    Blobs stored as files in a hash-prefix sharded tree, one directory per recording
+
+    ``"<recording_id>/chunk_0000.webm.enc"`` lives at
+    ``<root>/ab/cd/<recording_id>/chunk_0000.webm.enc``. Blobs are written
+    to a temporary file and renamed into place by the durability policy,
+    so readers only ever see complete files. Blobs written by older
+    versions in the flat ``<root>/<recording_id>/`` tree are still found.
+
+    The root defaults to ``AUDIO_STORAGE_PATH``, read when a blob is
+    accessed, so the store follows configuration changes.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        shard_depth: Optional[int] = None,
+        durability: Optional[DurabilityPolicy] = None
+    ):
+        self._root = root
+        self.shard_depth = shard_depth
+        self.durability = durability or create_durability_policy(settings.AUDIO_STORAGE_DURABILITY)
+
+    @property
+    def root(self) -> str:
+        return self._root or settings.AUDIO_STORAGE_PATH
+
+    def path(self, key: str) -> str:
+        """Path where a blob is written"""
+        if os.path.isabs(key):
+            return key
+        return key_path(self.root, key, self.shard_depth)
+
+    def open_writer(self, key: str) -> _AtomicFileWriter:
+        path = self.path(key)
+        self.durability.makedirs(os.path.dirname(path))
+        return _AtomicFileWriter(path, self.durability)
+
+    def open_reader(self, key: str) -> BinaryIO:
+        return open(self._existing_path(key), "rb")
+
+    def put_file(self, key: str, path: str) -> None:
+        target = self.path(key)
+        self.durability.makedirs(os.path.dirname(target))
+        self.durability.commit(path, target)
+
+    def local_path(self, key: str) -> str:
+        path = self._existing_path(key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return path
+
+    def staging_path(self, key: str) -> str:
+        path = self.path(key) + STAGING_SUFFIX
+        self.durability.makedirs(os.path.dirname(path))
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._existing_path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._existing_path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._existing_path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_recordings(self) -> Iterator[Tuple[str, float]]:
+        for recording_id, directory in iter_recording_dirs(self.root, self.shard_depth):
+            try:
+                yield recording_id, os.path.getmtime(directory)
+            except FileNotFoundError:
+                continue
+
+    def delete_recording(self, recording_id: str) -> int:
+        # The directory also holds the recording's local working files
+        check_recording_id(recording_id)
+        deleted = 0
+        for directory in (
+            recording_dir(self.root, recording_id, self.shard_depth),
+            flat_key_path(self.root, recording_id),
+        ):
+            if os.path.isdir(directory):
+                deleted += sum(len(names) for _, _, names in os.walk(directory))
+                shutil.rmtree(directory, ignore_errors=True)
+        return deleted
+
+    def stale_local_copies(self) -> Iterator[str]:
+        # Local blobs are the originals, not copies
+        return iter(())
+
+    def _existing_path(self, key: str) -> str:
+        """Path of a blob, falling back to the flat tree for blobs written before sharding"""
+        path = self.path(key)
+        if os.path.isabs(key) or os.path.exists(path):
+            return path
+        flat_path = flat_key_path(self.root, key)
+        return flat_path if os.path.exists(flat_path) else path
+
+
+def _create_s3_client():
+    """S3 storage needs the optional ``boto3`` package (``pip install boto3``)"""
+    try:
+        import boto3
+    except ImportError:
+        raise RuntimeError("The s3 blob store needs the boto3 package (pip install boto3)")
+
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        region_name=settings.S3_REGION,
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+    )
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class _StagedUpload:
+    """File-like sink that spools a blob to a local file and uploads it on close"""
+
+    def __init__(self, store: "S3BlobStore", key: str):
+        self._store = store
+        self._key = key
+        self._path = f"{store.staging_path(key)}.{threading.get_ident()}.upload"
+        self._file = open(self._path, "wb")
+
+    def write(self, data: bytes) -> int:
+        return self._file.write(data)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        self._store.put_file(self._key, self._path)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    def __enter__(self) -> "_StagedUpload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Nothing is uploaded for a write that failed part way
+            self.abort()
+
+
+class S3BlobStore:
+    """
+    Blobs stored as objects in an S3-compatible bucket (AWS S3, MinIO, ...)
+
+    Files larger than one part are sent with a multipart upload, so memory
+    use does not depend on the size of a recording. Blobs needed as local
+    files (assembly, range requests) are downloaded into a cache below
+    ``cache_dir`` and revalidated against the object's ETag; blobs written
+    through this store are cached as they are uploaded. The cache is
+    bounded by ``cache_max_bytes``: stale_local_copies names the least
+    recently used copies beyond it, which the retention sweeper deletes.
+    """
+
+    def __init__(
+        self,
+        bucket: Optional[str] = None,
+        prefix: Optional[str] = None,
+        client=None,
+        cache_dir: Optional[str] = None,
+        part_size: Optional[int] = None,
+        cache_max_bytes: Optional[int] = None
+    ):
+        self.bucket = bucket or settings.S3_BUCKET
+        self.prefix = prefix if prefix is not None else settings.S3_PREFIX
+        self.part_size = part_size or settings.S3_MULTIPART_PART_SIZE
+        self.cache_max_bytes = (
+            cache_max_bytes if cache_max_bytes is not None
+            else settings.S3_CACHE_MAX_BYTES
+        )
+        self._client = client
+        self._cache_dir = cache_dir
+        self._etags: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = _create_s3_client()
+        return self._client
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir or settings.AUDIO_STORAGE_PATH
+
+    @property
+    def cache_root(self) -> str:
+        """Directory of cached copies, apart from other local working state"""
+        return os.path.join(self.cache_dir, CACHE_DIRNAME)
+
+    def open_writer(self, key: str) -> _StagedUpload:
+        return _StagedUpload(self, key)
+
+    def open_reader(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+        except Exception as e:
+            if _is_not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def put_file(self, key: str, path: str) -> None:
+        etag = self._upload(self._object_key(key), path)
+        cache_path = self._cache_path(key)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        os.replace(path, cache_path)
+        with self._lock:
+            self._etags[key] = etag
+
+    def local_path(self, key: str) -> str:
+        if os.path.isabs(key):
+            return key
+
+        etag = self._head(key)["ETag"]
+        path = self._cache_path(key)
+        with self._lock:
+            cached = self._etags.get(key) == etag
+        if cached and os.path.exists(path):
+            # Modification time doubles as last use for cache eviction
+            os.utime(path)
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.download"
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(response["Body"], f, COPY_BUFFER_SIZE)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._etags[key] = response["ETag"]
+        return path
+
+    def staging_path(self, key: str) -> str:
+        path = key_path(os.path.join(self.cache_dir, ".staging"), key) + STAGING_SUFFIX
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._head(key)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, key: str) -> int:
+        return self._head(key)["ContentLength"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        with self._lock:
+            self._etags.pop(key, None)
+        try:
+            os.remove(self._cache_path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_recordings(self) -> Iterator[Tuple[str, float]]:
+        # Listings are sorted by key, so a recording's objects are adjacent
+        current, last_modified = None, 0.0
+        for item in self._list_objects(self.prefix):
+            recording_id = item["Key"][len(self.prefix):].split("/", 1)[0]
+            modified = item["LastModified"].timestamp()
+            if recording_id == current:
+                last_modified = max(last_modified, modified)
+                continue
+            if current is not None:
+                yield current, last_modified
+            current, last_modified = recording_id, modified
+        if current is not None:
+            yield current, last_modified
+
+    def delete_recording(self, recording_id: str) -> int:
+        check_recording_id(recording_id)
+        object_keys = [item["Key"] for item in self._list_objects(f"{self.prefix}{recording_id}/")]
+        for start in range(0, len(object_keys), S3_DELETE_BATCH_SIZE):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={
+                    "Objects": [{"Key": key} for key in object_keys[start:start + S3_DELETE_BATCH_SIZE]],
+                    "Quiet": True,
+                },
+            )
+
+        with self._lock:
+            for key in [key for key in self._etags if key.startswith(f"{recording_id}/")]:
+                del self._etags[key]
+        for root in (self.cache_root, os.path.join(self.cache_dir, ".staging")):
+            shutil.rmtree(recording_dir(root, recording_id), ignore_errors=True)
+        return len(object_keys)
+
+    def stale_local_copies(self) -> Iterator[str]:
+        copies = []
+        for directory, _, names in os.walk(self.cache_root):
+            for name in names:
+                if name.endswith(".download"):
+                    continue  # Still being written
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                copies.append((stat.st_mtime, stat.st_size, path))
+
+        cached_bytes = sum(size for _, size, _ in copies)
+        for _, size, path in sorted(copies):
+            if cached_bytes <= self.cache_max_bytes:
+                return
+            yield path
+            cached_bytes -= size
+
+    def _object_key(self, key: str) -> str:
+        check_key(key)
+        return f"{self.prefix}{key}"
+
+    def _cache_path(self, key: str) -> str:
+        return key_path(self.cache_root, key)
+
+    def _list_objects(self, prefix: str) -> Iterator[dict]:
+        """Objects below a prefix, in key order, one listing page at a time"""
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        while True:
+            response = self.client.list_objects_v2(**kwargs)
+            yield from response.get("Contents", [])
+            if not response.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    def _head(self, key: str) -> dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def _upload(self, object_key: str, path: str) -> str:
+        """Upload a file, in parts if it is larger than one part; returns the ETag"""
+        if os.path.getsize(path) <= self.part_size:
+            with open(path, "rb") as f:
+                return self.client.put_object(Bucket=self.bucket, Key=object_key, Body=f)["ETag"]
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=object_key)["UploadId"]
+        try:
+            parts = []
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(self.part_size)
+                    if not data:
+                        break
+                    part_number = len(parts) + 1
+                    response = self.client.upload_part(
+                        Bucket=self.bucket,
+                        Key=object_key,
+                        UploadId=upload_id,
+                        PartNumber=part_number,
+                        Body=data,
+                    )
+                    parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+            response = self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id)
+            raise
+        return response["ETag"]
+
+
+def create_blob_store(name: str) -> BlobStore:
+    """
+    Create the blob store selected in settings
+
+    Args:
+        name: "local" or "s3"
+
+    Returns:
+        Blob store instance
+    """
+    if name == "local":
+        return LocalBlobStore()
+    if name == "s3":
+        return S3BlobStore()
+    raise ValueError(f"Unknown blob store backend: {name}")
+
+
+# Global audio blob store instance
+blob_store = create_blob_store(settings.BLOB_STORE_BACKEND)
@@ -0,0 +1,172 @@
+import os
+import time
+import threading
+from typing import List, Optional, Protocol, Tuple
+from config import settings
+
+
+def fsync_path(path: str) -> None:
+    """Flush a file's (or directory's) data and metadata to stable storage"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def makedirs_durably(directory: str) -> None:
+    """
+    Create a directory and any missing parents, each one durably
+
+    A new directory only survives a crash once its parent has been
+    fsynced, so the parent of every directory created here is.
+    """
+    missing = []
+    path = os.path.abspath(directory)
+    while not os.path.isdir(path):
+        missing.append(path)
+        path = os.path.dirname(path)
+
+    for path in reversed(missing):
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            pass  # Created by a concurrent writer; sync it here all the same
+        fsync_path(os.path.dirname(path))
+
+
+class DurabilityPolicy(Protocol):
+    """How a fully written temporary file is moved to its final name"""
+
+    def makedirs(self, directory: str) -> None:
+        """Create a directory and missing parents, durably if the policy says so"""
+        ...
+
+    def commit(self, tmp_path: str, path: str) -> None:
+        """Atomically rename tmp_path to path, durably if the policy says so"""
+        ...
+
+
+class NoSync:
+    """Atomic rename only; a crash can lose recently acknowledged files"""
+
+    def makedirs(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+
+    def commit(self, tmp_path: str, path: str) -> None:
+        os.replace(tmp_path, path)
+
+
+class FsyncEach:
+    """
+    Every file is durable before its write returns
+
+    The data is fsynced before the rename (so the final name never points
+    at a partly written file) and the directory after it (so the rename
+    itself survives a crash). Directories created for a file, such as the
+    shard and recording directories of a recording's first chunk, are
+    synced into their parents too.
+    """
+
+    def makedirs(self, directory: str) -> None:
+        makedirs_durably(directory)
+
+    def commit(self, tmp_path: str, path: str) -> None:
+        fsync_path(tmp_path)
+        os.replace(tmp_path, path)
+        fsync_path(os.path.dirname(path))
+
+
+class _CommitGroup:
+    def __init__(self):
+        self.files: List[Tuple[str, str]] = []
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommit:
+    """
+    Files written while a flush is running are made durable together
+
+    The first writer of a group leads it: once the previous group's flush
+    has finished it closes the group and flushes every file in it: all
+    fsynced, renamed, and each directory fsynced once. Writes arriving
+    meanwhile open the next group, led by the first of them, so every
+    writer flushes at most its own group and returns only after its file
+    is durable. Under concurrent uploads the fsyncs are batched and
+    chunks of one recording share their directory fsync.
+    ``window_seconds`` optionally delays each flush to collect bigger
+    groups on devices with slow fsyncs.
+    """
+
+    def __init__(self, window_seconds: Optional[float] = None):
+        self.window_seconds = (
+            window_seconds if window_seconds is not None
+            else settings.AUDIO_STORAGE_GROUP_COMMIT_MS / 1000
+        )
+        self._group: Optional[_CommitGroup] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def makedirs(self, directory: str) -> None:
+        # Only a recording's first file creates directories; not worth batching
+        makedirs_durably(directory)
+
+    def commit(self, tmp_path: str, path: str) -> None:
+        with self._lock:
+            leader = self._group is None
+            if leader:
+                self._group = _CommitGroup()
+            group = self._group
+            group.files.append((tmp_path, path))
+
+        if leader:
+            self._flush_group(group)
+        group.done.wait()
+
+        if group.error is not None:
+            raise group.error
+
+    def _flush_group(self, group: _CommitGroup) -> None:
+        """Wait for the previous flush, then close and flush this group"""
+        with self._flush_lock:
+            if self.window_seconds:
+                time.sleep(self.window_seconds)
+            with self._lock:
+                # Later writers start the next group
+                self._group = None
+            try:
+                self._flush(group.files)
+            except BaseException as e:
+                group.error = e
+            finally:
+                group.done.set()
+
+    def _flush(self, files: List[Tuple[str, str]]) -> None:
+        for tmp_path, _ in files:
+            fsync_path(tmp_path)
+        directories = set()
+        for tmp_path, path in files:
+            os.replace(tmp_path, path)
+            directories.add(os.path.dirname(path))
+        for directory in directories:
+            fsync_path(directory)
+
+
+def create_durability_policy(name: str) -> DurabilityPolicy:
+    """
+    Create the durability policy selected in settings
+
+    Args:
+        name: "fsync" (every file), "group" (group commit) or "none"
+
+    Returns:
+        Policy instance
+    """
+    if name == "fsync":
+        return FsyncEach()
+    if name == "group":
+        return GroupCommit()
+    if name == "none":
+        return NoSync()
+    raise ValueError(f"Unknown audio storage durability mode: {name}")
@@ -0,0 +1,99 @@
+import os
+import hashlib
+from typing import Iterator, List, Optional, Tuple
+from config import settings
+
+
+def check_key(key: str) -> None:
+    """Reject keys that would escape the storage root"""
+    if not key or key.startswith("/") or ".." in key.split("/"):
+        raise ValueError(f"Invalid blob key: {key!r}")
+
+
+def check_recording_id(recording_id: str) -> None:
+    """Reject recording IDs that are not a single path component"""
+    check_key(recording_id)
+    if "/" in recording_id:
+        raise ValueError(f"Invalid recording ID: {recording_id!r}")
+
+
+def shard_prefix(recording_id: str, depth: Optional[int] = None) -> List[str]:
+    """
+    Hash-prefix directories of a recording, e.g. ``["ab", "cd"]``
+
+    The prefix comes from a hash of the ID rather than the ID itself, so
+    recordings spread evenly over 256 directories per level whatever the
+    ID format.
+
+    Args:
+        recording_id: ID of the recording (first component of its keys)
+        depth: Number of two-character levels (settings when None, 0 for a flat tree)
+
+    Returns:
+        Directory names from the root down
+    """
+    depth = settings.AUDIO_STORAGE_SHARD_DEPTH if depth is None else depth
+    digest = hashlib.sha256(recording_id.encode()).hexdigest()
+    return [digest[2 * level:2 * level + 2] for level in range(depth)]
+
+
+def key_path(root: str, key: str, depth: Optional[int] = None) -> str:
+    """
+    Local path of a blob key in the sharded tree
+
+    ``"<recording_id>/chunk_0000.webm.enc"`` lives at
+    ``<root>/ab/cd/<recording_id>/chunk_0000.webm.enc``.
+    """
+    check_key(key)
+    parts = key.split("/")
+    return os.path.join(root, *shard_prefix(parts[0], depth), *parts)
+
+
+def flat_key_path(root: str, key: str) -> str:
+    """Local path of a blob key in the unsharded tree written by older versions"""
+    check_key(key)
+    return os.path.join(root, *key.split("/"))
+
+
+def recording_dir(root: str, recording_id: str, depth: Optional[int] = None) -> str:
+    """Directory holding a recording's files in the sharded tree"""
+    return os.path.join(root, *shard_prefix(recording_id, depth), recording_id)
+
+
+def _subdirectories(path: str) -> List[os.DirEntry]:
+    """Directories below path, skipping dot directories (working state)"""
+    try:
+        with os.scandir(path) as entries:
+            return [entry for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+    except FileNotFoundError:
+        return []
+
+
+def _sharded_recording_dirs(path: str, depth: int) -> Iterator[Tuple[str, str]]:
+    for entry in _subdirectories(path):
+        if not depth:
+            yield entry.name, entry.path
+        elif len(entry.name) == 2:
+            yield from _sharded_recording_dirs(entry.path, depth - 1)
+
+
+def iter_recording_dirs(root: str, depth: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Walk the recording directories of a storage tree
+
+    Directories left in the flat tree by older versions are included.
+
+    Args:
+        root: Root of the tree
+        depth: Number of shard levels (settings when None)
+
+    Yields:
+        ``(recording_id, directory)`` pairs
+    """
+    depth = settings.AUDIO_STORAGE_SHARD_DEPTH if depth is None else depth
+    yield from _sharded_recording_dirs(root, depth)
+    if depth:
+        # Shard directories have two-character names
+        for entry in _subdirectories(root):
+            if len(entry.name) != 2:
+                yield entry.name, entry.path
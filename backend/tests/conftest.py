@@ -1,15 +1,24 @@
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from database import Base
 from models.user import User
 from models.recording import Recording, RecordingChunk
 
 
 @pytest.fixture
-def test_db():
+def test_db(tmp_path):
     """Create a test database"""
-    engine = create_engine("sqlite:///:memory:")
+    # A database file, so the sync session and the async engine used by
+    # request handlers (aiosqlite) see the same data; the API test client
+    # runs handlers in another thread
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    )
     Base.metadata.create_all(engine)
     SessionLocal = sessionmaker(bind=engine)
     db = SessionLocal()
@@ -18,6 +27,57 @@ def test_db():
 
     db.close()
     Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(test_db):
+    """Create an AsyncSession factory on the test database"""
+    from database import async_database_url
+
+    # NullPool: connections never outlive the event loop that opened them
+    async_engine = create_async_engine(
+        async_database_url(str(test_db.get_bind().url)),
+        poolclass=NullPool,
+    )
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def async_test_db(async_session_factory):
+    """Create an async session on the test database"""
+    async with async_session_factory() as db:
+        yield db
+
+
+@pytest.fixture(autouse=True)
+def transcription_cache_backend(monkeypatch):
+    """Give every test an empty in-memory transcription cache"""
+    from llm.transcription_cache import MemoryCacheBackend, transcription_cache
+
+    backend = MemoryCacheBackend(max_entries=100)
+    monkeypatch.setattr(transcription_cache, "backend", backend)
+    return backend
+
+
+@pytest.fixture(autouse=True)
+def empty_principal_cache():
+    """Give every test an empty authenticated user cache"""
+    from utils.principal_cache import principal_cache
+
+    principal_cache.clear()
+    yield principal_cache
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def empty_transcript_cache():
+    """Give every test an empty decrypted transcription cache"""
+    from utils.transcript_cache import transcript_cache
+
+    transcript_cache.clear()
+    yield transcript_cache
+    transcript_cache.clear()
 
 
 @pytest.fixture
@@ -45,3 +105,184 @@ def sample_recording(test_db, sample_user):
     test_db.commit()
     test_db.refresh(recording)
     return recording
+
+
+@pytest.fixture
+def api_client(async_session_factory, sample_user):
+    """Create a test client authenticated as sample_user against test_db"""
+    from fastapi.testclient import TestClient
+    from main import app
+    from database import get_async_db
+    from middleware.auth import get_current_user, get_current_user_id
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_user] = lambda: sample_user
+    app.dependency_overrides[get_current_user_id] = lambda: sample_user.id
+
+    yield TestClient(app)
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def stub_transcription_server():
+    """Run a local HTTP/1.1 server that mimics the transcription API"""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    client_ports = set()
+    auth_headers = set()
+    bodies = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if self.headers["Transfer-Encoding"] == "chunked":
+                body = b""
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    body += self.rfile.read(size + 2)[:size]
+                    if not size:
+                        break
+            else:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+            bodies.append((self.headers["Content-Type"], body))
+            client_ports.add(self.client_address[1])
+            auth_headers.add(self.headers["Authorization"])
+
+            body = json.dumps({"transcription": "stub transcription"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/transcribe"
+    server.client_ports = client_ports
+    server.auth_headers = auth_headers
+    server.bodies = bodies
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def s3_blob_store(tmp_path, monkeypatch):
+    """Use an S3 blob store backed by an in-memory MinIO-style stub everywhere"""
+    import io
+    import hashlib
+    import itertools
+    from datetime import datetime, timezone
+    from storage.blob_store import S3BlobStore
+
+    class NotFound(Exception):
+        """Shaped like botocore's ClientError for a missing object"""
+
+        response = {"Error": {"Code": "404"}}
+
+    class InMemoryS3Client:
+        """The subset of the boto3 S3 client API used by S3BlobStore"""
+
+        def __init__(self):
+            self.objects = {}
+            self.modified = {}
+            self.uploads = {}
+            self.multipart_keys = []
+            self._upload_ids = itertools.count(1)
+
+        def put_object(self, Bucket, Key, Body):
+            data = Body.read() if hasattr(Body, "read") else bytes(Body)
+            return self._store(Bucket, Key, data)
+
+        def get_object(self, Bucket, Key):
+            data = self._object(Bucket, Key)
+            return {"Body": io.BytesIO(data), "ContentLength": len(data), "ETag": self._etag(data)}
+
+        def head_object(self, Bucket, Key):
+            data = self._object(Bucket, Key)
+            return {"ContentLength": len(data), "ETag": self._etag(data)}
+
+        def delete_object(self, Bucket, Key):
+            self.objects.pop((Bucket, Key), None)
+            return {}
+
+        def delete_objects(self, Bucket, Delete):
+            for item in Delete["Objects"]:
+                self.objects.pop((Bucket, item["Key"]), None)
+            return {}
+
+        def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None, MaxKeys=2):
+            # Tiny pages, so listings exercise pagination
+            keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+            start = int(ContinuationToken or 0)
+            page = keys[start:start + MaxKeys]
+            response = {
+                "Contents": [{"Key": key, "LastModified": self.modified[(Bucket, key)]} for key in page],
+                "IsTruncated": start + MaxKeys < len(keys),
+            }
+            if response["IsTruncated"]:
+                response["NextContinuationToken"] = str(start + MaxKeys)
+            return response
+
+        def create_multipart_upload(self, Bucket, Key):
+            upload_id = str(next(self._upload_ids))
+            self.uploads[upload_id] = {}
+            return {"UploadId": upload_id}
+
+        def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+            self.uploads[UploadId][PartNumber] = Body
+            return {"ETag": self._etag(Body)}
+
+        def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+            parts = self.uploads.pop(UploadId)
+            data = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+            self.multipart_keys.append(Key)
+            return self._store(Bucket, Key, data)
+
+        def abort_multipart_upload(self, Bucket, Key, UploadId):
+            self.uploads.pop(UploadId, None)
+            return {}
+
+        def _store(self, bucket, key, data):
+            self.objects[(bucket, key)] = data
+            self.modified[(bucket, key)] = datetime.now(timezone.utc)
+            return {"ETag": self._etag(data)}
+
+        def _object(self, bucket, key):
+            try:
+                return self.objects[(bucket, key)]
+            except KeyError:
+                raise NotFound(key)
+
+        def _etag(self, data):
+            return f'"{hashlib.md5(data).hexdigest()}"'
+
+    store = S3BlobStore(
+        bucket="audio",
+        prefix="recordings/",
+        client=InMemoryS3Client(),
+        cache_dir=str(tmp_path / "blob_cache"),
+        part_size=64 * 1024,
+    )
+
+    from routers import recordings
+    from jobs import assembly, live_transcription, retention, transcription
+    for module in (recordings, assembly, live_transcription, retention, transcription):
+        monkeypatch.setattr(module, "blob_store", store)
+
+    return store
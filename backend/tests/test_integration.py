@@ -1,3 +1,4 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
@@ -105,6 +106,122 @@ class TestRecordingFlow:
         assert "message" in response.json()
 
 
+class TestAuthentication:
+    """Tests for the authentication dependencies and the principal cache"""
+
+    @staticmethod
+    def _credentials(user_id):
+        from fastapi.security import HTTPAuthorizationCredentials
+        from utils.jwt_utils import create_access_token
+
+        token = create_access_token({"sub": user_id})
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_is_cached(self, async_test_db, sample_user):
+        """Test the user is loaded once and then served without a database session"""
+        from middleware.auth import get_current_user
+
+        credentials = self._credentials(sample_user.id)
+        user = await get_current_user(credentials, async_test_db)
+        cached = await get_current_user(credentials, db=None)
+
+        assert user.email == sample_user.email
+        assert cached is user
+
+    @pytest.mark.asyncio
+    async def test_update_user_invalidates_cache(self, async_test_db, sample_user):
+        """Test a cached user is reloaded after update_user"""
+        from middleware.auth import get_current_user
+        from repositories.async_user_repository import AsyncMySQLUserRepository
+        from utils.principal_cache import principal_cache
+
+        credentials = self._credentials(sample_user.id)
+        await get_current_user(credentials, async_test_db)
+        await AsyncMySQLUserRepository(async_test_db).update_user(sample_user.id, display_name="Renamed")
+
+        assert principal_cache.get(sample_user.id) is None
+        user = await get_current_user(credentials, async_test_db)
+        assert user.display_name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_rejected(self, async_test_db):
+        """Test a valid token for a missing user is not cached"""
+        from fastapi import HTTPException
+        from middleware.auth import get_current_user
+        from utils.principal_cache import principal_cache
+
+        with pytest.raises(HTTPException) as error:
+            await get_current_user(self._credentials("missing"), async_test_db)
+
+        assert error.value.status_code == 401
+        assert principal_cache.get("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_get_current_user_id_from_claims(self):
+        """Test the user ID comes from the token alone, and bad tokens are rejected"""
+        from fastapi import HTTPException
+        from fastapi.security import HTTPAuthorizationCredentials
+        from middleware.auth import get_current_user_id
+
+        assert await get_current_user_id(self._credentials("user-1")) == "user-1"
+        with pytest.raises(HTTPException) as error:
+            await get_current_user_id(HTTPAuthorizationCredentials(scheme="Bearer", credentials="bad"))
+        assert error.value.status_code == 401
+
+    def test_principal_cache_expiry_and_lru(self, monkeypatch):
+        """Test entries expire after the TTL and the least recently used is evicted"""
+        from models.user import User
+        from utils import principal_cache as module
+
+        now = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+        cache = module.PrincipalCache(ttl_seconds=10, max_entries=2)
+        users = [User(id=f"user-{i}", google_id=str(i), email=f"{i}@example.com") for i in range(3)]
+
+        cache.set(users[0])
+        cache.set(users[1])
+        cache.get("user-0")
+        cache.set(users[2])
+        assert cache.get("user-1") is None
+        assert cache.get("user-0") is users[0]
+
+        now[0] += 10
+        assert cache.get("user-0") is None
+
+    def test_verified_token_cache(self):
+        """Test a token is verified once, counted, and copies are returned"""
+        from unittest.mock import patch
+        from utils import jwt_utils
+
+        cache = jwt_utils.VerifiedTokenCache(max_entries=10)
+        token = jwt_utils.create_access_token({"sub": "user-1"})
+
+        with patch.object(jwt_utils.jwt, "decode", wraps=jwt_utils.jwt.decode) as decode:
+            first = jwt_utils.decode_access_token(token, cache=cache)
+            first["sub"] = "tampered"
+            second = jwt_utils.decode_access_token(token, cache=cache)
+
+        assert decode.call_count == 1
+        assert second["sub"] == "user-1"
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+    def test_verified_token_cache_honours_expiry(self, monkeypatch):
+        """Test cached tokens stop decoding once they expire, and bad tokens are not cached"""
+        from datetime import timedelta
+        from utils import jwt_utils
+
+        cache = jwt_utils.VerifiedTokenCache(max_entries=10)
+        token = jwt_utils.create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=1))
+        assert jwt_utils.decode_access_token(token, cache=cache) is not None
+
+        now = jwt_utils.time.time()
+        monkeypatch.setattr(jwt_utils.time, "time", lambda: now + 120)
+        assert cache.get(token) is None
+        assert jwt_utils.decode_access_token(token[:-2] + "xx", cache=cache) is None
+        assert cache.stats()["entries"] == 0
+
+
 class TestLLMProvider:
     """Tests for LLM provider"""
 
@@ -122,6 +239,191 @@ class TestLLMProvider:
         assert "Mock transcription" in transcription
 
 
+    def test_stitch_transcripts_removes_overlap(self):
+        """Test text repeated in the overlap between segments appears once"""
+        from llm.segmented_provider import stitch_transcripts
+
+        stitched = stitch_transcripts([
+            "The patient reports mild chest pain since Tuesday",
+            "pain since Tuesday, no shortness of breath.",
+        ])
+
+        assert stitched == "The patient reports mild chest pain since Tuesday, no shortness of breath."
+
+    def test_stitch_transcripts_without_overlap(self):
+        """Test unrelated segments are simply joined"""
+        from llm.segmented_provider import stitch_transcripts
+
+        assert stitch_transcripts(["first part", "second part"]) == "first part second part"
+
+    def test_stitch_transcripts_keeps_words_shared_away_from_the_seam(self):
+        """Test words two segments merely have in common are not taken for overlap"""
+        from llm.segmented_provider import stitch_transcripts
+
+        first = (
+            "The patient reports pain in the lower back for two weeks and denies fever or chills. "
+            "Vitals were stable today."
+        )
+        second = "Plan is physical therapy and we will follow up with the patient in the clinic next month."
+
+        assert stitch_transcripts([first, second]) == f"{first} {second}"
+
+    def test_stitch_transcripts_caps_overlap_length(self):
+        """Test a run longer than the overlap allows is not removed"""
+        from llm.segmented_provider import stitch_transcripts
+
+        assert stitch_transcripts(["a b c d", "b c d e"], max_overlap_words=3) == "a b c d e"
+        assert stitch_transcripts(["a b c d", "a b c d e"], max_overlap_words=3) == "a b c d a b c d e"
+
+    def test_split_pcm_segments_overlap(self):
+        """Test segments cover the whole stream and overlap their neighbours"""
+        from utils.audio_utils import split_pcm_segments, PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+
+        bytes_per_second = PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH
+        pcm = os.urandom(bytes_per_second * 25)
+        blocks = [pcm[i:i + 4096] for i in range(0, len(pcm), 4096)]
+
+        segments = list(split_pcm_segments(iter(blocks), segment_seconds=10, overlap_seconds=1))
+
+        assert len(segments) == 3
+        for (start, data), (next_start, _) in zip(segments, segments[1:]):
+            assert start + len(data) / bytes_per_second > next_start
+        last_start, last_data = segments[-1]
+        assert round(last_start * bytes_per_second) + len(last_data) == len(pcm)
+        for start, data in segments:
+            offset = round(start * bytes_per_second)
+            assert pcm[offset:offset + len(data)] == data
+
+    def test_segmented_provider_transcribes_concurrently(self):
+        """Test segments run in parallel up to the limit and are stitched in order"""
+        import threading
+        import time
+        import wave
+        from llm.segmented_provider import SegmentedTranscriptionProvider
+        from utils.audio_utils import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        class SlowProvider:
+            def transcribe_audio(self, audio):
+                with lock:
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                time.sleep(0.05)
+                with lock:
+                    in_flight[0] -= 1
+                with wave.open(audio) as wav:
+                    assert wav.getframerate() == PCM_SAMPLE_RATE
+                return audio.name
+
+        provider = SegmentedTranscriptionProvider(
+            SlowProvider(), segment_seconds=1, overlap_seconds=0, max_concurrency=3
+        )
+        pcm = bytes(PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH * 8)
+
+        text = provider.transcribe_pcm(iter([pcm]))
+
+        assert text.split()[:3] == ["segment_0000.wav", "segment_0001.wav", "segment_0002.wav"]
+        assert 1 < peak[0] <= 3
+
+    def test_segmented_provider_propagates_failures(self):
+        """Test a failing segment fails the whole transcription"""
+        from llm.segmented_provider import SegmentedTranscriptionProvider
+        from utils.audio_utils import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+
+        provider = Mock()
+        provider.transcribe_audio.side_effect = Exception("API error")
+        segmented = SegmentedTranscriptionProvider(provider, segment_seconds=1, overlap_seconds=0)
+
+        with pytest.raises(Exception, match="API error"):
+            segmented.transcribe_pcm(iter([bytes(PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH * 4)]))
+
+    def test_async_provider_reuses_pooled_connection(self, stub_transcription_server):
+        """Test the async provider talks to a local stub over one keep-alive connection"""
+        import asyncio
+        import io
+        import httpx
+        from llm.requestyai_provider import AsyncRequestYaiProvider
+
+        async def transcribe_three():
+            async with httpx.AsyncClient() as client:
+                provider = AsyncRequestYaiProvider(api_key="test-key", client=client)
+                provider.api_url = stub_transcription_server.url
+                return [
+                    await provider.transcribe_audio(io.BytesIO(b"audio %d" % i))
+                    for i in range(3)
+                ]
+
+        assert asyncio.run(transcribe_three()) == ["stub transcription"] * 3
+        assert len(stub_transcription_server.client_ports) == 1
+        assert stub_transcription_server.auth_headers == {"Bearer test-key"}
+
+    def test_async_provider_streams_audio(self, stub_transcription_server, tmp_path):
+        """Test files and decrypt-on-read streams are uploaded in blocks, not read whole"""
+        import asyncio
+        import httpx
+        from llm import requestyai_provider
+        from llm.requestyai_provider import AsyncRequestYaiProvider
+        from utils.encryption_utils import encryption_service
+
+        data = os.urandom(requestyai_provider.UPLOAD_BLOCK_SIZE * 3 + 5)
+        plain_path = tmp_path / "chunk.webm"
+        plain_path.write_bytes(data)
+        encrypted_path = str(tmp_path / "chunk.webm.enc")
+        with encryption_service.open_encrypted_writer(encrypted_path) as writer:
+            writer.write(data)
+        reader = encryption_service.open_decrypted_reader(encrypted_path, "chunk.webm")
+        read_sizes = []
+        read = reader.read
+        reader.read = lambda size=-1: read_sizes.append(size) or read(size)
+
+        async def transcribe_both():
+            async with httpx.AsyncClient() as client:
+                provider = AsyncRequestYaiProvider(api_key="test-key", client=client)
+                provider.api_url = stub_transcription_server.url
+                return [
+                    await provider.transcribe_audio(str(plain_path)),
+                    await provider.transcribe_audio(reader),
+                ]
+
+        assert asyncio.run(transcribe_both()) == ["stub transcription"] * 2
+        assert read_sizes and all(size == requestyai_provider.UPLOAD_BLOCK_SIZE for size in read_sizes)
+        for content_type, body in stub_transcription_server.bodies:
+            boundary = content_type.split("boundary=")[1].encode()
+            assert body.startswith(b"--" + boundary + b"\r\n")
+            assert b'filename="chunk.webm"' in body
+            assert body.split(b"\r\n\r\n", 1)[1] == data + b"\r\n--" + boundary + b"--\r\n"
+
+    def test_segmented_provider_drives_async_provider_on_loop(self):
+        """Test segments for an async provider are scheduled on the given event loop"""
+        import asyncio
+        import threading
+        from llm.segmented_provider import SegmentedTranscriptionProvider
+        from utils.audio_utils import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        class AsyncProvider:
+            async def transcribe_audio(self, audio):
+                await asyncio.sleep(0.01)
+                return audio.name
+
+        try:
+            provider = SegmentedTranscriptionProvider(
+                AsyncProvider(), segment_seconds=1, overlap_seconds=0, loop=loop
+            )
+            text = provider.transcribe_pcm(iter([bytes(PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH * 2)]))
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+        assert text.startswith("segment_0000.wav segment_0001.wav")
+
+
 class TestEncryption:
     """Tests for encryption utilities"""
 
@@ -143,6 +445,20 @@ class TestEncryption:
         assert decrypted == original_text
 
 
+    def test_encrypt_decrypt_text_bytes(self):
+        """Test binary text encryption, and converting legacy ciphertext without decrypting"""
+        from utils.encryption_utils import encryption_service
+
+        original_text = "This is sensitive patient data"
+        encrypted = encryption_service.encrypt_text_bytes(original_text)
+        legacy = encryption_service.text_to_bytes(encryption_service.encrypt_text(original_text))
+
+        assert original_text.encode() not in encrypted
+        assert len(encrypted) < len(encryption_service.encrypt_text(original_text))
+        assert encryption_service.decrypt_text_bytes(encrypted) == original_text
+        assert encryption_service.decrypt_text_bytes(legacy) == original_text
+
+
     def test_encrypt_decrypt_file(self, tmp_path):
         """Test file encryption and decryption"""
         from utils.encryption_utils import EncryptionService
@@ -170,6 +486,85 @@ class TestEncryption:
         assert decrypted_file.read_text() == "Sensitive audio data"
 
 
+    def test_segmented_file_round_trip(self, tmp_path):
+        """Test multi-frame files round-trip through the segmented format"""
+        from utils.encryption_utils import EncryptionService, FILE_MAGIC, FRAME_SIZE
+
+        service = EncryptionService()
+        data = os.urandom(FRAME_SIZE * 3 + 123)
+
+        original_file = tmp_path / "original.bin"
+        original_file.write_bytes(data)
+        encrypted_file = tmp_path / "encrypted.bin"
+        decrypted_file = tmp_path / "decrypted.bin"
+
+        service.encrypt_file(str(original_file), str(encrypted_file))
+        assert encrypted_file.read_bytes()[:4] == FILE_MAGIC
+        assert service.plaintext_size(str(encrypted_file)) == len(data)
+
+        service.decrypt_file(str(encrypted_file), str(decrypted_file))
+        assert decrypted_file.read_bytes() == data
+
+    def test_decrypt_range(self, tmp_path):
+        """Test decrypting a byte range that spans a frame boundary"""
+        from utils.encryption_utils import EncryptionService, FRAME_SIZE
+
+        service = EncryptionService()
+        data = os.urandom(FRAME_SIZE * 2)
+
+        encrypted_file = tmp_path / "encrypted.bin"
+        with service.open_encrypted_writer(str(encrypted_file)) as writer:
+            writer.write(data)
+
+        start, end = FRAME_SIZE - 10, FRAME_SIZE + 10
+        assert b"".join(service.decrypt_range(str(encrypted_file), start, end)) == data[start:end]
+        assert b"".join(service.decrypt_range(str(encrypted_file), len(data) + 5)) == b""
+
+    def test_append_to_segmented_file(self, tmp_path):
+        """Test reopening an encrypted file to append only rewrites its tail"""
+        from utils.encryption_utils import EncryptionService, FRAME_SIZE
+
+        service = EncryptionService()
+        first, second = os.urandom(FRAME_SIZE + 7), os.urandom(FRAME_SIZE * 2)
+
+        encrypted_file = tmp_path / "encrypted.bin"
+        with service.open_encrypted_writer(str(encrypted_file)) as writer:
+            writer.write(first)
+        with service.open_encrypted_appender(str(encrypted_file)) as writer:
+            writer.write(second)
+
+        with service.open_decrypted_reader(str(encrypted_file)) as reader:
+            assert reader.read(10) == first[:10]
+            assert reader.read() == first[10:] + second
+
+    def test_truncated_segmented_file_is_rejected(self, tmp_path):
+        """Test dropping the final frame fails authentication"""
+        from cryptography.exceptions import InvalidTag
+        from utils.encryption_utils import EncryptionService, FRAME_SIZE, FRAME_OVERHEAD
+
+        service = EncryptionService()
+        encrypted_file = tmp_path / "encrypted.bin"
+        with service.open_encrypted_writer(str(encrypted_file)) as writer:
+            writer.write(os.urandom(FRAME_SIZE + 1))
+
+        encrypted_file.write_bytes(encrypted_file.read_bytes()[:-(1 + FRAME_OVERHEAD)])
+
+        with pytest.raises(InvalidTag):
+            b"".join(service.decrypt_range(str(encrypted_file)))
+
+    def test_decrypt_legacy_fernet_file(self, tmp_path):
+        """Test files encrypted as a single Fernet token can still be read"""
+        from utils.encryption_utils import EncryptionService
+
+        service = EncryptionService()
+        legacy_file = tmp_path / "legacy.bin"
+        legacy_file.write_bytes(service.cipher.encrypt(b"legacy audio"))
+        decrypted_file = tmp_path / "decrypted.bin"
+
+        service.decrypt_file(str(legacy_file), str(decrypted_file))
+        assert decrypted_file.read_bytes() == b"legacy audio"
+
+
 class TestAudioUtils:
     """Tests for audio utilities"""
 
@@ -186,3 +581,1720 @@ class TestAudioUtils:
 
         # Placeholder assertion
         assert True
+
+    def test_ffmpeg_input_errors_do_not_hang(self, tmp_path, monkeypatch):
+        """Test a failure while streaming input into ffmpeg is raised instead of waiting forever"""
+        import threading
+        from cryptography.exceptions import InvalidTag
+        from utils import audio_utils
+
+        converter = tmp_path / "ffmpeg"
+        converter.write_text("#!/bin/sh\ncat > /dev/null\n")
+        converter.chmod(0o755)
+        monkeypatch.setattr(audio_utils.AudioSegment, "converter", str(converter))
+
+        def corrupt_chunks():
+            yield b"chunk 0"
+            raise InvalidTag()
+
+        errors = []
+
+        def run():
+            try:
+                audio_utils._run_ffmpeg(["-i", "pipe:0", str(tmp_path / "out.wav")], corrupt_chunks())
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert [type(e) for e in errors] == [InvalidTag]
+
+    def test_assemble_webm_fragments_by_concatenation(self, tmp_path):
+        """Test MediaRecorder fragments are joined byte-for-byte without decoding"""
+        from utils.audio_utils import assemble_audio_chunks, EBML_MAGIC
+
+        parts = [EBML_MAGIC + b"header+cluster0", b"cluster1", b"cluster2"]
+        chunk_paths = []
+        for i, part in enumerate(parts):
+            chunk = tmp_path / f"chunk_{i:04d}.webm"
+            chunk.write_bytes(part)
+            chunk_paths.append(str(chunk))
+
+        output = tmp_path / "full_audio.webm"
+        assemble_audio_chunks(chunk_paths, str(output))
+
+        assert output.read_bytes() == b"".join(parts)
+
+    def test_assemble_self_contained_chunks_uses_concat_demuxer(self, tmp_path):
+        """Test chunks that each carry a WebM header go through ffmpeg's concat demuxer"""
+        from utils import audio_utils
+
+        chunk_paths = []
+        for i in range(2):
+            chunk = tmp_path / f"chunk_{i:04d}.webm"
+            chunk.write_bytes(audio_utils.EBML_MAGIC + b"complete file")
+            chunk_paths.append(str(chunk))
+
+        with patch.object(audio_utils, "_run_ffmpeg") as run_ffmpeg:
+            audio_utils.assemble_audio_chunks(chunk_paths, str(tmp_path / "full_audio.wav"))
+
+        args = run_ffmpeg.call_args[0][0]
+        assert args[:2] == ["-f", "concat"]
+        assert args[-1] == str(tmp_path / "full_audio.wav")
+
+    def _fake_ffmpeg(self, tmp_path, monkeypatch, script):
+        from utils import audio_utils
+
+        converter = tmp_path / "ffmpeg"
+        converter.write_text("#!/bin/sh\n" + script)
+        converter.chmod(0o755)
+        monkeypatch.setattr(audio_utils.AudioSegment, "converter", str(converter))
+
+    def _encrypted_chunks(self, tmp_path, parts):
+        from utils.encryption_utils import encryption_service
+
+        chunk_paths = []
+        for i, part in enumerate(parts):
+            chunk_path = str(tmp_path / f"chunk_{i:04d}.webm.enc")
+            with encryption_service.open_encrypted_writer(chunk_path) as writer:
+                writer.write(part)
+            chunk_paths.append(chunk_path)
+        return chunk_paths
+
+    def test_assemble_encrypted_self_contained_chunks_through_pipes(self, tmp_path, monkeypatch):
+        """Test self-contained chunks reach ffmpeg through named pipes and its output is encrypted"""
+        from utils.audio_utils import EBML_MAGIC, assemble_encrypted_audio
+        from utils.encryption_utils import encryption_service
+
+        # Stands in for ffmpeg: fails unless every listed chunk is a pipe, then copies them to stdout
+        self._fake_ffmpeg(tmp_path, monkeypatch, (
+            'while [ "$1" != "-i" ]; do shift; done\n'
+            "sed -n \"s/^file '\\(.*\\)'$/\\1/p\" \"$2\" | while read -r chunk; do\n"
+            '  [ -p "$chunk" ] || exit 3\n'
+            '  cat "$chunk"\n'
+            "done\n"
+        ))
+        parts = [EBML_MAGIC + b"complete file 0", EBML_MAGIC + b"complete file 1"]
+        output = tmp_path / "full_audio.webm.enc"
+
+        assemble_encrypted_audio(self._encrypted_chunks(tmp_path, parts), str(output))
+
+        assert b"complete file" not in output.read_bytes()
+        assert b"".join(encryption_service.decrypt_range(str(output))) == b"".join(parts)
+        assert sorted(os.listdir(tmp_path)) == ["chunk_0000.webm.enc", "chunk_0001.webm.enc", "ffmpeg", "full_audio.webm.enc"]
+
+    def test_assemble_self_contained_chunks_when_ffmpeg_fails(self, tmp_path, monkeypatch):
+        """Test ffmpeg exiting without reading its input pipes is reported instead of hanging"""
+        import threading
+        from utils.audio_utils import EBML_MAGIC, assemble_encrypted_audio
+
+        self._fake_ffmpeg(tmp_path, monkeypatch, "echo 'Invalid data found' >&2\nexit 1\n")
+        chunk_paths = self._encrypted_chunks(tmp_path, [EBML_MAGIC + b"file 0", EBML_MAGIC + b"file 1"])
+        errors = []
+
+        def run():
+            try:
+                assemble_encrypted_audio(chunk_paths, str(tmp_path / "full_audio.webm.enc"))
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert len(errors) == 1 and "Invalid data found" in str(errors[0])
+
+    def test_assemble_missing_chunk(self, tmp_path):
+        """Test assembly fails when a chunk file is missing"""
+        from utils.audio_utils import assemble_audio_chunks
+
+        with pytest.raises(Exception, match="Chunk file not found"):
+            assemble_audio_chunks([str(tmp_path / "missing.webm")], str(tmp_path / "out.webm"))
+
+    def _ebml(self, element_id, payload):
+        return element_id + b"\x01" + len(payload).to_bytes(7, "big") + payload
+
+    def _cluster(self, timecode, block_timecodes):
+        blocks = b"".join(
+            self._ebml(b"\xa3", b"\x81" + relative.to_bytes(2, "big", signed=True) + b"\x80opus")
+            for relative in block_timecodes
+        )
+        unknown_size = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+        return b"\x1f\x43\xb6\x75" + unknown_size + self._ebml(b"\xe7", timecode.to_bytes(2, "big")) + blocks
+
+    def _webm_header(self, info_payload=b""):
+        from utils.audio_utils import EBML_MAGIC
+
+        scale = self._ebml(b"\x2a\xd7\xb1", (1000000).to_bytes(3, "big"))
+        return (
+            self._ebml(EBML_MAGIC, b"\x42\x82\x84webm")
+            + b"\x18\x53\x80\x67\x01\xff\xff\xff\xff\xff\xff\xff"
+            + self._ebml(b"\x15\x49\xa9\x66", scale + info_payload)
+            + self._ebml(b"\x16\x54\xae\x6b", b"tracks")
+        )
+
+    def test_probe_webm_duration_from_cluster_timecodes(self):
+        """Test live WebM chunks without a Duration are measured from block timecodes"""
+        import io
+        from utils import audio_utils
+
+        blocks = list(range(0, 1000, 20))
+        first_chunk = self._webm_header() + self._cluster(0, blocks)
+        continuation = b"end of previous block" + self._cluster(5000, blocks)
+
+        with patch.object(audio_utils.AudioSegment, "from_file", side_effect=AssertionError("decoded")):
+            assert audio_utils.get_audio_duration(io.BytesIO(first_chunk)) == pytest.approx(1.0)
+            assert audio_utils.get_audio_duration(io.BytesIO(continuation)) == pytest.approx(1.0)
+
+    def test_probe_webm_duration_element(self):
+        """Test the Segment Info Duration is used when present"""
+        import io
+        import struct
+        from utils.audio_probe import probe_duration
+
+        duration = self._ebml(b"\x44\x89", struct.pack(">d", 2500.0))
+        audio = io.BytesIO(self._webm_header(duration) + self._cluster(0, [0, 20]))
+        audio.seek(7)
+
+        assert probe_duration(audio) == pytest.approx(2.5)
+        assert audio.tell() == 7
+
+    def test_probe_wav_and_ogg_duration(self, tmp_path):
+        """Test WAV sizes and the last Ogg granule position give the duration"""
+        import io
+        import struct
+        import wave
+        from utils.audio_probe import probe_duration
+
+        wav_path = tmp_path / "audio.wav"
+        with wave.open(str(wav_path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(bytes(16000 * 2 * 3 // 2))
+
+        def ogg_page(granule, payload):
+            return (
+                b"OggS\x00\x00" + struct.pack("<QIII", granule, 1, 0, 0)
+                + bytes([1, len(payload)]) + payload
+            )
+
+        opus_head = b"OpusHead\x01\x01" + struct.pack("<HIhB", 312, 48000, 0, 0)
+        ogg_path = tmp_path / "audio.ogg"
+        ogg_path.write_bytes(
+            ogg_page(0, opus_head) + ogg_page(48000, b"audio") + ogg_page(312 + 48000 * 3, b"audio")
+        )
+
+        assert probe_duration(str(wav_path)) == pytest.approx(1.5)
+        assert probe_duration(str(ogg_path)) == pytest.approx(3.0)
+        assert probe_duration(io.BytesIO(b"not audio")) is None
+
+
+class TestTranscriptionJob:
+    """Tests for the background transcription job"""
+
+    def test_run_transcription_job(self, test_db, sample_recording, mock_llm_provider, tmp_path, monkeypatch):
+        """Test a successful job ends the recording with an encrypted transcription"""
+        from jobs import transcription as queue_module
+        from repositories.recording_repository import MySQLRecordingRepository
+        from models.recording import RecordingStatus
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(queue_module.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+
+        def fake_finalize(recording_id, chunks, output):
+            with encryption_service.open_encrypted_writer(output) as writer:
+                writer.write(b"assembled audio")
+            return output
+
+        monkeypatch.setattr(queue_module.incremental_assembler, "finalize", fake_finalize)
+        (tmp_path / sample_recording.id).mkdir()
+
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/chunk_0.webm", 0)
+        repo.mark_transcribing(sample_recording.id)
+
+        queue_module.run_transcription_job(test_db, sample_recording.id, mock_llm_provider)
+
+        recording = repo.get_recording(sample_recording.id)
+        assert recording.status == RecordingStatus.ended
+        assert "Mock transcription" in encryption_service.decrypt_text_bytes(recording.transcription_ciphertext)
+        assert recording.audio_file_path == f"{sample_recording.id}/full_audio.webm.enc"
+        assert queue_module.blob_store.exists(recording.audio_file_path)
+
+    def test_run_transcription_job_failure(self, test_db, sample_recording, tmp_path, monkeypatch):
+        """Test a failing job marks the recording as failed instead of raising"""
+        from jobs import transcription as queue_module
+        from repositories.recording_repository import MySQLRecordingRepository
+        from models.recording import RecordingStatus
+
+        monkeypatch.setattr(queue_module.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+
+        def fail(recording_id, chunks, output):
+            raise Exception("ffmpeg not available")
+
+        monkeypatch.setattr(queue_module.incremental_assembler, "finalize", fail)
+
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/chunk_0.webm", 0)
+
+        queue_module.run_transcription_job(test_db, sample_recording.id, Mock())
+
+        recording = repo.get_recording(sample_recording.id)
+        assert recording.status == RecordingStatus.failed
+        assert "ffmpeg not available" in recording.error_message
+
+    def test_run_transcription_job_archives_configured_format(
+        self, api_client, test_db, sample_recording, mock_llm_provider, tmp_path, monkeypatch
+    ):
+        """Test assembled audio is converted to AUDIO_ARCHIVE_FORMAT through encrypted streams"""
+        from jobs import transcription as queue_module
+        from repositories.recording_repository import MySQLRecordingRepository
+        from storage.blob_store import audio_format_of
+        from utils import audio_utils
+        from utils.encryption_utils import encryption_service
+
+        # Stands in for ffmpeg: prefixes an Ogg marker to whatever it is fed
+        converter = tmp_path / "ffmpeg"
+        converter.write_text("#!/bin/sh\nprintf OggS\ncat\n")
+        converter.chmod(0o755)
+        monkeypatch.setattr(audio_utils.AudioSegment, "converter", str(converter))
+        monkeypatch.setattr(queue_module.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        monkeypatch.setattr(queue_module.settings, "AUDIO_ARCHIVE_FORMAT", "ogg")
+
+        def fake_finalize(recording_id, chunks, output):
+            with encryption_service.open_encrypted_writer(output) as writer:
+                writer.write(b"webm audio")
+            return output
+
+        monkeypatch.setattr(queue_module.incremental_assembler, "finalize", fake_finalize)
+
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/chunk_0.webm", 0)
+        queue_module.run_transcription_job(test_db, sample_recording.id, mock_llm_provider)
+
+        recording = repo.get_recording(sample_recording.id)
+        audio_path = queue_module.blob_store.local_path(recording.audio_file_path)
+        response = api_client.get(f"/recordings/{sample_recording.id}/audio")
+
+        assert recording.audio_file_path == f"{sample_recording.id}/full_audio.ogg.enc"
+        assert audio_format_of(recording.audio_file_path) == "ogg"
+        assert audio_format_of("/legacy/full_audio_encrypted.bin") == "webm"
+        assert os.listdir(os.path.dirname(audio_path)) == ["full_audio.ogg.enc"]
+        with open(audio_path, "rb") as f:
+            assert b"webm audio" not in f.read()
+        assert response.headers["content-type"] == "audio/ogg"
+        assert response.content == b"OggSwebm audio"
+
+    def test_archive_format_is_validated_at_load(self):
+        """Test AUDIO_ARCHIVE_FORMAT only accepts the formats audio_utils can write"""
+        from typing import get_args
+        from pydantic import ValidationError
+        from config import Settings
+        from utils.audio_utils import ARCHIVE_FORMATS
+
+        allowed = get_args(Settings.model_fields["AUDIO_ARCHIVE_FORMAT"].annotation)
+        assert set(allowed) == set(ARCHIVE_FORMATS)
+        with pytest.raises(ValidationError):
+            Settings(AUDIO_ARCHIVE_FORMAT="mp3")
+
+    def test_enqueue_deduplicates_pending_jobs(self):
+        """Test a recording cannot be queued twice while its job is pending"""
+        import threading
+        from jobs.transcription import TranscriptionQueue
+
+        release = threading.Event()
+        queue = TranscriptionQueue(max_workers=1, session_factory=Mock)
+        queue._run = lambda recording_id: release.wait(5)
+
+        assert queue.enqueue("rec-1") is True
+        assert queue.enqueue("rec-1") is False
+        assert queue.is_pending("rec-1")
+
+        release.set()
+        queue.shutdown(wait=True)
+        assert not queue.is_pending("rec-1")
+
+
+    def test_recover_requeues_interrupted_jobs(self, test_db, sample_recording):
+        """Test recordings left transcribing by a previous process are queued again on startup"""
+        from sqlalchemy.orm import Session
+        from jobs.transcription import TranscriptionQueue
+        from repositories.recording_repository import MySQLRecordingRepository
+
+        repo = MySQLRecordingRepository(test_db)
+        repo.mark_transcribing(sample_recording.id)
+        other = repo.create_recording(sample_recording.user_id)
+
+        queue = TranscriptionQueue(max_workers=1, session_factory=lambda: Session(bind=test_db.get_bind()))
+        transcribed = []
+        queue._run = transcribed.append
+
+        assert queue.recover() == 1
+        queue.shutdown(wait=True)
+        assert transcribed == [sample_recording.id]
+        assert other.id not in transcribed
+
+
+class TestLiveTranscription:
+    """Tests for transcribing chunks of live recordings as they arrive"""
+
+    def _write_chunk(self, tmp_path, index, data):
+        from utils.encryption_utils import encryption_service
+
+        chunk_path = str(tmp_path / f"chunk_{index:04d}.webm.enc")
+        with encryption_service.open_encrypted_writer(chunk_path) as writer:
+            writer.write(data)
+        return chunk_path
+
+    def test_chunk_audio_prefixes_init_segment(self, tmp_path):
+        """Test continuation fragments get the WebM header of chunk 0"""
+        from jobs.live_transcription import chunk_audio
+        from utils.audio_utils import CLUSTER_ID, EBML_MAGIC
+
+        init = EBML_MAGIC + b"tracks"
+        first = self._write_chunk(tmp_path, 0, init + CLUSTER_ID + b"c0")
+        second = self._write_chunk(tmp_path, 1, CLUSTER_ID + b"c1")
+
+        assert chunk_audio(first, 0, first).read() == init + CLUSTER_ID + b"c0"
+        audio = chunk_audio(first, 1, second)
+        assert audio.read() == init + CLUSTER_ID + b"c1"
+        assert audio.name == "chunk_0001.webm"
+
+    def test_live_transcripts_are_joined_on_completion(self, test_db, sample_recording, tmp_path):
+        """Test uploaded chunks are transcribed early and only missing ones at the end"""
+        from sqlalchemy.orm import Session
+        from jobs.live_transcription import LiveTranscriber
+        from repositories.recording_repository import MySQLRecordingRepository
+        from utils.audio_utils import CLUSTER_ID, EBML_MAGIC
+        from utils.encryption_utils import encryption_service
+
+        transcribed = []
+
+        class ChunkProvider:
+            def transcribe_audio(self, audio):
+                transcribed.append(audio.name)
+                return f"text {audio.read()[-2:].decode()}"
+
+        repo = MySQLRecordingRepository(test_db)
+        chunks = []
+        for index, data in enumerate([EBML_MAGIC + CLUSTER_ID + b"c0", CLUSTER_ID + b"c1", CLUSTER_ID + b"c2"]):
+            chunk_path = self._write_chunk(tmp_path, index, data)
+            repo.add_chunk(sample_recording.id, chunk_path, index)
+            chunks.append((index, chunk_path))
+
+        transcriber = LiveTranscriber(
+            max_workers=1,
+            session_factory=lambda: Session(bind=test_db.get_bind()),
+            provider_factory=ChunkProvider,
+        )
+        transcriber.chunk_uploaded(sample_recording.id, 0)
+        transcriber.chunk_uploaded(sample_recording.id, 1)
+
+        text = transcriber.complete(test_db, sample_recording.id, chunks, ChunkProvider())
+        transcriber.shutdown()
+
+        assert text == "text c0 text c1 text c2"
+        assert sorted(transcribed) == ["chunk_0000.webm", "chunk_0001.webm", "chunk_0002.webm"]
+        stored = repo.get_chunk_transcripts(sample_recording.id)
+        assert [encryption_service.decrypt_text(t.transcription_text) for t in stored] == [
+            "text c0", "text c1", "text c2"
+        ]
+
+    def test_finished_jobs_are_forgotten(self, test_db, sample_recording):
+        """Test jobs of recordings that are never finished do not accumulate"""
+        from sqlalchemy.orm import Session
+        from jobs.live_transcription import LiveTranscriber
+
+        transcriber = LiveTranscriber(
+            max_workers=1,
+            session_factory=lambda: Session(bind=test_db.get_bind()),
+        )
+        for index in range(3):
+            transcriber.chunk_uploaded(sample_recording.id, index)
+        transcriber.shutdown()
+
+        assert transcriber._jobs == {}
+
+    def test_run_transcription_job_uses_live_transcripts(self, test_db, sample_user, tmp_path, monkeypatch):
+        """Test finishing a live recording joins chunk transcripts instead of re-transcribing"""
+        from jobs import transcription as queue_module
+        from repositories.recording_repository import MySQLRecordingRepository
+        from models.recording import RecordingStatus
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(queue_module.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+
+        def fake_finalize(recording_id, chunks, output):
+            with encryption_service.open_encrypted_writer(output) as writer:
+                writer.write(b"assembled audio")
+            return output
+
+        monkeypatch.setattr(queue_module.incremental_assembler, "finalize", fake_finalize)
+
+        repo = MySQLRecordingRepository(test_db)
+        recording = repo.create_recording(sample_user.id, live_transcription=True)
+        repo.add_chunk(recording.id, "/path/chunk_0.webm", 0)
+        repo.save_chunk_transcript(recording.id, 0, encryption_service.encrypt_text("already done"))
+
+        llm_provider = Mock()
+        queue_module.run_transcription_job(test_db, recording.id, llm_provider)
+
+        recording = repo.get_recording(recording.id)
+        assert recording.status == RecordingStatus.ended
+        assert encryption_service.decrypt_text_bytes(recording.transcription_ciphertext) == "already done"
+        llm_provider.transcribe_audio.assert_not_called()
+
+
+class TestTranscriptionCache:
+    """Tests for the content-addressed transcription cache"""
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        """Test the memory backend keeps the most recently used entries"""
+        from llm.transcription_cache import MemoryCacheBackend
+
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", "text a")
+        backend.set("b", "text b")
+        backend.get("a")
+        backend.set("c", "text c")
+
+        assert backend.get("a") == "text a"
+        assert backend.get("b") is None
+        assert backend.get("c") == "text c"
+
+    def test_memory_backend_with_zero_entries_stores_nothing(self):
+        """Test an explicit limit of 0 is honoured rather than replaced by the default"""
+        from llm.transcription_cache import MemoryCacheBackend
+
+        backend = MemoryCacheBackend(max_entries=0)
+        backend.set("a", "text a")
+
+        assert backend.max_entries == 0
+        assert backend.get("a") is None
+
+    def test_file_backend_is_encrypted_and_size_bounded(self, tmp_path):
+        """Test entries are stored encrypted and old ones evicted over the size limit"""
+        import os
+        import time
+        from llm.transcription_cache import EncryptedFileCacheBackend
+
+        backend = EncryptedFileCacheBackend(directory=str(tmp_path), max_bytes=1)
+        backend.set("old", "secret old")
+        time.sleep(0.01)
+        backend.set("new", "secret new")
+
+        assert backend.get("old") is None
+        assert backend.get("new") == "secret new"
+        assert "secret" not in (tmp_path / "new.enc").read_text()
+
+        backend.max_bytes = 10 * os.path.getsize(tmp_path / "new.enc")
+        backend.set("old", "secret old")
+        assert backend.get("old") == "secret old"
+        assert backend.get("new") == "secret new"
+
+    def test_database_backend(self, test_db):
+        """Test the database backend round-trips encrypted entries"""
+        from sqlalchemy.orm import Session
+        from llm.transcription_cache import DatabaseCacheBackend
+        from models.transcription_cache import TranscriptionCacheEntry
+
+        backend = DatabaseCacheBackend(
+            max_entries=10, session_factory=lambda: Session(bind=test_db.get_bind())
+        )
+        backend.set("key", "cached text")
+
+        assert backend.get("key") == "cached text"
+        assert backend.get("missing") is None
+        stored = test_db.query(TranscriptionCacheEntry).one()
+        assert "cached text" not in stored.transcription_text
+
+    def test_key_depends_on_audio_and_provider(self):
+        """Test cache keys change with the audio content and the provider namespace"""
+        from llm.transcription_cache import TranscriptionCache
+        from llm.requestyai_provider import MockLLMProvider, RequestYaiProvider
+
+        cache = TranscriptionCache(None)
+        mock = MockLLMProvider()
+
+        assert cache.key_for(mock, [b"ab", b"c"]) == cache.key_for(mock, [b"abc"])
+        assert cache.key_for(mock, [b"abc"]) != cache.key_for(mock, [b"abd"])
+        assert cache.key_for(mock, [b"abc"]) != cache.key_for(RequestYaiProvider(), [b"abc"])
+
+        checksums = ["a" * 64, "b" * 64]
+        assert cache.key_for_chunks(mock, "webm", checksums) == cache.key_for_chunks(mock, "webm", list(checksums))
+        assert cache.key_for_chunks(mock, "webm", checksums) != cache.key_for_chunks(mock, "ogg", checksums)
+        assert cache.key_for_chunks(mock, "webm", checksums) != cache.key_for_chunks(mock, "webm", checksums[::-1])
+
+    def test_retried_job_is_served_from_cache(self, test_db, sample_recording, tmp_path, monkeypatch):
+        """Test transcribing identical audio twice only calls the provider once"""
+        from jobs import transcription as queue_module
+        from models.recording import RecordingStatus
+        from repositories.recording_repository import MySQLRecordingRepository
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(queue_module.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+
+        def fake_finalize(recording_id, chunks, output):
+            with encryption_service.open_encrypted_writer(output) as writer:
+                writer.write(b"assembled audio")
+            return output
+
+        monkeypatch.setattr(queue_module.incremental_assembler, "finalize", fake_finalize)
+        (tmp_path / sample_recording.id).mkdir()
+
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/chunk_0.webm", 0, checksum="a" * 64)
+
+        llm_provider = Mock()
+        llm_provider.cache_namespace = "mock-provider"
+        llm_provider.transcribe_audio.return_value = "transcribed once"
+
+        queue_module.run_transcription_job(test_db, sample_recording.id, llm_provider)
+        # The key comes from the chunk checksums: the audio is only decrypted for the provider
+        with patch.object(queue_module.encryption_service, "decrypt_range", side_effect=AssertionError):
+            queue_module.run_transcription_job(test_db, sample_recording.id, llm_provider)
+
+        recording = repo.get_recording(sample_recording.id)
+        assert recording.status == RecordingStatus.ended
+        assert encryption_service.decrypt_text_bytes(recording.transcription_ciphertext) == "transcribed once"
+        assert llm_provider.transcribe_audio.call_count == 1
+
+    def test_segmented_provider_caches_segments(self):
+        """Test repeated segments are answered from the cache"""
+        from llm.segmented_provider import SegmentedTranscriptionProvider
+        from llm.transcription_cache import MemoryCacheBackend, TranscriptionCache
+        from utils.audio_utils import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
+
+        provider = Mock()
+        provider.cache_namespace = "mock-provider"
+        provider.transcribe_audio.side_effect = lambda audio: audio.name
+        segmented = SegmentedTranscriptionProvider(
+            provider,
+            segment_seconds=1,
+            overlap_seconds=0,
+            cache=TranscriptionCache(MemoryCacheBackend()),
+        )
+        pcm = bytes(PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH * 2)
+
+        first = segmented.transcribe_pcm(iter([pcm]))
+        calls = provider.transcribe_audio.call_count
+        second = segmented.transcribe_pcm(iter([pcm]))
+
+        assert first == second
+        assert provider.transcribe_audio.call_count == calls
+
+
+class TestIncrementalAssembler:
+    """Tests for background pre-assembly of uploaded chunks"""
+
+    @pytest.fixture
+    def recording_dir(self, tmp_path, monkeypatch):
+        from jobs import assembly
+        from storage.layout import recording_dir
+
+        monkeypatch.setattr(assembly.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        path = tmp_path.joinpath(recording_dir(str(tmp_path), "rec-1"))
+        path.mkdir(parents=True)
+        return path
+
+    def _write_chunks(self, recording_dir, parts):
+        from utils.encryption_utils import encryption_service
+
+        paths = []
+        for i, part in enumerate(parts):
+            chunk_path = str(recording_dir / f"chunk_{i:04d}.webm.enc")
+            with encryption_service.open_encrypted_writer(chunk_path) as writer:
+                writer.write(part)
+            paths.append(chunk_path)
+        return paths
+
+    def _decrypt(self, path):
+        from utils.encryption_utils import encryption_service
+        return b"".join(encryption_service.decrypt_range(str(path)))
+
+    def test_out_of_order_chunks_are_appended_in_index_order(self, recording_dir):
+        """Test early chunks wait for the gap and finalize only appends the tail"""
+        from jobs.assembly import IncrementalAssembler, PARTIAL_FILENAME
+        from utils.audio_utils import EBML_MAGIC
+
+        parts = [EBML_MAGIC + b"c0", b"c1", b"c2", b"c3"]
+        paths = self._write_chunks(recording_dir, parts)
+        assembler = IncrementalAssembler(max_workers=1)
+
+        for index in (1, 0, 2):
+            assembler.chunk_uploaded("rec-1", index, paths[index])
+        assembler.shutdown(wait=True)
+
+        assert self._decrypt(recording_dir / PARTIAL_FILENAME) == b"".join(parts[:3])
+
+        with patch("jobs.assembly.assemble_encrypted_audio") as full_assembly:
+            output = recording_dir / "full_audio_encrypted.bin"
+            assembler.finalize("rec-1", list(enumerate(paths)), str(output))
+
+        full_assembly.assert_not_called()
+        assert self._decrypt(output) == b"".join(parts)
+        assert not (recording_dir / PARTIAL_FILENAME).exists()
+
+    def test_reuploaded_chunk_falls_back_to_full_assembly(self, recording_dir):
+        """Test re-uploading an appended chunk discards the running file"""
+        from jobs.assembly import IncrementalAssembler
+        from utils.audio_utils import EBML_MAGIC
+
+        paths = self._write_chunks(recording_dir, [EBML_MAGIC + b"c0", b"c1"])
+        assembler = IncrementalAssembler(max_workers=1)
+
+        assembler.chunk_uploaded("rec-1", 0, paths[0])
+        assembler.shutdown(wait=True)
+        assembler.chunk_uploaded("rec-1", 0, paths[0])
+        assembler.shutdown(wait=True)
+
+        with patch("jobs.assembly.assemble_encrypted_audio") as full_assembly:
+            assembler.finalize("rec-1", list(enumerate(paths)), str(recording_dir / "full_audio_encrypted.bin"))
+
+        full_assembly.assert_called_once()
+
+    def test_finish_right_after_reupload_uses_new_audio(self, recording_dir):
+        """Test finalize does not use the running file when a re-upload is still waiting for a worker"""
+        from jobs.assembly import IncrementalAssembler
+        from utils.audio_utils import EBML_MAGIC
+        from utils.encryption_utils import encryption_service
+
+        paths = self._write_chunks(recording_dir, [EBML_MAGIC + b"c0", b"c1"])
+        assembler = IncrementalAssembler(max_workers=1)
+        for index, path in enumerate(paths):
+            assembler.chunk_uploaded("rec-1", index, path)
+        assembler.shutdown(wait=True)
+
+        with encryption_service.open_encrypted_writer(paths[1]) as writer:
+            writer.write(b"c1 again")
+        with patch.object(assembler, "_advance_safely"):
+            assembler.chunk_uploaded("rec-1", 1, paths[1])
+            output = recording_dir / "full_audio_encrypted.bin"
+            assembler.finalize("rec-1", list(enumerate(paths)), str(output))
+        assembler.shutdown(wait=True)
+
+        assert self._decrypt(output) == EBML_MAGIC + b"c0" + b"c1 again"
+
+
+class TestAudioPlayback:
+    """Tests for byte-range streaming of encrypted recordings"""
+
+    @pytest.fixture
+    def audio(self, test_db, sample_recording, tmp_path):
+        from repositories.recording_repository import MySQLRecordingRepository
+        from utils.encryption_utils import encryption_service, FRAME_SIZE
+
+        data = os.urandom(FRAME_SIZE * 3 + 17)
+        encrypted_path = str(tmp_path / "full_audio_encrypted.bin")
+        with encryption_service.open_encrypted_writer(encrypted_path) as writer:
+            writer.write(data)
+
+        MySQLRecordingRepository(test_db).mark_ended(sample_recording.id, encrypted_path, b"")
+        return data
+
+    def test_full_download(self, api_client, sample_recording, audio):
+        """Test requests without a Range header get the whole file"""
+        response = api_client.get(f"/recordings/{sample_recording.id}/audio")
+
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.content == audio
+
+    def test_range_request(self, api_client, sample_recording, audio):
+        """Test a Range request returns only the requested bytes"""
+        start, end = 70000, 140000
+        response = api_client.get(
+            f"/recordings/{sample_recording.id}/audio",
+            headers={"Range": f"bytes={start}-{end}"}
+        )
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes {start}-{end}/{len(audio)}"
+        assert response.content == audio[start:end + 1]
+
+    def test_suffix_range_request(self, api_client, sample_recording, audio):
+        """Test a suffix Range request returns the tail of the file"""
+        response = api_client.get(
+            f"/recordings/{sample_recording.id}/audio",
+            headers={"Range": "bytes=-100"}
+        )
+
+        assert response.status_code == 206
+        assert response.content == audio[-100:]
+
+    def test_unsatisfiable_range(self, api_client, sample_recording, audio):
+        """Test a Range beyond the end of the file is rejected"""
+        response = api_client.get(
+            f"/recordings/{sample_recording.id}/audio",
+            headers={"Range": f"bytes={len(audio)}-"}
+        )
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(audio)}"
+
+    def test_range_request_for_legacy_file(self, api_client, test_db, sample_recording, tmp_path):
+        """Test a legacy Fernet recording is decrypted once per Range request"""
+        from repositories.recording_repository import MySQLRecordingRepository
+        from utils.encryption_utils import encryption_service
+
+        data = os.urandom(5000)
+        legacy_path = tmp_path / "full_audio_encrypted.bin"
+        legacy_path.write_bytes(encryption_service.cipher.encrypt(data))
+        MySQLRecordingRepository(test_db).mark_ended(sample_recording.id, str(legacy_path), b"")
+
+        with patch.object(
+            encryption_service, "_decrypt_legacy", wraps=encryption_service._decrypt_legacy
+        ) as decrypt_legacy:
+            response = api_client.get(
+                f"/recordings/{sample_recording.id}/audio",
+                headers={"Range": "bytes=100-199"}
+            )
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 100-199/{len(data)}"
+        assert response.content == data[100:200]
+        assert decrypt_legacy.call_count == 1
+
+
+class TestRecordingList:
+    """Tests for the paginated recording listing"""
+
+    @pytest.fixture
+    def recordings(self, test_db, sample_user):
+        from datetime import datetime, timedelta
+        from models.recording import Recording, RecordingChunk
+        from repositories.recording_repository import MySQLRecordingRepository
+        from utils.encryption_utils import encryption_service
+
+        now = datetime.utcnow()
+        recordings = []
+        for age in range(5):
+            recording = Recording(
+                user_id=sample_user.id,
+                created_at=now - timedelta(minutes=age),
+                transcription_text=encryption_service.encrypt_text(f"transcript {age}")
+            )
+            recording.chunks = [
+                RecordingChunk(chunk_index=i, audio_blob_path=f"/tmp/{age}_{i}.webm")
+                for i in range(age)
+            ]
+            recordings.append(recording)
+        test_db.add_all(recordings)
+        test_db.commit()
+        # Chunks added through the relationship bypass add_chunks
+        MySQLRecordingRepository(test_db).refresh_aggregates()
+        return [recording.id for recording in recordings]
+
+    def test_pages_follow_cursor(self, api_client, recordings):
+        """Test pages are newest first, end with a null cursor, and carry chunk counts"""
+        first = api_client.get("/recordings/", params={"limit": 2}).json()
+        second = api_client.get("/recordings/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+        last = api_client.get("/recordings/", params={"limit": 2, "cursor": second["next_cursor"]}).json()
+
+        items = first["items"] + second["items"] + last["items"]
+        assert [item["id"] for item in items] == recordings
+        assert [item["chunks_count"] for item in items] == [0, 1, 2, 3, 4]
+        assert last["next_cursor"] is None
+        assert "transcription_text" not in items[0]
+
+    def test_include_transcription(self, api_client, recordings):
+        """Test transcriptions are decrypted only when requested"""
+        response = api_client.get("/recordings/", params={"limit": 1, "include_transcription": True})
+
+        assert response.json()["items"][0]["transcription_text"] == "transcript 0"
+
+    def test_invalid_cursor(self, api_client):
+        """Test a malformed cursor is rejected"""
+        response = api_client.get("/recordings/", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
+class TestTranscriptCache:
+    """Tests for the decrypted transcription cache"""
+
+    def test_size_bound_and_expiry(self, monkeypatch):
+        """Test entries are evicted past max_bytes and expire after the TTL"""
+        from utils import transcript_cache as module
+
+        now = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+        cache = module.DecryptedTextCache(ttl_seconds=10, max_bytes=10)
+
+        cache.set("a", "12345")
+        cache.set("b", "12345")
+        cache.get("a")
+        cache.set("c", "12345")
+        cache.set("huge", "x" * 11)
+        assert cache.get("b") is None
+        assert cache.get("huge") is None
+        assert cache.get("a") == "12345"
+
+        now[0] += 10
+        assert cache.get("a") is None
+
+    def test_get_recording_decrypts_once(self, api_client, test_db, sample_recording, monkeypatch):
+        """Test repeated views are served from the cache until the recording is updated"""
+        from unittest.mock import patch
+        from repositories.recording_repository import MySQLRecordingRepository
+        from utils.encryption_utils import encryption_service
+
+        repo = MySQLRecordingRepository(test_db)
+        repo.mark_ended(sample_recording.id, "/tmp/full.webm", encryption_service.encrypt_text_bytes("first"))
+
+        with patch.object(encryption_service, "decrypt_text_bytes", wraps=encryption_service.decrypt_text_bytes) as decrypt:
+            views = [api_client.get(f"/recordings/{sample_recording.id}").json() for _ in range(3)]
+            repo.mark_ended(sample_recording.id, "/tmp/full.webm", encryption_service.encrypt_text_bytes("second"))
+            updated = api_client.get(f"/recordings/{sample_recording.id}").json()
+
+        assert [view["transcription_text"] for view in views] == ["first"] * 3
+        assert updated["transcription_text"] == "second"
+        assert decrypt.call_count == 2
+
+
+class TestChunkUpload:
+    """Tests for the non-blocking chunk upload path"""
+
+    def _wav(self, seconds):
+        import io
+        import wave
+
+        output = io.BytesIO()
+        with wave.open(output, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(bytes(int(16000 * 2 * seconds)))
+        return output.getvalue()
+
+    def test_upload_chunk_is_encrypted_and_probed(self, api_client, sample_recording, tmp_path, monkeypatch):
+        """Test an upload is stored encrypted with a duration probed in a worker process"""
+        from routers import recordings
+        from utils.blocking_io import BlockingIOExecutor
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(recordings.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        executor = BlockingIOExecutor(io_workers=2, cpu_processes=1)
+        monkeypatch.setattr(recordings, "blocking_io", executor)
+        audio = self._wav(0.5)
+
+        try:
+            response = api_client.post(
+                f"/recordings/{sample_recording.id}/chunks",
+                data={"chunk_index": 0},
+                files={"audio_chunk": ("chunk.wav", audio, "audio/wav")},
+            )
+        finally:
+            executor.shutdown()
+
+        assert response.status_code == 201
+        assert response.json()["duration_seconds"] == pytest.approx(0.5)
+        chunk_path = recordings.blob_store.local_path(f"{sample_recording.id}/chunk_0000.webm.enc")
+        with open(chunk_path, "rb") as f:
+            assert audio not in f.read()
+        assert b"".join(encryption_service.decrypt_range(chunk_path)) == audio
+
+    def test_batch_upload(self, api_client, sample_recording, tmp_path, monkeypatch):
+        """Test a batch of chunks is stored encrypted and inserted in chunk order"""
+        from routers import recordings
+        from utils.blocking_io import BlockingIOExecutor
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(recordings.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        executor = BlockingIOExecutor(io_workers=2, cpu_processes=0)
+        monkeypatch.setattr(recordings, "blocking_io", executor)
+        audio = {index: self._wav(0.25 * (index + 1)) for index in (2, 0, 1)}
+
+        try:
+            response = api_client.post(
+                f"/recordings/{sample_recording.id}/chunks/batch",
+                data={"chunk_indexes": [str(index) for index in audio]},
+                files=[("audio_chunks", (f"chunk{index}.wav", data, "audio/wav")) for index, data in audio.items()],
+            )
+        finally:
+            executor.shutdown()
+
+        assert response.status_code == 201
+        chunks = response.json()
+        assert [chunk["chunk_index"] for chunk in chunks] == [0, 1, 2]
+        assert [chunk["duration_seconds"] for chunk in chunks] == pytest.approx([0.25, 0.5, 0.75])
+        chunk_path = recordings.blob_store.local_path(f"{sample_recording.id}/chunk_0002.webm.enc")
+        assert b"".join(encryption_service.decrypt_range(chunk_path)) == audio[2]
+
+    def test_batch_upload_rejects_mismatched_indexes(self, api_client, sample_recording):
+        """Test every chunk in a batch needs its own unique index"""
+        files = [("audio_chunks", ("chunk.wav", b"audio", "audio/wav"))] * 2
+
+        missing = api_client.post(
+            f"/recordings/{sample_recording.id}/chunks/batch",
+            data={"chunk_indexes": ["0"]},
+            files=files,
+        )
+        duplicate = api_client.post(
+            f"/recordings/{sample_recording.id}/chunks/batch",
+            data={"chunk_indexes": ["0", "0"]},
+            files=files,
+        )
+
+        assert missing.status_code == 400
+        assert duplicate.status_code == 400
+
+    def test_reupload_is_idempotent(self, api_client, sample_recording, tmp_path, monkeypatch):
+        """Test re-uploading an index replaces the chunk, and a matching checksum skips the write"""
+        import hashlib
+        from routers import recordings
+        from utils.blocking_io import BlockingIOExecutor
+
+        monkeypatch.setattr(recordings.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        executor = BlockingIOExecutor(io_workers=2, cpu_processes=0)
+        monkeypatch.setattr(recordings, "blocking_io", executor)
+        first, second = self._wav(0.25), self._wav(0.5)
+
+        def upload(audio, **data):
+            return api_client.post(
+                f"/recordings/{sample_recording.id}/chunks",
+                data={"chunk_index": 0, **data},
+                files={"audio_chunk": ("chunk.wav", audio, "audio/wav")},
+            )
+
+        try:
+            assert upload(first).status_code == 201
+            replaced = upload(second)
+            skipped = upload(second, checksum=hashlib.sha256(second).hexdigest())
+            manifest = api_client.get(f"/recordings/{sample_recording.id}/chunks/manifest")
+        finally:
+            executor.shutdown()
+
+        assert replaced.status_code == 201
+        assert skipped.status_code == 200
+        assert skipped.json()["id"] == replaced.json()["id"]
+        assert manifest.json()["chunks"] == [{
+            "chunk_index": 0,
+            "size_bytes": len(second),
+            "checksum": hashlib.sha256(second).hexdigest(),
+        }]
+
+    def test_resumable_upload(self, api_client, sample_recording, tmp_path, monkeypatch):
+        """Test a chunk uploaded in parts resumes at the server's offset and is stored whole"""
+        import hashlib
+        from routers import recordings
+        from utils.blocking_io import BlockingIOExecutor
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(recordings.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        executor = BlockingIOExecutor(io_workers=2, cpu_processes=0)
+        monkeypatch.setattr(recordings, "blocking_io", executor)
+        audio = self._wav(0.5)
+        half = len(audio) // 2
+        url = f"/recordings/{sample_recording.id}/chunks/3"
+
+        def send(offset, body):
+            return api_client.patch(url, content=body, headers={
+                "Upload-Offset": str(offset),
+                "Upload-Length": str(len(audio)),
+            })
+
+        try:
+            started = send(0, audio[:half])
+            manifest = api_client.get(f"/recordings/{sample_recording.id}/chunks/manifest").json()
+            conflict = send(half + 10, audio[half + 10:])
+            finished = send(half, audio[half:])
+        finally:
+            executor.shutdown()
+
+        assert started.status_code == 200
+        assert started.headers["Upload-Offset"] == str(half)
+        assert manifest["partial_uploads"] == [{"chunk_index": 3, "upload_offset": half}]
+        assert conflict.status_code == 409
+        assert conflict.headers["Upload-Offset"] == str(half)
+        assert finished.status_code == 201
+        assert finished.json()["checksum"] == hashlib.sha256(audio).hexdigest()
+        assert finished.json()["duration_seconds"] == pytest.approx(0.5)
+        chunk_path = recordings.blob_store.local_path(f"{sample_recording.id}/chunk_0003.webm.enc")
+        assert b"".join(encryption_service.decrypt_range(chunk_path)) == audio
+        assert not any(name.endswith(recordings.PARTIAL_SUFFIX) for name in os.listdir(os.path.dirname(chunk_path)))
+
+    def test_concurrent_uploads_overlap(self, monkeypatch):
+        """Test blocking work from concurrent requests runs in parallel threads"""
+        import asyncio
+        import threading
+        import time
+        from utils.blocking_io import BlockingIOExecutor
+
+        executor = BlockingIOExecutor(io_workers=4, cpu_processes=0)
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_write():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+
+        async def upload_four():
+            await asyncio.gather(*(executor.run(slow_write) for _ in range(4)))
+
+        try:
+            asyncio.run(upload_four())
+        finally:
+            executor.shutdown()
+
+        assert peak[0] == 4
+
+
+class TestBlobStore:
+    """Tests for the pluggable audio blob store"""
+
+    def test_local_store_uses_relative_keys(self, tmp_path):
+        """Test keys map below the root while legacy absolute paths are used as they are"""
+        from storage.blob_store import LocalBlobStore
+
+        store = LocalBlobStore(str(tmp_path), shard_depth=0)
+        with store.open_writer("rec-1/chunk_0000.webm.enc") as writer:
+            writer.write(b"chunk")
+
+        assert (tmp_path / "rec-1" / "chunk_0000.webm.enc").read_bytes() == b"chunk"
+        assert store.local_path("rec-1/chunk_0000.webm.enc") == str(tmp_path / "rec-1" / "chunk_0000.webm.enc")
+        assert store.local_path(str(tmp_path / "rec-1" / "chunk_0000.webm.enc")) == str(tmp_path / "rec-1" / "chunk_0000.webm.enc")
+        with pytest.raises(ValueError):
+            store.open_reader("rec-1/../../etc/passwd")
+
+        store.delete("rec-1/chunk_0000.webm.enc")
+        assert not store.exists("rec-1/chunk_0000.webm.enc")
+        with pytest.raises(FileNotFoundError):
+            store.local_path("rec-1/chunk_0000.webm.enc")
+
+    def test_s3_store_streams_and_uploads_in_parts(self, s3_blob_store):
+        """Test large files go up as multipart uploads and small writes as single objects"""
+        import os
+
+        client = s3_blob_store.client
+        audio = os.urandom(200 * 1024)
+        staged = s3_blob_store.staging_path("rec-1/full_audio_encrypted.bin")
+        with open(staged, "wb") as f:
+            f.write(audio)
+
+        s3_blob_store.put_file("rec-1/full_audio_encrypted.bin", staged)
+        with s3_blob_store.open_writer("rec-1/chunk_0000.webm.enc") as writer:
+            writer.write(b"chunk")
+        with pytest.raises(RuntimeError):
+            with s3_blob_store.open_writer("rec-1/chunk_0001.webm.enc") as writer:
+                writer.write(b"half a chunk")
+                raise RuntimeError("client disconnected")
+
+        assert client.multipart_keys == ["recordings/rec-1/full_audio_encrypted.bin"]
+        assert client.objects[("audio", "recordings/rec-1/full_audio_encrypted.bin")] == audio
+        assert s3_blob_store.open_reader("rec-1/chunk_0000.webm.enc").read() == b"chunk"
+        assert not s3_blob_store.exists("rec-1/chunk_0001.webm.enc")
+        assert not os.path.exists(staged)
+
+    def test_s3_store_revalidates_local_copies(self, s3_blob_store):
+        """Test local copies are reused until another replica replaces the object"""
+        client = s3_blob_store.client
+        client.put_object(Bucket="audio", Key="recordings/rec-1/chunk_0000.webm.enc", Body=b"first")
+
+        path = s3_blob_store.local_path("rec-1/chunk_0000.webm.enc")
+        with open(path, "rb") as f:
+            assert f.read() == b"first"
+
+        client.put_object(Bucket="audio", Key="recordings/rec-1/chunk_0000.webm.enc", Body=b"second")
+        with open(s3_blob_store.local_path("rec-1/chunk_0000.webm.enc"), "rb") as f:
+            assert f.read() == b"second"
+
+        s3_blob_store.delete("rec-1/chunk_0000.webm.enc")
+        with pytest.raises(FileNotFoundError):
+            s3_blob_store.local_path("rec-1/chunk_0000.webm.enc")
+
+    def test_s3_store_evicts_least_recently_used_copies(self, s3_blob_store):
+        """Test local copies beyond the cache budget are offered for deletion, oldest use first"""
+        client = s3_blob_store.client
+        s3_blob_store.cache_max_bytes = 10
+        paths = []
+        for index in range(3):
+            key = f"rec-1/chunk_{index:04d}.webm.enc"
+            client.put_object(Bucket="audio", Key=f"recordings/{key}", Body=b"12345")
+            paths.append(s3_blob_store.local_path(key))
+            os.utime(paths[-1], (index, index))
+        assert all(path.startswith(s3_blob_store.cache_root) for path in paths)
+
+        # Using the oldest copy again makes it the most recently used
+        assert s3_blob_store.local_path("rec-1/chunk_0000.webm.enc") == paths[0]
+        assert list(s3_blob_store.stale_local_copies()) == [paths[1]]
+
+        os.remove(paths[1])
+        assert list(s3_blob_store.stale_local_copies()) == []
+        with open(s3_blob_store.local_path("rec-1/chunk_0001.webm.enc"), "rb") as f:
+            assert f.read() == b"12345"
+
+    def test_recording_round_trip_through_s3(
+        self, api_client, test_db, sample_recording, s3_blob_store, mock_llm_provider, tmp_path, monkeypatch
+    ):
+        """Test chunks and assembled audio are stored under keys in the bucket and served back"""
+        from routers import recordings
+        from jobs import transcription as queue_module
+        from utils.blocking_io import BlockingIOExecutor
+        from utils.encryption_utils import encryption_service
+
+        monkeypatch.setattr(recordings.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        executor = BlockingIOExecutor(io_workers=2, cpu_processes=0)
+        monkeypatch.setattr(recordings, "blocking_io", executor)
+
+        def fake_finalize(recording_id, chunks, output):
+            with encryption_service.open_encrypted_writer(output) as writer:
+                writer.write(b"assembled audio")
+            return output
+
+        monkeypatch.setattr(queue_module.incremental_assembler, "finalize", fake_finalize)
+
+        try:
+            uploaded = api_client.post(
+                f"/recordings/{sample_recording.id}/chunks",
+                data={"chunk_index": 0},
+                files={"audio_chunk": ("chunk.webm", b"webm audio", "audio/webm")},
+            )
+            queue_module.run_transcription_job(test_db, sample_recording.id, mock_llm_provider)
+            audio = api_client.get(f"/recordings/{sample_recording.id}/audio")
+        finally:
+            executor.shutdown()
+
+        objects = s3_blob_store.client.objects
+        chunk_key = f"{sample_recording.id}/chunk_0000.webm.enc"
+        assert uploaded.status_code == 201
+        assert uploaded.json()["audio_blob_path"] == chunk_key
+        assert b"webm audio" not in objects[("audio", f"recordings/{chunk_key}")]
+        assert ("audio", f"recordings/{sample_recording.id}/full_audio.webm.enc") in objects
+        assert audio.status_code == 200
+        assert audio.content == b"assembled audio"
+
+    def test_local_store_shards_and_commits_atomically(self, tmp_path):
+        """Test blobs land in hash-prefix directories only once fully written"""
+        from storage.blob_store import LocalBlobStore
+        from storage.durability import NoSync
+        from storage.layout import shard_prefix
+
+        store = LocalBlobStore(str(tmp_path), shard_depth=2, durability=NoSync())
+        with store.open_writer("rec-1/chunk_0000.webm.enc") as writer:
+            writer.write(b"chunk")
+        with pytest.raises(RuntimeError):
+            with store.open_writer("rec-1/chunk_0001.webm.enc") as writer:
+                writer.write(b"half a chunk")
+                raise RuntimeError("client disconnected")
+
+        first, second = shard_prefix("rec-1", 2)
+        recording_dir = tmp_path / first / second / "rec-1"
+        assert len(first) == len(second) == 2
+        assert os.listdir(recording_dir) == ["chunk_0000.webm.enc"]
+
+        # Blobs written before sharding are still found in the flat tree
+        (tmp_path / "rec-2").mkdir()
+        (tmp_path / "rec-2" / "chunk_0000.webm.enc").write_bytes(b"legacy")
+        with store.open_reader("rec-2/chunk_0000.webm.enc") as reader:
+            assert reader.read() == b"legacy"
+
+    @pytest.mark.parametrize("mode", ["fsync", "group", "none"])
+    def test_durability_modes_commit_concurrent_writes(self, tmp_path, monkeypatch, mode):
+        """Test every mode renames complete files into place; group commit shares directory fsyncs"""
+        import threading
+        from storage import durability
+        from storage.blob_store import LocalBlobStore
+
+        synced = []
+        real_fsync_path = durability.fsync_path
+        monkeypatch.setattr(durability, "fsync_path", lambda path: (synced.append(path), real_fsync_path(path)))
+        policy = durability.create_durability_policy(mode)
+        if mode == "group":
+            policy.window_seconds = 0.2
+        store = LocalBlobStore(str(tmp_path), durability=policy)
+
+        def write(index):
+            with store.open_writer(f"rec-1/chunk_{index:04d}.webm.enc") as writer:
+                writer.write(b"chunk %d" % index)
+
+        threads = [threading.Thread(target=write, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        recording_dir = os.path.dirname(store.path("rec-1/chunk_0000.webm.enc"))
+        assert sorted(os.listdir(recording_dir)) == [f"chunk_{index:04d}.webm.enc" for index in range(4)]
+        directory_syncs = synced.count(recording_dir)
+        assert directory_syncs == {"fsync": 4, "group": 1, "none": 0}[mode]
+
+    def test_fsync_mode_syncs_new_directories(self, tmp_path, monkeypatch):
+        """Test the shard and recording directories created for a first chunk are synced into their parents"""
+        from storage import durability
+        from storage.blob_store import LocalBlobStore
+
+        synced = []
+        real_fsync_path = durability.fsync_path
+        monkeypatch.setattr(durability, "fsync_path", lambda path: (synced.append(path), real_fsync_path(path)))
+        store = LocalBlobStore(str(tmp_path / "audio"), shard_depth=2, durability=durability.FsyncEach())
+
+        with store.open_writer("rec-1/chunk_0000.webm.enc") as writer:
+            writer.write(b"chunk")
+
+        recording_dir = os.path.dirname(store.path("rec-1/chunk_0000.webm.enc"))
+        second = os.path.dirname(recording_dir)
+        first = os.path.dirname(second)
+        for directory in (str(tmp_path), str(tmp_path / "audio"), first, second, recording_dir):
+            assert directory in synced
+
+        # Later chunks find the directories in place
+        synced.clear()
+        with store.open_writer("rec-1/chunk_0001.webm.enc") as writer:
+            writer.write(b"chunk")
+        assert synced.count(recording_dir) == 1
+        assert second not in synced
+
+    def test_group_commit_leader_returns_under_steady_load(self, tmp_path, monkeypatch):
+        """Test the writer that starts a flush returns after its own group while others keep writing"""
+        import itertools
+        import threading
+        import time
+        from storage import durability
+
+        real_flush = durability.GroupCommit._flush
+        monkeypatch.setattr(
+            durability.GroupCommit, "_flush", lambda self, files: (time.sleep(0.05), real_flush(self, files))
+        )
+        policy = durability.GroupCommit(window_seconds=0.01)
+        names = itertools.count()
+        stop = threading.Event()
+
+        def commit():
+            path = str(tmp_path / f"file-{next(names)}")
+            with open(path + ".tmp", "wb") as f:
+                f.write(b"chunk")
+            policy.commit(path + ".tmp", path)
+
+        def commit_continuously():
+            while not stop.is_set():
+                commit()
+
+        writers = [threading.Thread(target=commit_continuously) for _ in range(4)]
+        timed = threading.Thread(target=commit)
+        timed.start()
+        # The others start while the timed writer's flush is running
+        time.sleep(0.02)
+        for thread in writers:
+            thread.start()
+        timed.join(timeout=0.5)
+        returned = not timed.is_alive()
+        stop.set()
+        for thread in [timed] + writers:
+            thread.join()
+
+        assert returned
+
+
+class TestRetentionSweeper:
+    """Tests for the storage retention and garbage-collection sweeper"""
+
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        from jobs import retention
+        from storage.blob_store import LocalBlobStore
+        from storage.durability import NoSync
+
+        monkeypatch.setattr(retention.settings, "AUDIO_STORAGE_PATH", str(tmp_path))
+        store = LocalBlobStore(str(tmp_path), durability=NoSync())
+        monkeypatch.setattr(retention, "blob_store", store)
+        return store
+
+    @pytest.fixture
+    def sweeper(self, test_db):
+        from sqlalchemy.orm import Session
+        from jobs.retention import RetentionSweeper
+
+        return RetentionSweeper(
+            batch_size=1,
+            max_deletes_per_second=0,
+            session_factory=lambda: Session(bind=test_db.get_bind()),
+        )
+
+    def _add_recording(self, test_db, store, user, status, chunks, age_hours, full_audio=False):
+        import hashlib
+        from datetime import datetime, timedelta
+        from models.recording import Recording, RecordingStatus
+        from repositories.recording_repository import MySQLRecordingRepository
+        from storage.blob_store import chunk_key, full_audio_key
+
+        recording = Recording(user_id=user.id, status=RecordingStatus(status))
+        test_db.add(recording)
+        test_db.commit()
+        repo = MySQLRecordingRepository(test_db)
+        for index in range(chunks):
+            with store.open_writer(chunk_key(recording.id, index)) as writer:
+                writer.write(b"chunk")
+            repo.add_chunk(recording.id, chunk_key(recording.id, index), index, checksum=hashlib.sha256(b"chunk").hexdigest())
+        if full_audio:
+            with store.open_writer(full_audio_key(recording.id)) as writer:
+                writer.write(b"full audio")
+            recording.audio_file_path = full_audio_key(recording.id)
+
+        past = datetime.utcnow() - timedelta(hours=age_hours)
+        recording.updated_at = past
+        for chunk in recording.chunks:
+            chunk.uploaded_at = past
+        test_db.commit()
+        return recording
+
+    def test_sweep_purges_chunks_of_archived_recordings(self, test_db, sample_user, store, sweeper, api_client):
+        """Test chunks go once the full audio exists and the retention period is over"""
+        from storage.blob_store import chunk_key
+
+        archived = self._add_recording(test_db, store, sample_user, "ended", 2, 48, full_audio=True)
+        recent = self._add_recording(test_db, store, sample_user, "ended", 1, 1, full_audio=True)
+        unassembled = self._add_recording(test_db, store, sample_user, "ended", 1, 48)
+
+        report = sweeper.sweep()
+        test_db.expire_all()
+
+        assert report["chunks"] == 2
+        assert not store.exists(chunk_key(archived.id, 0))
+        assert not store.exists(chunk_key(archived.id, 1))
+        assert store.exists(archived.audio_file_path)
+        assert archived.chunks_purged_at is not None
+        assert archived.chunks_count == 2
+        assert store.exists(chunk_key(recent.id, 0))
+        assert store.exists(chunk_key(unassembled.id, 0))
+
+        # Purged recordings cannot be assembled again, take new chunks or report the old ones
+        response = api_client.post(f"/recordings/{archived.id}/finish")
+        assert response.status_code == 409
+        response = api_client.post(
+            f"/recordings/{archived.id}/chunks",
+            data={"chunk_index": 0, "checksum": archived.chunks[0].checksum},
+            files={"audio_chunk": ("chunk.webm", b"chunk", "audio/webm")},
+        )
+        assert response.status_code == 409
+        response = api_client.patch(
+            f"/recordings/{archived.id}/chunks/0",
+            content=b"chunk",
+            headers={"Upload-Offset": "0", "Upload-Length": "5"},
+        )
+        assert response.status_code == 409
+        assert api_client.get(f"/recordings/{archived.id}/chunks/manifest").json()["chunks"] == []
+
+    def test_sweep_expires_sessions_and_removes_orphans(self, test_db, sample_user, store, sweeper, tmp_path):
+        """Test stale sessions, orphaned audio, missing chunks and leftover working files are cleaned up"""
+        import time
+        from models.recording import RecordingStatus
+        from storage.blob_store import chunk_key, full_audio_key
+
+        stale = self._add_recording(test_db, store, sample_user, "paused", 1, 24 * 30)
+        active = self._add_recording(test_db, store, sample_user, "active", 3, 1)
+        store.delete(chunk_key(active.id, 1))
+
+        old = time.time() - 48 * 3600
+        with store.open_writer(chunk_key("deleted-recording", 0)) as writer:
+            writer.write(b"chunk")
+        os.utime(os.path.dirname(store.path(chunk_key("deleted-recording", 0))), (old, old))
+        with store.open_writer(chunk_key("uncommitted-recording", 0)) as writer:
+            writer.write(b"chunk")
+        leftover = store.staging_path(full_audio_key(active.id))
+        with open(leftover, "wb") as f:
+            f.write(b"half assembled")
+        os.utime(leftover, (old, old))
+
+        report = sweeper.sweep()
+        test_db.expire_all()
+
+        assert report == {
+            "chunks": 0,
+            "stale_sessions": 1,
+            "orphaned_recordings": 1,
+            "missing_chunks": 1,
+            "working_files": 1,
+            "cached_copies": 0,
+        }
+        assert stale.status == RecordingStatus.failed
+        assert stale.error_message == "Recording session expired"
+        assert not store.exists(chunk_key(stale.id, 0))
+        assert not store.exists(chunk_key("deleted-recording", 0))
+        assert store.exists(chunk_key("uncommitted-recording", 0))
+        assert not os.path.exists(leftover)
+        assert active.status == RecordingStatus.active
+        assert [chunk.chunk_index for chunk in active.chunks] == [0, 2]
+        assert active.chunks_count == 2
+
+    def test_sweep_keeps_sessions_resumed_after_listing(self, test_db, sample_user, store, sweeper):
+        """Test a stale session that receives a chunk while being swept keeps its audio"""
+        from models.recording import RecordingStatus
+        from repositories.recording_repository import MySQLRecordingRepository
+        from storage.blob_store import chunk_key
+
+        stale = self._add_recording(test_db, store, sample_user, "paused", 1, 24 * 30)
+        list_stale_sessions = MySQLRecordingRepository.list_stale_sessions
+
+        def list_then_resume(repo, *args):
+            recordings = list_stale_sessions(repo, *args)
+            if recordings:
+                with store.open_writer(chunk_key(stale.id, 1)) as writer:
+                    writer.write(b"chunk")
+                MySQLRecordingRepository(test_db).add_chunk(stale.id, chunk_key(stale.id, 1), 1)
+            return recordings
+
+        with patch.object(MySQLRecordingRepository, "list_stale_sessions", list_then_resume):
+            report = sweeper.sweep()
+        test_db.expire_all()
+
+        assert report["stale_sessions"] == 0
+        assert stale.status == RecordingStatus.paused
+        assert store.exists(chunk_key(stale.id, 0))
+        assert store.exists(chunk_key(stale.id, 1))
+
+    def test_s3_store_lists_and_deletes_recordings(self, s3_blob_store):
+        """Test recordings are listed across listing pages and deleted with their local copies"""
+        for key in ("rec-1/chunk_0000.webm.enc", "rec-1/chunk_0001.webm.enc", "rec-2/chunk_0000.webm.enc"):
+            with s3_blob_store.open_writer(key) as writer:
+                writer.write(b"chunk")
+        cached = s3_blob_store.local_path("rec-1/chunk_0000.webm.enc")
+
+        assert [recording_id for recording_id, _ in s3_blob_store.iter_recordings()] == ["rec-1", "rec-2"]
+        assert s3_blob_store.delete_recording("rec-1") == 2
+        assert [recording_id for recording_id, _ in s3_blob_store.iter_recordings()] == ["rec-2"]
+        assert not os.path.exists(cached)
+        with pytest.raises(ValueError):
+            s3_blob_store.delete_recording("rec-1/../rec-2")
+
+    def test_shutdown_interrupts_a_throttled_sweep(self, test_db, sample_user, store):
+        """Test a sweep waiting on the deletion rate limit stops promptly at shutdown"""
+        import threading
+        import time
+        from sqlalchemy.orm import Session
+        from jobs.retention import RetentionSweeper
+
+        self._add_recording(test_db, store, sample_user, "ended", 3, 48, full_audio=True)
+        sweeper = RetentionSweeper(
+            batch_size=10,
+            max_deletes_per_second=0.1,
+            session_factory=lambda: Session(bind=test_db.get_bind()),
+        )
+        reports = []
+        thread = threading.Thread(target=lambda: reports.append(sweeper.sweep()))
+        started = time.monotonic()
+        thread.start()
+        time.sleep(0.2)
+        sweeper.shutdown()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 5
+        assert reports == [{}]
+
+
+class TestDatabaseProfiles:
+    """Tests for per-dialect engine profiles and pool statistics"""
+
+    def test_sqlite_file_profile_sets_pragmas(self, tmp_path):
+        """Test file databases run in WAL mode with relaxed syncing and a busy timeout"""
+        from sqlalchemy import text
+        from database import create_database_engine
+
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+        try:
+            with engine.connect() as connection:
+                assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+                assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        finally:
+            engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_async_sqlite_profile_sets_pragmas(self, tmp_path):
+        """Test the aiosqlite engine gets the same pragmas and a pooled connection"""
+        from sqlalchemy import text
+        from database import async_database_url, create_async_database_engine
+
+        engine = create_async_database_engine(async_database_url(f"sqlite:///{tmp_path / 'profile.db'}"))
+        try:
+            async with engine.connect() as connection:
+                assert (await connection.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+                assert (await connection.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+        finally:
+            await engine.dispose()
+
+    # Tables as the first release created them
+    ORIGINAL_SCHEMA = (
+        "CREATE TABLE users (id VARCHAR(36) NOT NULL PRIMARY KEY, google_id VARCHAR(255) NOT NULL, "
+        "email VARCHAR(255) NOT NULL, display_name VARCHAR(255), avatar_url VARCHAR(512), "
+        "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)",
+        "CREATE UNIQUE INDEX ix_users_google_id ON users (google_id)",
+        "CREATE TABLE recordings (id VARCHAR(36) NOT NULL PRIMARY KEY, user_id VARCHAR(36) NOT NULL "
+        "REFERENCES users (id) ON DELETE CASCADE, status VARCHAR(6) NOT NULL, created_at DATETIME NOT NULL, "
+        "updated_at DATETIME NOT NULL, audio_file_path VARCHAR(512), transcription_text TEXT, "
+        "llm_provider VARCHAR(50) NOT NULL, notes TEXT)",
+        "CREATE INDEX ix_recordings_user_id ON recordings (user_id)",
+        "CREATE TABLE recording_chunks (id VARCHAR(36) NOT NULL PRIMARY KEY, recording_id VARCHAR(36) NOT NULL "
+        "REFERENCES recordings (id) ON DELETE CASCADE, chunk_index INTEGER NOT NULL, "
+        "audio_blob_path VARCHAR(512) NOT NULL, duration_seconds FLOAT, uploaded_at DATETIME NOT NULL)",
+        "CREATE INDEX ix_recording_chunks_recording_id ON recording_chunks (recording_id)",
+    )
+
+    def test_upgrade_db_upgrades_the_original_schema(self):
+        """Test a database created by the first release accepts chunk uploads after upgrade_db"""
+        from sqlalchemy import text
+        from sqlalchemy.orm import Session
+        from database import create_database_engine, upgrade_db
+        from models.recording import Recording
+        from repositories.recording_repository import MySQLRecordingRepository
+
+        engine = create_database_engine("sqlite://")
+        try:
+            with engine.begin() as connection:
+                for statement in self.ORIGINAL_SCHEMA:
+                    connection.execute(text(statement))
+                connection.execute(text(
+                    "INSERT INTO users VALUES ('user-1', 'google-1', 'doctor@example.com', NULL, NULL, "
+                    "'2024-01-01 00:00:00', '2024-01-01 00:00:00')"
+                ))
+                connection.execute(text(
+                    "INSERT INTO recordings VALUES ('rec-1', 'user-1', 'ended', '2024-01-01 00:00:00', "
+                    "'2024-01-01 00:00:00', NULL, 'bGVnYWN5', 'requestyai', NULL)"
+                ))
+                # Concurrent uploads of one index could add two rows before the constraint existed
+                connection.execute(text(
+                    "INSERT INTO recording_chunks VALUES "
+                    "('chunk-a', 'rec-1', 0, 'rec-1/old.webm', 1.0, '2024-01-01 00:00:00'), "
+                    "('chunk-b', 'rec-1', 0, 'rec-1/new.webm', 1.0, '2024-01-01 00:00:05'), "
+                    "('chunk-c', 'rec-1', 1, 'rec-1/chunk_1.webm', 1.0, '2024-01-01 00:00:10')"
+                ))
+
+            added = upgrade_db(engine)
+            assert "recordings.transcription_ciphertext" in added
+            assert "recordings.chunks_count" in added
+            assert "recording_chunks.checksum" in added
+            assert "recording_chunks.uq_recording_chunks_recording_chunk" in added
+            assert upgrade_db(engine) == []
+
+            with Session(engine) as db:
+                repo = MySQLRecordingRepository(db)
+                assert [chunk.audio_blob_path for chunk in repo.get_chunks("rec-1")] == [
+                    "rec-1/new.webm", "rec-1/chunk_1.webm"
+                ]
+                repo.add_chunk("rec-1", "rec-1/chunk_1.webm", 1, size_bytes=5, checksum="a" * 64)
+                repo.add_chunk("rec-1", "rec-1/chunk_2.webm", 2)
+
+                recording = db.get(Recording, "rec-1")
+                assert len(repo.get_chunks("rec-1")) == 3
+                assert recording.transcription_ciphertext is None
+                assert recording.chunks_count == 3
+                assert recording.live_transcription is False
+        finally:
+            engine.dispose()
+
+    def test_upgrade_db_widens_mysql_enum_columns(self):
+        """Test native MySQL ENUM columns are redefined with statuses added since they were created"""
+        from sqlalchemy.dialects import mysql
+        from database import _widen_enum_columns
+        from models.recording import Recording
+
+        class Inspector:
+            def get_columns(self, table_name):
+                return [
+                    {"name": "id", "type": mysql.VARCHAR(36)},
+                    {"name": "status", "type": mysql.ENUM("active", "paused", "ended")},
+                ]
+
+        class Connection:
+            dialect = mysql.dialect()
+            statements = []
+
+            def execute(self, statement):
+                self.statements.append(str(statement))
+
+        connection = Connection()
+        assert _widen_enum_columns(connection, Inspector(), Recording.__table__) == ["recordings.status"]
+        assert connection.statements == [
+            "ALTER TABLE recordings MODIFY COLUMN status "
+            "ENUM('active','paused','ended','transcribing','failed') NOT NULL"
+        ]
+
+    def test_in_memory_sqlite_shares_one_connection(self):
+        """Test every session and thread sees the same in-memory database"""
+        import threading
+        from sqlalchemy import text
+        from database import create_database_engine
+
+        engine = create_database_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE items (name TEXT)"))
+            connection.execute(text("INSERT INTO items VALUES ('shared')"))
+
+        names = []
+
+        def read():
+            with engine.connect() as connection:
+                names.append(connection.execute(text("SELECT name FROM items")).scalar())
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        assert names == ["shared"]
+
+    def test_mysql_profile_sizes_pool_and_picks_driver(self, monkeypatch):
+        """Test MySQL engines get the configured pool and the fastest installed driver"""
+        import database
+
+        monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 7)
+        monkeypatch.setattr(database.settings, "DB_MAX_OVERFLOW", 3)
+        monkeypatch.setattr(database.settings, "DB_POOL_TIMEOUT_SECONDS", 2.5)
+
+        engine = database.create_database_engine("mysql+pymysql://user:pass@db/app")
+        assert engine.pool.size() == 7
+        assert engine.pool.timeout() == 2.5
+        assert engine.pool._max_overflow == 3
+        assert engine.pool._pre_ping
+
+        installed = {"pymysql", "aiomysql"}
+        monkeypatch.setattr(
+            database.importlib.util, "find_spec", lambda name: object() if name in installed else None
+        )
+        assert database.database_url("mysql://db/app").drivername == "mysql+pymysql"
+        assert database.async_database_url("mysql+pymysql://db/app").drivername == "mysql+aiomysql"
+        installed.update({"MySQLdb", "asyncmy"})
+        assert database.database_url("mysql://db/app").drivername == "mysql+mysqldb"
+        assert database.database_url("mysql+pymysql://db/app").drivername == "mysql+pymysql"
+        assert database.async_database_url("mysql+pymysql://db/app").drivername == "mysql+asyncmy"
+
+    def test_pool_stats_report_waits_and_timeouts(self, tmp_path, monkeypatch, client):
+        """Test checkouts that queue for or time out on an exhausted pool are counted"""
+        import threading
+        from sqlalchemy import exc
+        import database
+        from utils.pool_stats import pool_stats
+
+        monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 1)
+        monkeypatch.setattr(database.settings, "DB_MAX_OVERFLOW", 0)
+        monkeypatch.setattr(database.settings, "DB_POOL_TIMEOUT_SECONDS", 0.5)
+        engine = database.create_database_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+        try:
+            held = engine.connect()
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+            threading.Timer(0.1, held.close).start()
+            with engine.connect():
+                stats = pool_stats(engine)
+        finally:
+            engine.dispose()
+
+        assert stats["size"] == 1
+        assert stats["checked_out"] == 1
+        assert stats["checkouts"] == 3
+        assert stats["waits"] == 2
+        assert stats["timeouts"] == 1
+        assert stats["checkout_seconds_max"] >= 0.4
+
+        response = client.get("/health")
+        assert set(response.json()["database_pools"]) == {"sync", "async"}
@@ -1,6 +1,9 @@
 import pytest
 from repositories.user_repository import MySQLUserRepository
 from repositories.recording_repository import MySQLRecordingRepository
+from repositories.transcription_cache_repository import MySQLTranscriptionCacheRepository
+from repositories.async_user_repository import AsyncMySQLUserRepository
+from repositories.async_recording_repository import AsyncMySQLRecordingRepository
 from models.recording import RecordingStatus
 
 
@@ -79,6 +82,19 @@ class TestRecordingRepository:
         assert len(recordings) > 0
         assert recordings[0].user_id == sample_user.id
 
+    def test_list_recording_summaries(self, test_db, sample_user, sample_recording):
+        """Test summary rows carry chunk counts and leave out transcriptions"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/to/chunk.webm", 0)
+        newer = repo.create_recording(user_id=sample_user.id)
+
+        rows = repo.list_recording_summaries(sample_user.id, limit=10)
+        after_newer = repo.list_recording_summaries(sample_user.id, limit=10, before=(rows[0].created_at, rows[0].id))
+
+        assert [(row.id, row.chunks_count) for row in rows] == [(newer.id, 0), (sample_recording.id, 1)]
+        assert "transcription_text" not in rows[0]._fields
+        assert [row.id for row in after_newer] == [sample_recording.id]
+
     def test_add_chunk(self, test_db, sample_recording):
         """Test adding an audio chunk"""
         repo = MySQLRecordingRepository(test_db)
@@ -94,6 +110,56 @@ class TestRecordingRepository:
         assert chunk.chunk_index == 0
         assert chunk.duration_seconds == 10.5
 
+    def test_add_chunk_replaces_same_index(self, test_db, sample_recording):
+        """Test re-adding a chunk index updates the row instead of duplicating it"""
+        repo = MySQLRecordingRepository(test_db)
+        first = repo.add_chunk(sample_recording.id, "/path/to/old.webm", 0, size_bytes=10, checksum="a" * 64)
+        second = repo.add_chunk(sample_recording.id, "/path/to/new.webm", 0, size_bytes=20, checksum="b" * 64)
+
+        assert second.id == first.id
+        assert second.audio_blob_path == "/path/to/new.webm"
+        assert (second.size_bytes, second.checksum) == (20, "b" * 64)
+        assert len(repo.get_chunks(sample_recording.id)) == 1
+
+    def test_chunk_aggregates(self, test_db, sample_recording):
+        """Test adding and replacing chunks keeps the recording's aggregates current"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunks(sample_recording.id, [
+            (0, "/path/to/chunk_0.webm", 20.0, 1000),
+            (1, "/path/to/chunk_1.webm", 20.0, 1000),
+        ])
+        repo.add_chunk(sample_recording.id, "/path/to/chunk_1.webm", 1, duration_seconds=5.0, size_bytes=250)
+
+        recording = repo.get_recording(sample_recording.id)
+        test_db.refresh(recording)
+
+        assert recording.chunks_count == 2
+        assert recording.total_duration_seconds == 25.0
+        assert recording.total_bytes == 1250
+        assert recording.last_chunk_index == 1
+
+    def test_refresh_aggregates(self, test_db, sample_recording):
+        """Test the repair path recomputes aggregates that drifted"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/to/chunk_0.webm", 0, duration_seconds=20.0)
+        sample_recording.chunks_count = 7
+        test_db.commit()
+
+        assert repo.refresh_aggregates() == 1
+        test_db.refresh(sample_recording)
+        assert sample_recording.chunks_count == 1
+
+    def test_add_chunks(self, test_db, sample_recording):
+        """Test adding several chunks in one bulk insert"""
+        repo = MySQLRecordingRepository(test_db)
+        chunks = repo.add_chunks(sample_recording.id, [
+            (1, "/path/to/chunk_1.webm", 20.0),
+            (0, "/path/to/chunk_0.webm", 20.0),
+        ])
+
+        assert [c.chunk_index for c in chunks] == [0, 1]
+        assert [c.audio_blob_path for c in chunks] == ["/path/to/chunk_0.webm", "/path/to/chunk_1.webm"]
+
     def test_mark_paused(self, test_db, sample_recording):
         """Test marking recording as paused"""
         repo = MySQLRecordingRepository(test_db)
@@ -108,13 +174,29 @@ class TestRecordingRepository:
         recording = repo.mark_ended(
             recording_id=sample_recording.id,
             full_audio_path="/path/to/full.wav",
-            transcription="Test transcription text"
+            transcription=b"Test transcription ciphertext"
         )
 
         assert recording is not None
         assert recording.status == RecordingStatus.ended
         assert recording.audio_file_path == "/path/to/full.wav"
-        assert recording.transcription_text == "Test transcription text"
+        assert recording.transcription_ciphertext == b"Test transcription ciphertext"
+        assert recording.transcription_text is None
+
+    def test_migrate_legacy_transcriptions(self, test_db, sample_recording):
+        """Test base64 transcriptions move to the binary column without changing the plaintext"""
+        from utils.encryption_utils import encryption_service
+
+        sample_recording.transcription_text = encryption_service.encrypt_text("legacy transcript")
+        test_db.commit()
+
+        repo = MySQLRecordingRepository(test_db)
+        assert repo.migrate_legacy_transcriptions(batch_size=1) == 1
+        assert repo.migrate_legacy_transcriptions() == 0
+
+        recording = repo.get_recording(sample_recording.id)
+        assert recording.transcription_text is None
+        assert encryption_service.decrypt_text_bytes(recording.transcription_ciphertext) == "legacy transcript"
 
     def test_get_chunks(self, test_db, sample_recording):
         """Test retrieving chunks for a recording"""
@@ -131,3 +213,204 @@ class TestRecordingRepository:
         assert chunks[0].chunk_index == 0
         assert chunks[1].chunk_index == 1
         assert chunks[2].chunk_index == 2
+
+    def test_mark_transcribing(self, test_db, sample_recording):
+        """Test marking recording as queued for transcription"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.mark_failed(sample_recording.id, "previous failure")
+        recording = repo.mark_transcribing(sample_recording.id)
+
+        assert recording is not None
+        assert recording.status == RecordingStatus.transcribing
+        assert recording.error_message is None
+
+    def test_mark_failed(self, test_db, sample_recording):
+        """Test marking recording as failed with an error message"""
+        repo = MySQLRecordingRepository(test_db)
+        recording = repo.mark_failed(sample_recording.id, "Provider timed out")
+
+        assert recording is not None
+        assert recording.status == RecordingStatus.failed
+        assert recording.error_message == "Provider timed out"
+
+    def test_get_chunk(self, test_db, sample_recording):
+        """Test getting a single chunk by index"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunk(sample_recording.id, "/path/chunk_0.webm", 0)
+        repo.add_chunk(sample_recording.id, "/path/chunk_1.webm", 1)
+
+        chunk = repo.get_chunk(sample_recording.id, 1)
+
+        assert chunk is not None
+        assert chunk.audio_blob_path == "/path/chunk_1.webm"
+        assert repo.get_chunk(sample_recording.id, 2) is None
+
+    def test_save_chunk_transcript(self, test_db, sample_recording):
+        """Test chunk transcripts are upserted and returned in chunk order"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.save_chunk_transcript(sample_recording.id, 1, "second")
+        repo.save_chunk_transcript(sample_recording.id, 0, "first")
+        repo.save_chunk_transcript(sample_recording.id, 1, "second, retried")
+
+        transcripts = repo.get_chunk_transcripts(sample_recording.id)
+
+        assert [t.chunk_index for t in transcripts] == [0, 1]
+        assert transcripts[1].transcription_text == "second, retried"
+
+    def test_replacing_chunk_audio_drops_its_transcript(self, test_db, sample_recording):
+        """Test a transcript survives a re-upload of the same audio but not of different audio"""
+        repo = MySQLRecordingRepository(test_db)
+        repo.add_chunks(sample_recording.id, [
+            (0, "/path/to/chunk_0.webm", None, 10, "a" * 64),
+            (1, "/path/to/chunk_1.webm", None, 10, "b" * 64),
+            (2, "/path/to/chunk_2.webm"),
+        ])
+        for index in range(3):
+            repo.save_chunk_transcript(sample_recording.id, index, f"chunk {index}")
+
+        repo.add_chunks(sample_recording.id, [
+            (0, "/path/to/chunk_0.webm", None, 10, "a" * 64),
+            (1, "/path/to/chunk_1.webm", None, 12, "c" * 64),
+            (2, "/path/to/chunk_2.webm"),
+        ])
+
+        transcripts = repo.get_chunk_transcripts(sample_recording.id)
+        assert [(t.chunk_index, t.transcription_text) for t in transcripts] == [(0, "chunk 0")]
+
+    def test_list_stale_sessions(self, test_db, sample_recording):
+        """Test a recording counts as active while chunks keep arriving"""
+        from datetime import datetime, timedelta
+
+        repo = MySQLRecordingRepository(test_db)
+        sample_recording.updated_at = datetime.utcnow() - timedelta(days=30)
+        test_db.commit()
+        cutoff = datetime.utcnow() - timedelta(days=7)
+
+        assert [r.id for r in repo.list_stale_sessions(cutoff, 10)] == [sample_recording.id]
+
+        repo.add_chunk(sample_recording.id, "/path/to/chunk_0.webm", 0)
+        assert repo.list_stale_sessions(cutoff, 10) == []
+
+        repo.mark_ended(sample_recording.id, "/path/to/full.webm", b"ciphertext")
+        sample_recording.updated_at = datetime.utcnow() - timedelta(days=30)
+        test_db.commit()
+        assert repo.list_stale_sessions(datetime.utcnow(), 10) == []
+        assert [r.id for r in repo.list_archived_recordings(cutoff, 10)] == [sample_recording.id]
+
+        repo.mark_chunks_purged(sample_recording.id)
+        assert repo.list_archived_recordings(cutoff, 10) == []
+
+
+class TestAsyncUserRepository:
+    """Unit tests for AsyncUserRepository"""
+
+    @pytest.mark.asyncio
+    async def test_create_and_get_user(self, async_test_db):
+        """Test creating a user and reading it back by both IDs"""
+        repo = AsyncMySQLUserRepository(async_test_db)
+        user = await repo.create_user(google_id="google_async", email="async@example.com")
+
+        assert (await repo.get_user_by_id(user.id)).email == "async@example.com"
+        assert (await repo.get_user_by_google_id("google_async")).id == user.id
+        assert await repo.get_user_by_id("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_update_user(self, async_test_db, sample_user):
+        """Test updating user information"""
+        repo = AsyncMySQLUserRepository(async_test_db)
+        updated_user = await repo.update_user(sample_user.id, display_name="Updated Name")
+
+        assert updated_user.display_name == "Updated Name"
+
+
+class TestAsyncRecordingRepository:
+    """Unit tests for AsyncRecordingRepository"""
+
+    @pytest.mark.asyncio
+    async def test_create_recording(self, async_test_db, sample_user):
+        """Test creating a recording returns it with chunks loaded"""
+        repo = AsyncMySQLRecordingRepository(async_test_db)
+        recording = await repo.create_recording(user_id=sample_user.id, live_transcription=True)
+
+        assert recording.status == RecordingStatus.active
+        assert recording.live_transcription is True
+        assert recording.to_dict()["chunks_count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_add_and_get_chunks(self, async_test_db, sample_recording):
+        """Test adding chunks and reading them back in order"""
+        repo = AsyncMySQLRecordingRepository(async_test_db)
+        await repo.add_chunk(sample_recording.id, "/tmp/chunk_1.webm", 1, duration_seconds=2.0)
+        await repo.add_chunk(sample_recording.id, "/tmp/chunk_0.webm", 0)
+
+        chunks = await repo.get_chunks(sample_recording.id)
+        recording = await repo.get_recording(sample_recording.id)
+
+        assert [c.chunk_index for c in chunks] == [0, 1]
+        assert (await repo.get_chunk(sample_recording.id, 1)).duration_seconds == 2.0
+        assert recording.to_dict()["chunks_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_add_chunks(self, async_test_db, sample_recording):
+        """Test adding several chunks in one bulk insert"""
+        repo = AsyncMySQLRecordingRepository(async_test_db)
+        chunks = await repo.add_chunks(sample_recording.id, [
+            (0, "/tmp/chunk_0.webm", 20.0),
+            (1, "/tmp/chunk_1.webm", None),
+        ])
+
+        assert [(c.chunk_index, c.duration_seconds) for c in chunks] == [(0, 20.0), (1, None)]
+        assert all(c.id for c in chunks)
+        assert len(await repo.get_chunks(sample_recording.id)) == 2
+
+    @pytest.mark.asyncio
+    async def test_list_recordings(self, async_test_db, sample_user, sample_recording):
+        """Test listing user's recordings"""
+        repo = AsyncMySQLRecordingRepository(async_test_db)
+        recordings = await repo.list_recordings(sample_user.id)
+
+        assert [r.id for r in recordings] == [sample_recording.id]
+
+    @pytest.mark.asyncio
+    async def test_status_transitions(self, async_test_db, sample_recording):
+        """Test marking a recording paused, transcribing and ended"""
+        repo = AsyncMySQLRecordingRepository(async_test_db)
+
+        assert (await repo.mark_paused(sample_recording.id)).status == RecordingStatus.paused
+        assert (await repo.mark_transcribing(sample_recording.id)).status == RecordingStatus.transcribing
+
+        recording = await repo.mark_ended(sample_recording.id, "/tmp/full.webm", b"encrypted text")
+        assert recording.status == RecordingStatus.ended
+        assert recording.transcription_ciphertext == b"encrypted text"
+        assert await repo.mark_paused("missing") is None
+
+
+class TestTranscriptionCacheRepository:
+    """Tests for TranscriptionCacheRepository"""
+
+    def test_save_and_get_entry(self, test_db):
+        """Test saving, replacing and reading a cache entry"""
+        repo = MySQLTranscriptionCacheRepository(test_db)
+        repo.save_entry("a" * 64, "first")
+        repo.save_entry("a" * 64, "second")
+
+        entry = repo.get_entry("a" * 64)
+
+        assert entry is not None
+        assert entry.transcription_text == "second"
+        assert repo.get_entry("b" * 64) is None
+
+    def test_evict_least_recently_used(self, test_db):
+        """Test eviction keeps the most recently used entries"""
+        from datetime import datetime, timedelta
+
+        repo = MySQLTranscriptionCacheRepository(test_db)
+        now = datetime.utcnow()
+        for age, key in enumerate(["new", "middle", "old"]):
+            entry = repo.save_entry(key, key)
+            entry.last_used_at = now - timedelta(minutes=age)
+        test_db.commit()
+
+        assert repo.evict(max_entries=2) == 1
+        assert repo.get_entry("old") is None
+        assert repo.get_entry("new") is not None
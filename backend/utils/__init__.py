@@ -1,6 +1,7 @@
 from utils.jwt_utils import create_access_token, decode_access_token
 from utils.encryption_utils import encryption_service
 from utils.audio_utils import assemble_audio_chunks, get_audio_duration
+from utils.audio_probe import probe_duration
 
 __all__ = [
     "create_access_token",
@@ -8,4 +9,5 @@ __all__ = [
     "encryption_service",
     "assemble_audio_chunks",
     "get_audio_duration",
+    "probe_duration",
 ]
@@ -0,0 +1,214 @@
+import io
+import struct
+import statistics
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+
+# How much of the file is read to find the WAV/Ogg headers and the last Ogg page
+HEAD_SIZE = 64 * 1024
+OGG_TAIL_SIZE = 64 * 1024
+
+# EBML (WebM/Matroska) element IDs, with their length marker bits.
+# Every WebM/Matroska file starts with the EBML header element ID.
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+EBML_SEGMENT = 0x18538067
+EBML_INFO = 0x1549A966
+EBML_TIMECODE_SCALE = 0x2AD7B1
+EBML_DURATION = 0x4489
+EBML_CLUSTER = 0x1F43B675
+EBML_CLUSTER_TIMECODE = 0xE7
+EBML_BLOCK_GROUP = 0xA0
+EBML_BLOCK = 0xA1
+EBML_SIMPLE_BLOCK = 0xA3
+
+# Elements whose children are parsed; everything else is skipped by size
+EBML_MASTER_ELEMENTS = {EBML_SEGMENT, EBML_INFO, EBML_CLUSTER, EBML_BLOCK_GROUP}
+
+# Matroska default: timecodes in milliseconds
+DEFAULT_TIMECODE_SCALE = 1_000_000
+
+OGG_MAGIC = b"OggS"
+OGG_HEADER_SIZE = 27
+OGG_NO_GRANULE = 0xFFFFFFFFFFFFFFFF
+OPUS_SAMPLE_RATE = 48000
+
+
+def probe_duration(audio: Union[str, BinaryIO]) -> Optional[float]:
+    """
+    Read the duration of a WebM, WAV or Ogg file from its container metadata
+
+    No audio is decoded and no subprocess is started. A file object is
+    left at the position it had on entry.
+
+    Args:
+        audio: Path to the audio file, or a seekable binary file object
+
+    Returns:
+        Duration in seconds, or None if the format is not recognised or
+        its headers do not determine the duration
+    """
+    if isinstance(audio, str):
+        with open(audio, 'rb') as f:
+            return _probe(f)
+
+    position = audio.tell()
+    try:
+        audio.seek(0)
+        return _probe(audio)
+    finally:
+        audio.seek(position)
+
+
+def _probe(f: BinaryIO) -> Optional[float]:
+    head = f.read(HEAD_SIZE)
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        f.seek(0, io.SEEK_END)
+        return _wav_duration(head, f.tell())
+
+    if head[:4] == OGG_MAGIC:
+        f.seek(0, io.SEEK_END)
+        size = f.tell()
+        f.seek(max(size - OGG_TAIL_SIZE, 0))
+        return _ogg_duration(head, f.read())
+
+    if head[:4] == EBML_MAGIC or head.find(EBML_CLUSTER.to_bytes(4, "big")) != -1:
+        # MediaRecorder continuation chunks start inside a Cluster, without a header
+        return _webm_duration(head + f.read())
+
+    return None
+
+
+def _wav_duration(head: bytes, file_size: int) -> Optional[float]:
+    byte_rate = None
+    position = 12
+
+    while position + 8 <= len(head):
+        chunk_id = head[position:position + 4]
+        chunk_size = struct.unpack("<I", head[position + 4:position + 8])[0]
+        body = position + 8
+
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            byte_rate = struct.unpack("<I", head[body + 8:body + 12])[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            available = file_size - body
+            if chunk_size in (0, 0xFFFFFFFF) or chunk_size > available:
+                # Streamed WAV: the header was written before the size was known
+                chunk_size = available
+            return chunk_size / byte_rate
+
+        position = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+
+def _ogg_duration(head: bytes, tail: bytes) -> Optional[float]:
+    # The first page carries the codec identification header
+    if len(head) < OGG_HEADER_SIZE:
+        return None
+    segment_count = head[26]
+    payload = head[OGG_HEADER_SIZE + segment_count:]
+
+    if payload[:8] == b"OpusHead" and len(payload) >= 12:
+        sample_rate = OPUS_SAMPLE_RATE
+        pre_skip = struct.unpack("<H", payload[10:12])[0]
+    elif payload[:7] == b"\x01vorbis" and len(payload) >= 16:
+        sample_rate = struct.unpack("<I", payload[12:16])[0]
+        pre_skip = 0
+    else:
+        return None
+    if not sample_rate:
+        return None
+
+    # The granule position of the last page is the total sample count
+    position = len(tail)
+    while True:
+        position = tail.rfind(OGG_MAGIC, 0, position)
+        if position == -1:
+            return None
+        if position + 14 <= len(tail) and tail[position + 4] == 0:
+            granule = struct.unpack("<Q", tail[position + 6:position + 14])[0]
+            if granule != OGG_NO_GRANULE:
+                return max(granule - pre_skip, 0) / sample_rate
+
+
+def _read_vint(data: bytes, position: int, keep_marker: bool) -> Optional[Tuple[int, int, bool]]:
+    """Read an EBML variable-length integer: (value, length, is the unknown-size marker)"""
+    if position >= len(data):
+        return None
+
+    first = data[position]
+    length, mask = 1, 0x80
+    while length <= 8 and not first & mask:
+        length += 1
+        mask >>= 1
+    if length > 8 or position + length > len(data):
+        return None
+
+    value = first if keep_marker else first & (mask - 1)
+    for byte in data[position + 1:position + length]:
+        value = (value << 8) | byte
+
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, length, unknown
+
+
+def _webm_duration(data: bytes) -> Optional[float]:
+    timecode_scale = DEFAULT_TIMECODE_SCALE
+    duration = None
+    cluster_timecode = None
+    block_timecodes: List[int] = []
+
+    position = 0 if data[:4] == EBML_MAGIC else data.find(EBML_CLUSTER.to_bytes(4, "big"))
+
+    while 0 <= position < len(data):
+        element = _read_vint(data, position, keep_marker=True)
+        if element is None:
+            break
+        element_id, id_length, _ = element
+        size = _read_vint(data, position + id_length, keep_marker=False)
+        if size is None:
+            break
+        element_size, size_length, unknown_size = size
+        body = position + id_length + size_length
+
+        if element_id in EBML_MASTER_ELEMENTS:
+            # Descend; live recordings write Segment and Cluster with unknown sizes
+            position = body
+            continue
+        if unknown_size:
+            break
+
+        end = body + element_size
+        value = data[body:end]
+
+        if element_id == EBML_TIMECODE_SCALE and len(value) == element_size:
+            timecode_scale = int.from_bytes(value, "big")
+        elif element_id == EBML_DURATION and element_size in (4, 8) and len(value) == element_size:
+            duration = struct.unpack(">f" if element_size == 4 else ">d", value)[0]
+        elif element_id == EBML_CLUSTER_TIMECODE and len(value) == element_size:
+            cluster_timecode = int.from_bytes(value, "big")
+        elif element_id in (EBML_SIMPLE_BLOCK, EBML_BLOCK) and cluster_timecode is not None:
+            # Block header: track number (vint), then a signed 16-bit relative timecode
+            track = _read_vint(data, body, keep_marker=False)
+            if track is not None and body + track[1] + 2 <= len(data):
+                relative = struct.unpack(">h", data[body + track[1]:body + track[1] + 2])[0]
+                block_timecodes.append(cluster_timecode + relative)
+
+        position = end
+
+    if duration:
+        return duration * timecode_scale / 1e9
+
+    if len(block_timecodes) < 2:
+        return None
+
+    # Live WebM has no Duration: span the blocks, plus one frame for the last one
+    block_timecodes.sort()
+    gaps = [b - a for a, b in zip(block_timecodes, block_timecodes[1:]) if b > a]
+    if not gaps:
+        return None
+    frame = statistics.median(gaps)
+    return (block_timecodes[-1] - block_timecodes[0] + frame) * timecode_scale / 1e9
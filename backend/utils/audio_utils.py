@@ -1,12 +1,252 @@
+import io
 import os
-from typing import List
+import sys
+import wave
+import array
+import threading
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
 from pydub import AudioSegment
+from utils.audio_probe import EBML_MAGIC, probe_duration
+from utils.encryption_utils import encryption_service
+
+
+# Matroska Cluster element ID: media data starts at the first one
+CLUSTER_ID = b"\x1f\x43\xb6\x75"
+MAX_INIT_SEGMENT_SIZE = 1024 * 1024
+
+# Read/write block size used when streaming chunk data
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# ffmpeg input options for a concat demuxer listing of chunk files
+CONCAT_INPUT_ARGS = ["-f", "concat", "-safe", "0"]
+
+# Transcription-friendly PCM: 16 kHz, mono, signed 16-bit little-endian
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2
+
+
+class ArchiveFormat(NamedTuple):
+    """How finished recordings are stored"""
+
+    media_type: str
+    # ffmpeg output options; None keeps the recorded WebM/Opus bytes as they are
+    ffmpeg_args: Optional[List[str]]
+
+
+# Archival formats of assembled audio (AUDIO_ARCHIVE_FORMAT). Browsers
+# record Opus in WebM, so "webm" and "ogg" keep the compressed Opus
+# packets (Ogg is a remux, not a re-encode); "flac" and "wav" decode to
+# lossless or raw PCM for downstream tools that need it.
+ARCHIVE_FORMATS: Dict[str, ArchiveFormat] = {
+    "webm": ArchiveFormat("audio/webm", None),
+    "ogg": ArchiveFormat("audio/ogg", ["-map", "0:a", "-c:a", "copy", "-f", "ogg"]),
+    "flac": ArchiveFormat("audio/flac", ["-map", "0:a", "-c:a", "flac", "-f", "flac"]),
+    "wav": ArchiveFormat("audio/wav", ["-map", "0:a", "-c:a", "pcm_s16le", "-f", "wav"]),
+}
+
+# How far before a segment boundary to look for a quiet spot to cut at
+SILENCE_SEARCH_SECONDS = 5.0
+SILENCE_FRAME_SECONDS = 0.02
+
+
+def _iter_file_bytes(path: str) -> Iterator[bytes]:
+    """Yield the plaintext of a stored chunk, decrypting it if it is encrypted"""
+    if encryption_service.is_segmented(path):
+        yield from encryption_service.decrypt_range(path)
+        return
+
+    # Chunks uploaded before encrypt-on-write were stored in plaintext
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(COPY_BUFFER_SIZE)
+            if not block:
+                break
+            yield block
+
+
+def has_ebml_header(chunk_path: str) -> bool:
+    """Check whether a chunk starts a new WebM/Matroska file"""
+    prefix = b""
+    for block in _iter_file_bytes(chunk_path):
+        prefix += block
+        if len(prefix) >= len(EBML_MAGIC):
+            break
+    return prefix[:len(EBML_MAGIC)] == EBML_MAGIC
+
+
+def _is_webm_fragment_stream(chunk_paths: List[str]) -> bool:
+    """
+    Check whether chunks are fragments of one continuous WebM stream
+
+    A browser MediaRecorder started with a timeslice emits the EBML header
+    only once, so every chunk after the first is a bare run of clusters.
+    Such chunks are joined by plain byte concatenation.
+    """
+    return not any(has_ebml_header(chunk_path) for chunk_path in chunk_paths[1:])
+
+
+def webm_init_segment(chunk_path: str) -> bytes:
+    """
+    Extract the WebM initialization segment from the first chunk
+
+    The EBML header, segment info and track descriptions precede the first
+    Cluster. Prefixing them to a later MediaRecorder fragment makes that
+    fragment decodable on its own.
+
+    Args:
+        chunk_path: Path to the chunk that starts the stream (chunk 0)
+
+    Returns:
+        Bytes up to (not including) the first Cluster
+
+    Raises:
+        ValueError: If no Cluster is found near the start of the chunk
+    """
+    data = b""
+    for block in _iter_file_bytes(chunk_path):
+        data += block
+        position = data.find(CLUSTER_ID)
+        if position != -1:
+            return data[:position]
+        if len(data) > MAX_INIT_SEGMENT_SIZE:
+            break
+    raise ValueError(f"No WebM cluster found in {chunk_path}")
+
+
+def iter_chunk_bytes(chunk_paths: List[str]) -> Iterator[bytes]:
+    """Yield the plaintext of every chunk in order, one buffer at a time"""
+    for chunk_path in chunk_paths:
+        yield from _iter_file_bytes(chunk_path)
+
+
+def _run_ffmpeg(args: List[str], stdin_blocks: Optional[Iterator[bytes]] = None) -> None:
+    """
+    Run ffmpeg, optionally streaming input blocks into its stdin
+
+    ffmpeg writes straight to the output file, so neither the input nor
+    the decoded audio is ever held in memory here.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            [AudioSegment.converter, "-y", "-loglevel", "error", *args],
+            stdin=subprocess.PIPE if stdin_blocks is not None else subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        try:
+            if stdin_blocks is not None:
+                for block in stdin_blocks:
+                    process.stdin.write(block)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its stderr explains why
+        except BaseException:
+            # The input failed (a chunk that does not decrypt, a missing
+            # file); ffmpeg would otherwise wait for the rest of it forever
+            process.kill()
+            raise
+        finally:
+            if process.stdin is not None:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            returncode = process.wait()
+
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg exited with code {returncode}: {message}")
+
+
+def _check_chunk_paths(chunk_paths: List[str]) -> None:
+    if not chunk_paths:
+        raise ValueError("No chunks provided to assemble")
+    for chunk_path in chunk_paths:
+        if not os.path.exists(chunk_path):
+            raise FileNotFoundError(f"Chunk file not found: {chunk_path}")
+
+
+@contextmanager
+def _concat_listing(chunk_paths: List[str]) -> Iterator[str]:
+    """
+    Write an ffmpeg concat demuxer listing of chunks, yielding its path
+
+    Encrypted chunks are listed as named pipes in a private scratch
+    directory; a helper thread writes each chunk's plaintext into its pipe
+    when ffmpeg opens it, so the plaintext only passes through the
+    kernel's pipe buffers, never the disk. A chunk that fails to decrypt
+    is raised when the block exits.
+    """
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        listing_path = os.path.join(scratch_dir, "chunks.txt")
+        fifos: List[Tuple[str, str]] = []
+        with open(listing_path, "w") as listing:
+            for i, chunk_path in enumerate(chunk_paths):
+                if encryption_service.is_segmented(chunk_path):
+                    fifo_path = os.path.join(scratch_dir, f"chunk_{i:04d}.webm")
+                    os.mkfifo(fifo_path, 0o600)
+                    fifos.append((fifo_path, chunk_path))
+                    chunk_path = fifo_path
+                escaped = os.path.abspath(chunk_path).replace("'", "'\\''")
+                listing.write(f"file '{escaped}'\n")
+
+        stop = threading.Event()
+        feeder_errors: List[Exception] = []
+
+        def feed() -> None:
+            for fifo_path, chunk_path in fifos:
+                try:
+                    # Blocks until ffmpeg reaches this chunk
+                    with open(fifo_path, "wb") as fifo:
+                        if stop.is_set():
+                            return
+                        if feeder_errors:
+                            # Closed empty, so ffmpeg never waits for a writer that is not coming
+                            continue
+                        for block in _iter_file_bytes(chunk_path):
+                            fifo.write(block)
+                except BrokenPipeError:
+                    pass  # ffmpeg stopped reading this chunk, or exited
+                except Exception as e:
+                    feeder_errors.append(e)
+                if stop.is_set():
+                    return
+
+        feeder = threading.Thread(target=feed, daemon=True) if fifos else None
+        if feeder is not None:
+            feeder.start()
+        try:
+            yield listing_path
+        finally:
+            stop.set()
+            while feeder is not None and feeder.is_alive():
+                # ffmpeg exited early: open the pipe the feeder is waiting on, so it sees stop
+                for fifo_path, _ in fifos:
+                    try:
+                        os.close(os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK))
+                    except OSError:
+                        pass
+                feeder.join(0.05)
+
+        if feeder_errors:
+            raise feeder_errors[0]
 
 
 def assemble_audio_chunks(chunk_paths: List[str], output_path: str) -> str:
     """
     Assemble multiple audio chunks into a single audio file
 
+    Chunks are streamed rather than decoded into memory, so peak memory is
+    constant regardless of recording length. When the output is WebM and
+    the chunks are MediaRecorder fragments the result is a byte-level
+    concatenation; otherwise ffmpeg decodes the stream once, writing PCM
+    (or the requested format) directly to ``output_path``. Encrypted chunks
+    reach ffmpeg through pipes; only ``output_path`` holds plaintext, so
+    use assemble_encrypted_audio for audio that is kept.
+
     Args:
         chunk_paths: List of paths to audio chunk files (in order)
         output_path: Path where the assembled audio should be saved
@@ -18,22 +258,21 @@ def assemble_audio_chunks(chunk_paths: List[str], output_path: str) -> str:
         Exception: If assembly fails
     """
     try:
-        if not chunk_paths:
-            raise ValueError("No chunks provided to assemble")
+        _check_chunk_paths(chunk_paths)
 
-        # Load the first chunk to initialize
-        combined = AudioSegment.from_file(chunk_paths[0])
-
-        # Append remaining chunks
-        for chunk_path in chunk_paths[1:]:
-            if os.path.exists(chunk_path):
-                audio_chunk = AudioSegment.from_file(chunk_path)
-                combined += audio_chunk
+        if _is_webm_fragment_stream(chunk_paths):
+            if output_path.endswith(".webm"):
+                # Container-level concat: the fragments already form one stream
+                with open(output_path, "wb") as output:
+                    for block in iter_chunk_bytes(chunk_paths):
+                        output.write(block)
             else:
-                raise FileNotFoundError(f"Chunk file not found: {chunk_path}")
-
-        # Export the combined audio
-        combined.export(output_path, format="wav")
+                _run_ffmpeg(["-i", "pipe:0", output_path], iter_chunk_bytes(chunk_paths))
+        else:
+            # Self-contained chunks: let ffmpeg's concat demuxer join them
+            with _concat_listing(chunk_paths) as listing_path:
+                codec_args = ["-c", "copy"] if output_path.endswith(".webm") else []
+                _run_ffmpeg([*CONCAT_INPUT_ARGS, "-i", listing_path, *codec_args, output_path])
 
         return output_path
 
@@ -41,17 +280,276 @@ def assemble_audio_chunks(chunk_paths: List[str], output_path: str) -> str:
         raise Exception(f"Failed to assemble audio chunks: {str(e)}")
 
 
-def get_audio_duration(audio_path: str) -> float:
+def assemble_encrypted_audio(chunk_paths: List[str], output_path: str) -> str:
+    """
+    Assemble WebM chunks straight into an encrypted file
+
+    MediaRecorder fragments are decrypted, concatenated and re-encrypted
+    in a single streaming pass. Self-contained chunks are joined by
+    ffmpeg's concat demuxer, reading them through named pipes and writing
+    to its stdout, which is encrypted as it is read. Either way no
+    plaintext reaches the disk.
+
+    Args:
+        chunk_paths: List of paths to audio chunk files (in order)
+        output_path: Path where the encrypted assembled audio should be saved
+
+    Returns:
+        Path to the encrypted assembled audio file
+    """
+    try:
+        _check_chunk_paths(chunk_paths)
+    except Exception as e:
+        raise Exception(f"Failed to assemble audio chunks: {str(e)}")
+
+    with encryption_service.open_encrypted_writer(output_path) as writer:
+        if _is_webm_fragment_stream(chunk_paths):
+            for block in iter_chunk_bytes(chunk_paths):
+                writer.write(block)
+        else:
+            with _concat_listing(chunk_paths) as listing_path:
+                blocks = iter_ffmpeg_output(listing_path, ["-c", "copy", "-f", "webm"], CONCAT_INPUT_ARGS)
+                for block in blocks:
+                    writer.write(block)
+    return output_path
+
+
+def transcode_encrypted_audio(input_path: str, output_path: str, audio_format: str) -> str:
+    """
+    Convert assembled encrypted WebM audio to an archival format
+
+    The audio is decrypted into ffmpeg's stdin and its output encrypted
+    as it is read back, so no plaintext reaches the disk. Being written
+    to a pipe, WAV and FLAC headers carry no total length; decoders read
+    such files to the end.
+
+    Args:
+        input_path: Encrypted WebM audio, as written by the assembler
+        output_path: Path where the encrypted converted audio should be saved
+        audio_format: Key of ARCHIVE_FORMATS
+
+    Returns:
+        Path to the encrypted converted audio file
+    """
+    ffmpeg_args = ARCHIVE_FORMATS[audio_format].ffmpeg_args
+    with encryption_service.open_decrypted_reader(input_path) as audio:
+        if ffmpeg_args is None:
+            blocks = iter(lambda: audio.read(COPY_BUFFER_SIZE), b"")
+        else:
+            blocks = iter_ffmpeg_output(audio, ffmpeg_args)
+        with encryption_service.open_encrypted_writer(output_path) as writer:
+            for block in blocks:
+                writer.write(block)
+    return output_path
+
+
+def iter_pcm(audio: Union[str, BinaryIO], sample_rate: int = PCM_SAMPLE_RATE) -> Iterator[bytes]:
+    """
+    Decode audio to raw mono PCM with ffmpeg, streaming
+
+    Args:
+        audio: Path to an audio file, or a readable binary file object
+        sample_rate: Output sample rate in Hz
+
+    Yields:
+        Blocks of signed 16-bit little-endian mono PCM
+    """
+    return iter_ffmpeg_output(audio, ["-f", "s16le", "-ac", "1", "-ar", str(sample_rate)])
+
+
+def iter_ffmpeg_output(
+    audio: Union[str, BinaryIO],
+    output_args: List[str],
+    input_args: Sequence[str] = ()
+) -> Iterator[bytes]:
+    """
+    Convert audio with ffmpeg, streaming its output
+
+    File objects are fed to ffmpeg's stdin from a helper thread while the
+    output is read from its stdout, so memory use stays constant.
+
+    Args:
+        audio: Path to an audio file, or a readable binary file object
+        output_args: ffmpeg output options, including the output format (``-f``)
+        input_args: ffmpeg input options, e.g. the demuxer (``-f concat``)
+
+    Yields:
+        Blocks of ffmpeg output
+    """
+    is_path = isinstance(audio, str)
+    args = [
+        AudioSegment.converter, "-loglevel", "error",
+        *input_args, "-i", audio if is_path else "pipe:0",
+        *output_args, "pipe:1",
+    ]
+
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL if is_path else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+        )
+
+        feeder_errors: List[Exception] = []
+
+        def feed() -> None:
+            try:
+                while True:
+                    block = audio.read(COPY_BUFFER_SIZE)
+                    if not block:
+                        break
+                    process.stdin.write(block)
+            except BrokenPipeError:
+                pass  # ffmpeg exited early; its stderr explains why
+            except Exception as e:
+                feeder_errors.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        feeder = None if is_path else threading.Thread(target=feed, daemon=True)
+        if feeder is not None:
+            feeder.start()
+
+        try:
+            while True:
+                block = process.stdout.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                yield block
+        except GeneratorExit:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            if feeder is not None:
+                feeder.join()
+
+        if feeder_errors:
+            raise feeder_errors[0]
+        if returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg exited with code {returncode}: {message}")
+
+
+def _quietest_offset(pcm: bytearray, start: int, end: int, frame_bytes: int) -> int:
+    """Return the offset of the lowest-energy frame in ``pcm[start:end]``"""
+    best_offset, best_energy = end, None
+    for offset in range(start, end - frame_bytes + 1, frame_bytes):
+        samples = array.array("h", pcm[offset:offset + frame_bytes])
+        if sys.byteorder == "big":
+            samples.byteswap()
+        energy = sum(sample * sample for sample in samples)
+        if best_energy is None or energy < best_energy:
+            best_offset, best_energy = offset, energy
+    return best_offset
+
+
+def split_pcm_segments(
+    pcm_blocks: Iterator[bytes],
+    segment_seconds: float,
+    overlap_seconds: float,
+    sample_rate: int = PCM_SAMPLE_RATE
+) -> Iterator[Tuple[float, bytes]]:
+    """
+    Split a PCM stream into overlapping segments
+
+    Each boundary is moved to the quietest frame within the last few
+    seconds of the window, so words are rarely cut in half, and every
+    segment carries ``overlap_seconds`` of the next one's audio. Only one
+    segment's worth of PCM is buffered at a time.
+
+    Args:
+        pcm_blocks: Signed 16-bit mono PCM blocks
+        segment_seconds: Target segment length
+        overlap_seconds: Audio shared by consecutive segments
+        sample_rate: Sample rate of the PCM
+
+    Yields:
+        ``(start_seconds, pcm)`` for each segment
+    """
+    bytes_per_second = sample_rate * PCM_SAMPLE_WIDTH
+
+    def to_bytes(seconds: float) -> int:
+        return int(seconds * sample_rate) * PCM_SAMPLE_WIDTH
+
+    segment_bytes = to_bytes(segment_seconds)
+    overlap_bytes = to_bytes(overlap_seconds)
+    search_bytes = min(to_bytes(SILENCE_SEARCH_SECONDS), segment_bytes // 4 // PCM_SAMPLE_WIDTH * PCM_SAMPLE_WIDTH)
+    frame_bytes = max(to_bytes(SILENCE_FRAME_SECONDS), PCM_SAMPLE_WIDTH)
+
+    buffer = bytearray()
+    offset = 0  # Stream position of buffer[0]
+    covered = 0  # Stream position up to which audio has been emitted
+
+    for block in pcm_blocks:
+        buffer.extend(block)
+        while len(buffer) >= segment_bytes + overlap_bytes:
+            cut = _quietest_offset(buffer, segment_bytes - search_bytes, segment_bytes, frame_bytes)
+            cut = max(cut, PCM_SAMPLE_WIDTH)
+            yield offset / bytes_per_second, bytes(buffer[:cut + overlap_bytes])
+            covered = offset + cut + overlap_bytes
+            del buffer[:cut]
+            offset += cut
+
+    usable = len(buffer) // PCM_SAMPLE_WIDTH * PCM_SAMPLE_WIDTH
+    if usable and (covered == 0 or offset + usable > covered):
+        yield offset / bytes_per_second, bytes(buffer[:usable])
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = PCM_SAMPLE_RATE) -> bytes:
+    """Wrap mono 16-bit PCM in a WAV container"""
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(PCM_SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return output.getvalue()
+
+
+def probe_chunk_duration(chunk_path: str) -> Optional[float]:
+    """
+    Get the duration of a stored chunk, or None if it cannot be determined
+
+    Runs in the upload probe worker processes, so it takes a path and
+    must stay a module-level function.
+
+    Args:
+        chunk_path: Path to the stored (encrypted or legacy plaintext) chunk
+
+    Returns:
+        Duration in seconds, or None
+    """
+    try:
+        return get_audio_duration(io.BytesIO(b"".join(_iter_file_bytes(chunk_path))))
+    except Exception:
+        return None
+
+
+def get_audio_duration(audio_path: Union[str, BinaryIO]) -> float:
     """
     Get duration of an audio file in seconds
 
+    The container headers are read first; the audio is only decoded when
+    they do not determine the duration.
+
     Args:
-        audio_path: Path to audio file
+        audio_path: Path to audio file, or a readable binary file object
 
     Returns:
         Duration in seconds
     """
     try:
+        duration = probe_duration(audio_path)
+        if duration is not None:
+            return duration
+
         audio = AudioSegment.from_file(audio_path)
         return len(audio) / 1000.0  # Convert milliseconds to seconds
     except Exception as e:
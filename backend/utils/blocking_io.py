@@ -0,0 +1,91 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from config import settings
+
+
+class BlockingIOExecutor:
+    """
+    Runs blocking work from async request handlers off the event loop
+
+    File and database I/O go to a bounded thread pool, so a slow disk or
+    database stalls only the request that is waiting on it. CPU-bound work
+    (audio probing) goes to a process pool so it scales with cores instead
+    of contending for the GIL; with zero processes configured it shares
+    the thread pool.
+    """
+
+    def __init__(self, io_workers: Optional[int] = None, cpu_processes: Optional[int] = None):
+        self.io_workers = io_workers or settings.UPLOAD_IO_WORKERS
+        self.cpu_processes = (
+            cpu_processes if cpu_processes is not None
+            else settings.UPLOAD_PROBE_PROCESSES
+        )
+        if self.cpu_processes < 0:
+            self.cpu_processes = os.cpu_count() or 1
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._cpu_executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker pools (idempotent)"""
+        with self._lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self.io_workers,
+                    thread_name_prefix="blocking-io",
+                )
+            if self._cpu_executor is None and self.cpu_processes:
+                # Spawned workers do not inherit the parent's threads and locks
+                self._cpu_executor = ProcessPoolExecutor(
+                    max_workers=self.cpu_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pools"""
+        with self._lock:
+            executors = [self._io_executor, self._cpu_executor]
+            self._io_executor = self._cpu_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run blocking I/O in the thread pool
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, functools.partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run CPU-bound work in the process pool
+
+        Args:
+            func: Module-level (picklable) callable
+            *args: Picklable positional arguments for func
+
+        Returns:
+            The callable's return value
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu_executor or self._io_executor, func, *args)
+
+
+# Global blocking I/O executor instance
+blocking_io = BlockingIOExecutor()
@@ -1,8 +1,136 @@
+import os
 import base64
+import hashlib
+import struct
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from config import settings
 
 
+# Segmented file format: a fixed header followed by independently
+# authenticated frames of FRAME_SIZE plaintext bytes (the last may be short).
+#
+#   header: magic (4) | version (1) | key id (8) | frame size (4)
+#   frame:  nonce (12) | ciphertext | tag (16)
+#
+# Each frame is bound to the header, its index and a "final" flag through
+# the AES-GCM associated data, so frames cannot be reordered, swapped
+# between files or truncated away without detection.
+FILE_MAGIC = b"SCRB"
+FILE_VERSION = 1
+HEADER_FORMAT = ">4sB8sI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+NONCE_SIZE = 12
+TAG_SIZE = 16
+FRAME_OVERHEAD = NONCE_SIZE + TAG_SIZE
+FRAME_SIZE = 64 * 1024
+
+
+def _frame_aad(header: bytes, index: int, final: bool) -> bytes:
+    return header + struct.pack(">QB", index, int(final))
+
+
+class EncryptedFileWriter:
+    """
+    File-like sink that encrypts everything written to it into the segmented format
+
+    Memory use is bounded by one frame regardless of how much is written.
+    ``close`` must be called to emit the final frame.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        aead: AESGCM,
+        key_id: bytes,
+        frame_size: int = FRAME_SIZE,
+        close_file: bool = False,
+        resume_index: Optional[int] = None,
+        resume_buffer: bytes = b""
+    ):
+        self._fileobj = fileobj
+        self._close_file = close_file
+        self._aead = aead
+        self._frame_size = frame_size
+        self._header = struct.pack(HEADER_FORMAT, FILE_MAGIC, FILE_VERSION, key_id, frame_size)
+        self._buffer = bytearray(resume_buffer)
+        self._index = resume_index or 0
+        self._closed = False
+        if resume_index is None:
+            self._fileobj.write(self._header)
+
+    def write(self, data: bytes) -> int:
+        self._buffer.extend(data)
+        # Hold back the last full frame: only close() knows whether it is final
+        while len(self._buffer) > self._frame_size:
+            self._write_frame(bytes(self._buffer[:self._frame_size]), final=False)
+            del self._buffer[:self._frame_size]
+        return len(data)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_frame(bytes(self._buffer), final=True)
+            self._buffer.clear()
+        finally:
+            if self._close_file:
+                self._fileobj.close()
+
+    def _write_frame(self, plaintext: bytes, final: bool) -> None:
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = self._aead.encrypt(nonce, plaintext, _frame_aad(self._header, self._index, final))
+        self._fileobj.write(nonce + ciphertext)
+        self._index += 1
+
+    def __enter__(self) -> "EncryptedFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._close_file:
+            # Leave the file without a final frame so it never passes as complete
+            self._fileobj.close()
+
+
+class DecryptedFileReader:
+    """Read-only binary file object that decrypts an encrypted file on the fly"""
+
+    def __init__(self, blocks: Iterator[bytes], name: str):
+        self._blocks = blocks
+        self._buffer = b""
+        self.name = name
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data = self._buffer + b"".join(self._blocks)
+            self._buffer = b""
+            return data
+
+        while len(self._buffer) < size:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._buffer += block
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def close(self) -> None:
+        self._blocks.close()
+
+    def __enter__(self) -> "DecryptedFileReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
 class EncryptionService:
     """Service for encrypting/decrypting data at rest (HIPAA compliance)"""
 
@@ -11,10 +139,23 @@ class EncryptionService:
         # In production, this should be a proper 32-byte base64-encoded key
         self.cipher = Fernet(settings.ENCRYPTION_KEY.encode())
 
+        # File encryption uses AES-256-GCM with a key derived from the same secret
+        file_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"scribe segmented file encryption",
+        ).derive(base64.urlsafe_b64decode(settings.ENCRYPTION_KEY.encode()))
+        self.key_id = hashlib.sha256(file_key).digest()[:8]
+        self.file_keys: Dict[bytes, AESGCM] = {self.key_id: AESGCM(file_key)}
+
     def encrypt_file(self, file_path: str, output_path: str) -> str:
         """
         Encrypt a file and save to output path
 
+        The file is streamed through the segmented format, so memory use
+        is constant regardless of file size.
+
         Args:
             file_path: Path to file to encrypt
             output_path: Path to save encrypted file
@@ -22,13 +163,12 @@ class EncryptionService:
         Returns:
             Path to encrypted file
         """
-        with open(file_path, 'rb') as f:
-            data = f.read()
-
-        encrypted_data = self.cipher.encrypt(data)
-
-        with open(output_path, 'wb') as f:
-            f.write(encrypted_data)
+        with open(file_path, 'rb') as source, self.open_encrypted_writer(output_path) as writer:
+            while True:
+                block = source.read(FRAME_SIZE)
+                if not block:
+                    break
+                writer.write(block)
 
         return output_path
 
@@ -36,6 +176,8 @@ class EncryptionService:
         """
         Decrypt a file and save to output path
 
+        Reads both the segmented format and legacy whole-file Fernet tokens.
+
         Args:
             file_path: Path to encrypted file
             output_path: Path to save decrypted file
@@ -43,15 +185,193 @@ class EncryptionService:
         Returns:
             Path to decrypted file
         """
+        with open(output_path, 'wb') as f:
+            for block in self.decrypt_range(file_path):
+                f.write(block)
+
+        return output_path
+
+    def open_encrypted_writer(self, output_path: str) -> EncryptedFileWriter:
+        """
+        Open a streaming encrypt-on-write sink
+
+        Args:
+            output_path: Path to save encrypted file
+
+        Returns:
+            File-like writer; use as a context manager
+        """
+        return EncryptedFileWriter(
+            open(output_path, 'wb'),
+            self.file_keys[self.key_id],
+            self.key_id,
+            close_file=True
+        )
+
+    def open_encrypted_stream(self, fileobj: BinaryIO) -> EncryptedFileWriter:
+        """
+        Encrypt everything written into an already open sink
+
+        The sink stays open after the writer is closed; whoever opened it
+        closes it (and, for blob store writers, decides whether to keep it).
+
+        Args:
+            fileobj: Writable binary file object, e.g. a blob store writer
+
+        Returns:
+            File-like writer; use as a context manager
+        """
+        return EncryptedFileWriter(fileobj, self.file_keys[self.key_id], self.key_id)
+
+    def open_encrypted_appender(self, file_path: str) -> EncryptedFileWriter:
+        """
+        Reopen a segmented file to append more plaintext
+
+        Only the final frame is decrypted and rewritten, so the cost does
+        not depend on the size of the existing file.
+
+        Args:
+            file_path: Path to an existing segmented encrypted file
+
+        Returns:
+            File-like writer positioned at the end of the plaintext
+        """
+        f = open(file_path, 'r+b')
+        try:
+            header, aead, frame_size = self._read_header(f)
+            frame_count, last_size = self._frame_layout(os.path.getsize(file_path), frame_size)
+
+            last_offset = HEADER_SIZE + (frame_count - 1) * (frame_size + FRAME_OVERHEAD)
+            f.seek(last_offset)
+            stored = f.read(last_size + FRAME_OVERHEAD)
+            tail = aead.decrypt(
+                stored[:NONCE_SIZE],
+                stored[NONCE_SIZE:],
+                _frame_aad(header, frame_count - 1, True)
+            )
+
+            f.seek(last_offset)
+            f.truncate()
+        except Exception:
+            f.close()
+            raise
+
+        return EncryptedFileWriter(
+            f,
+            aead,
+            struct.unpack(HEADER_FORMAT, header)[2],
+            frame_size,
+            close_file=True,
+            resume_index=frame_count - 1,
+            resume_buffer=tail
+        )
+
+    def open_decrypted_reader(self, file_path: str, name: Optional[str] = None) -> DecryptedFileReader:
+        """
+        Open an encrypted file as a decrypt-on-read binary file object
+
+        Args:
+            file_path: Path to encrypted file
+            name: File name reported to consumers such as multipart uploads
+
+        Returns:
+            Readable file object yielding plaintext
+        """
+        return DecryptedFileReader(
+            self.decrypt_range(file_path),
+            name or os.path.basename(file_path)
+        )
+
+    def is_segmented(self, file_path: str) -> bool:
+        """Check whether a file uses the segmented format (as opposed to legacy Fernet)"""
         with open(file_path, 'rb') as f:
-            encrypted_data = f.read()
+            return f.read(len(FILE_MAGIC)) == FILE_MAGIC
 
-        decrypted_data = self.cipher.decrypt(encrypted_data)
+    def plaintext_size(self, file_path: str) -> int:
+        """
+        Get the decrypted size of an encrypted file without decrypting it
 
-        with open(output_path, 'wb') as f:
-            f.write(decrypted_data)
+        Args:
+            file_path: Path to encrypted file
 
-        return output_path
+        Returns:
+            Size of the plaintext in bytes
+        """
+        if not self.is_segmented(file_path):
+            return len(self._decrypt_legacy(file_path))
+
+        with open(file_path, 'rb') as f:
+            _, _, frame_size = self._read_header(f)
+        frame_count, last_size = self._frame_layout(os.path.getsize(file_path), frame_size)
+        return (frame_count - 1) * frame_size + last_size
+
+    def open_ranges(self, file_path: str) -> Tuple[int, Callable[[int, Optional[int]], Iterator[bytes]]]:
+        """
+        Get the decrypted size of an encrypted file and a reader for byte ranges of it
+
+        Legacy Fernet files are decrypted once here and ranges are sliced from
+        that plaintext, rather than decrypting the whole file for the size and
+        again for the range.
+
+        Args:
+            file_path: Path to encrypted file
+
+        Returns:
+            Tuple of (plaintext size, function taking start and end offsets
+            and yielding the decrypted blocks of that range)
+        """
+        if self.is_segmented(file_path):
+            return (
+                self.plaintext_size(file_path),
+                lambda start, end=None: self.decrypt_range(file_path, start, end)
+            )
+
+        plaintext = self._decrypt_legacy(file_path)
+        return len(plaintext), lambda start, end=None: iter([plaintext[start:end]])
+
+    def decrypt_range(self, file_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Decrypt a byte range of an encrypted file
+
+        Only the frames covering ``[start, end)`` are read and decrypted.
+
+        Args:
+            file_path: Path to encrypted file
+            start: First plaintext byte to return
+            end: Plaintext offset to stop at (exclusive); defaults to end of file
+
+        Yields:
+            Decrypted plaintext blocks
+        """
+        if not self.is_segmented(file_path):
+            # Legacy Fernet tokens can only be decrypted as a whole
+            yield self._decrypt_legacy(file_path)[start:end]
+            return
+
+        with open(file_path, 'rb') as f:
+            header, aead, frame_size = self._read_header(f)
+            frame_count, last_size = self._frame_layout(os.path.getsize(file_path), frame_size)
+            size = (frame_count - 1) * frame_size + last_size
+
+            end = size if end is None else min(end, size)
+            if start >= end:
+                return
+
+            stored_frame_size = frame_size + FRAME_OVERHEAD
+            first, last = start // frame_size, (end - 1) // frame_size
+
+            f.seek(HEADER_SIZE + first * stored_frame_size)
+            for index in range(first, last + 1):
+                final = index == frame_count - 1
+                stored = f.read((last_size if final else frame_size) + FRAME_OVERHEAD)
+                plaintext = aead.decrypt(
+                    stored[:NONCE_SIZE],
+                    stored[NONCE_SIZE:],
+                    _frame_aad(header, index, final)
+                )
+
+                frame_start = index * frame_size
+                yield plaintext[max(start - frame_start, 0):end - frame_start]
 
     def encrypt_text(self, text: str) -> str:
         """
@@ -80,6 +400,72 @@ class EncryptionService:
         decrypted = self.cipher.decrypt(encrypted)
         return decrypted.decode()
 
+    def encrypt_text_bytes(self, text: str) -> bytes:
+        """
+        Encrypt text to raw ciphertext bytes, for binary columns
+
+        Unlike encrypt_text, neither the Fernet token nor the result is
+        base64 encoded, so nothing has to be decoded before decryption.
+
+        Args:
+            text: Text to encrypt
+
+        Returns:
+            Encrypted text (raw bytes)
+        """
+        return base64.urlsafe_b64decode(self.cipher.encrypt(text.encode()))
+
+    def decrypt_text_bytes(self, ciphertext: bytes) -> str:
+        """
+        Decrypt text encrypted with encrypt_text_bytes
+
+        Args:
+            ciphertext: Raw encrypted bytes
+
+        Returns:
+            Decrypted text
+        """
+        return self.cipher.decrypt(base64.urlsafe_b64encode(ciphertext)).decode()
+
+    def text_to_bytes(self, encrypted_text: str) -> bytes:
+        """
+        Convert encrypt_text output to encrypt_text_bytes output without decrypting
+
+        Args:
+            encrypted_text: Base64 encoded encrypted text
+
+        Returns:
+            The same ciphertext as raw bytes
+        """
+        return base64.urlsafe_b64decode(base64.b64decode(encrypted_text.encode()))
+
+    def _decrypt_legacy(self, file_path: str) -> bytes:
+        with open(file_path, 'rb') as f:
+            return self.cipher.decrypt(f.read())
+
+    def _read_header(self, f: BinaryIO) -> Tuple[bytes, AESGCM, int]:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError("Encrypted file header is truncated")
+
+        magic, version, key_id, frame_size = struct.unpack(HEADER_FORMAT, header)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"Unsupported encrypted file format (version {version})")
+        if key_id not in self.file_keys:
+            raise ValueError(f"Unknown encryption key ID {key_id.hex()}")
+
+        return header, self.file_keys[key_id], frame_size
+
+    def _frame_layout(self, file_size: int, frame_size: int) -> Tuple[int, int]:
+        """Return the number of frames and the plaintext size of the last one"""
+        body_size = file_size - HEADER_SIZE
+        stored_frame_size = frame_size + FRAME_OVERHEAD
+        frame_count = max(-(-body_size // stored_frame_size), 1)
+        last_size = body_size - (frame_count - 1) * stored_frame_size - FRAME_OVERHEAD
+        if last_size < 0:
+            raise ValueError("Encrypted file is truncated")
+        return frame_count, last_size
+
 
 # Global encryption service instance
 encryption_service = EncryptionService()
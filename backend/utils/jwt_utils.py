@@ -1,9 +1,85 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from config import settings
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of tokens whose signature has already been verified
+
+    Keyed by a SHA-256 of the token, so raw tokens are not kept in memory.
+    An entry is served only until the token's ``exp`` claim, which keeps
+    expiry enforcement identical to a full decode.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = (
+            max_entries if max_entries is not None
+            else settings.JWT_DECODE_CACHE_MAX_ENTRIES
+        )
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Get the payload of a verified, unexpired token, or None on a miss"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """Cache a verified payload; tokens without an expiry are not cached"""
+        expires_at = payload.get("exp")
+        if not self.max_entries or not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters, hit rate and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# Global verified token cache instance
+verified_token_cache = VerifiedTokenCache()
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -27,18 +103,28 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+def decode_access_token(token: str, cache: Optional[VerifiedTokenCache] = None) -> Optional[Dict[str, Any]]:
     """
     Decode and validate a JWT access token
 
+    The signature is verified once per token; later calls are answered
+    from the verified token cache until the token expires.
+
     Args:
         token: JWT token to decode
+        cache: Verified token cache (defaults to the global one)
 
     Returns:
         Decoded token payload or None if invalid
     """
+    cache = cache or verified_token_cache
+    payload = cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+    cache.set(token, payload)
+    return payload
@@ -0,0 +1,103 @@
+import time
+import logging
+import threading
+from typing import Any, Dict, Union
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """
+    Checkout counters of one connection pool
+
+    ``waits`` counts checkouts that found every connection in use and the
+    overflow exhausted, so they had to queue for a returned connection;
+    ``timeouts`` counts those that gave up after ``pool_timeout``. Checkout
+    time covers the whole checkout: queueing, opening a connection, pre-ping.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, waited: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.timeouts += timed_out
+            self.checkout_seconds_total += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters as a JSON-serializable dict"""
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "checkout_seconds_avg": self.checkout_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "checkout_seconds_max": self.checkout_seconds_max,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout of a QueuePool and counts those that queued or timed out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        exhausted = self.checkedin() == 0 and 0 <= self._max_overflow <= self.overflow()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, waited=True, timed_out=True)
+            logger.warning("Database connection pool exhausted: %s", self.status())
+            raise
+        self.stats.record(time.perf_counter() - started, waited=exhausted)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool that keeps PoolStats"""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that keeps PoolStats"""
+
+
+def pool_stats(engine: Union[Engine, AsyncEngine]) -> Dict[str, Any]:
+    """
+    Report the occupancy and checkout counters of an engine's connection pool
+
+    Args:
+        engine: Sync or async engine
+
+    Returns:
+        Pool class, size, connections checked out and in, overflow in
+        use, plus PoolStats counters when the pool is instrumented
+    """
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # Negative until the pool has opened pool_size connections
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, _InstrumentedPoolMixin):
+        stats.update(pool.stats.snapshot())
+    return stats
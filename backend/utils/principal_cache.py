@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from models.user import User
+from config import settings
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of authenticated users, keyed by user ID
+
+    Saves the user lookup that get_current_user would otherwise run on every
+    request. Cached users are detached from their session, so only their
+    loaded column attributes may be read. Entries are dropped when the user
+    is updated through a repository; the TTL bounds how long another
+    process's update can go unseen.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AUTH_USER_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.AUTH_USER_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        """Get a cached user, or None on a miss or once the entry has expired"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user: User) -> None:
+        """Cache a user, evicting the least recently used entries if full"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user from the cache"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop every cached user"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from utils.encryption_utils import encryption_service
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class DecryptedTextCache:
+    """
+    Short-lived LRU cache of decrypted transcriptions, bounded by total size
+
+    Keyed by recording ID. Repositories drop a recording's entry whenever
+    they update it; the TTL bounds how long plaintext stays in memory and
+    how long another process's update can go unseen.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.TRANSCRIPT_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes or settings.TRANSCRIPT_CACHE_MAX_BYTES
+        self._entries: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached text, or None on a miss or once the entry has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, size, text = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return text
+
+    def set(self, key: str, text: str) -> None:
+        """Cache text, evicting the least recently used entries past max_bytes"""
+        size = len(text.encode())
+        if self.ttl_seconds <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, text)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: str) -> None:
+        """Drop an entry"""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+
+# Global decrypted transcription cache instance
+transcript_cache = DecryptedTextCache()
+
+
+def decrypt_transcription(recording) -> Optional[str]:
+    """
+    Decrypt a recording's transcription, using the cache when possible
+
+    Args:
+        recording: Recording, or a summary row with the id and both
+            transcription columns
+
+    Returns:
+        Transcription text, or None if there is none or it cannot be decrypted
+    """
+    ciphertext = recording.transcription_ciphertext
+    legacy_text = recording.transcription_text
+    if ciphertext is None and not legacy_text:
+        return None
+
+    text = transcript_cache.get(recording.id)
+    if text is not None:
+        return text
+
+    try:
+        if ciphertext is not None:
+            text = encryption_service.decrypt_text_bytes(ciphertext)
+        else:
+            text = encryption_service.decrypt_text(legacy_text)
+    except Exception:
+        logger.warning("Could not decrypt the transcription of recording %s", recording.id)
+        return None
+
+    transcript_cache.set(recording.id, text)
+    return text
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { List, Typography, Tag, Spin, Empty } from 'antd';
+import { List, Typography, Tag, Spin, Empty, Button } from 'antd';
 import { ClockCircleOutlined } from '@ant-design/icons';
 import { apiService } from '../services/api';
 import './RecordingsList.css';
@@ -25,7 +25,9 @@ const RecordingsList: React.FC<RecordingsListProps> = ({
   refreshTrigger
 }) => {
   const [recordings, setRecordings] = useState<Recording[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchRecordings();
@@ -35,7 +37,8 @@ const RecordingsList: React.FC<RecordingsListProps> = ({
     try {
       setLoading(true);
       const data = await apiService.getRecordings();
-      setRecordings(data);
+      setRecordings(data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       console.error('Failed to fetch recordings:', error);
     } finally {
@@ -43,14 +46,31 @@ const RecordingsList: React.FC<RecordingsListProps> = ({
     }
   };
 
+  const fetchMoreRecordings = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await apiService.getRecordings(nextCursor);
+      setRecordings(prev => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Failed to fetch recordings:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getStatusColor = (status: string) => {
     switch (status) {
       case 'active':
         return 'processing';
       case 'paused':
         return 'warning';
+      case 'transcribing':
+        return 'processing';
       case 'ended':
         return 'success';
+      case 'failed':
+        return 'error';
       default:
         return 'default';
     }
@@ -79,6 +99,13 @@ const RecordingsList: React.FC<RecordingsListProps> = ({
       </div>
       <List
         dataSource={recordings}
+        loadMore={nextCursor && (
+          <div className="recordings-load-more">
+            <Button onClick={fetchMoreRecordings} loading={loadingMore}>
+              Load more
+            </Button>
+          </div>
+        )}
         renderItem={(recording) => (
           <List.Item
             className={`recording-item ${selectedRecordingId === recording.id ? 'selected' : ''}`}
@@ -5,6 +5,7 @@ import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import RecordingsList from '../components/RecordingsList';
 import RecordingView from '../components/RecordingView';
+import { apiService } from '../services/api';
 import './Dashboard.css';
 
 const { Header, Sider, Content } = Layout;
@@ -38,8 +39,14 @@ const Dashboard: React.FC = () => {
     </Menu>
   );
 
-  const handleRecordingSelect = (recording: Recording) => {
+  const handleRecordingSelect = async (recording: Recording) => {
     setSelectedRecording(recording);
+    try {
+      // The list only carries summaries; load the transcription
+      setSelectedRecording(await apiService.getRecording(recording.id));
+    } catch (error) {
+      console.error('Failed to fetch recording:', error);
+    }
   };
 
   const handleRecordingCreated = () => {
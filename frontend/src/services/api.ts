@@ -34,8 +34,10 @@ class ApiService {
   }
 
   // Recording endpoints
-  async getRecordings() {
-    const response = await this.client.get('/recordings');
+  async getRecordings(cursor?: string | null) {
+    const response = await this.client.get('/recordings', {
+      params: cursor ? { cursor } : undefined,
+    });
     return response.data;
   }
 
@@ -76,6 +78,11 @@ class ApiService {
     return response.data;
   }
 
+  async getRecordingStatus(recordingId: string) {
+    const response = await this.client.get(`/recordings/${recordingId}/status`);
+    return response.data;
+  }
+
   async updateRecordingNotes(recordingId: string, notes: string) {
     const formData = new FormData();
     formData.append('notes', notes);